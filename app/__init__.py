@@ -1,20 +1,36 @@
-from flask import Flask
+from flask import Flask, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from .config import Config
+from .cache import Cache
+from .events import EventBroker
+from .images import ImagePipeline
+from .storage import Storage, UploadRequest
+from .janitor import FileJanitor
+from .profiling import QueryProfiler
+from .metrics import Metrics
 import os
 
 db = SQLAlchemy()
 migrate = Migrate()
 bcrypt = Bcrypt()
 jwt = JWTManager()
+cache = Cache()
+events = EventBroker()
+images = ImagePipeline()
+storage = Storage()
+janitor = FileJanitor()
+profiler = QueryProfiler()
+metrics = Metrics()
 
 def create_app(config_class=Config):
     """Uygulama Fabrikası (Application Factory)"""
     app = Flask(__name__)
+    app.request_class = UploadRequest
 
     app.config.from_object(config_class)
     
@@ -34,6 +50,13 @@ def create_app(config_class=Config):
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     jwt.init_app(app)
+    cache.init_app(app)
+    events.init_app(app)
+    images.init_app(app)
+    storage.init_app(app)
+    janitor.init_app(app)
+    profiler.init_app(app)
+    metrics.init_app(app)
 
 #  Blueprint Kayıtları 
     from .api.auth import auth_bp
@@ -54,6 +77,36 @@ def create_app(config_class=Config):
     from .api.messages import messages_bp
     app.register_blueprint(messages_bp, url_prefix='/api/messages')
 
+    from .api.media import media_bp
+    app.register_blueprint(media_bp)
+
+    from .api.metrics import metrics_bp
+    app.register_blueprint(metrics_bp)
+
+    from .stats import stats_cli
+    app.cli.add_command(stats_cli)
+
+    from .security import users_cli
+    app.cli.add_command(users_cli)
+
+    from .images import images_cli
+    app.cli.add_command(images_cli)
+
+    from .janitor import files_cli
+    app.cli.add_command(files_cli)
+
+    from .seed import seed_command
+    app.cli.add_command(seed_command)
+
+    @app.errorhandler(413)
+    def upload_too_large(e):
+        return jsonify({'message': e.description if e.description != RequestEntityTooLarge.description
+                        else 'Yükleme boyutu sınırı aşıldı.'}), 413
+
+    @app.errorhandler(415)
+    def upload_unsupported(e):
+        return jsonify({'message': 'Desteklenmeyen dosya türü.'}), 415
+
     @app.route('/')
     def hello():
         return "Ürün Kiralama API'si Çalışıyor!"
@@ -1,78 +1,76 @@
-from flask import Blueprint, jsonify
-from app.models import User, Product, Transaction, ProductImage
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
-from sqlalchemy import func, text 
-from app.utils import delete_file_from_url 
+import csv
+import io
+import json
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+from datetime import datetime, timedelta
+from app.models import User, Product, Transaction, ProductImage, DailyStat
+from app import db, cache, stats, janitor
+from app.security import admin_required, forget_token_stamp
+from app.images import variant_urls
+from app.janitor import schedule_file_deletion
+from sqlalchemy import text 
+from app.utils import parse_date_arg
+from app.read_models import (
+    rows_to_dicts, admin_users_select, admin_products_select, admin_transactions_select,
+    serialize_admin_product, serialize_admin_transaction
+)
+
+# Dışa aktarılabilir tablolar: (select üretici, sıralama/sayfalama sütunu, satır dönüştürücü)
+EXPORT_TABLES = {
+    'users': (admin_users_select, User.id, lambda row: dict(row._mapping)),
+    'products': (admin_products_select, Product.id, serialize_admin_product),
+    'transactions': (admin_transactions_select, Transaction.id, serialize_admin_transaction),
+}
+EXPORT_BATCH_SIZE = 1000
 
 admin_bp = Blueprint('admin', __name__)
 
-def check_admin():
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, str):
-         current_user_id = int(current_user_id)
-    user = User.query.get(current_user_id)
-    if not user or user.role != 'admin':
-        return False
-    return True
-
-
 @admin_bp.route('/stats', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_admin_stats():
-    if not check_admin(): return jsonify({'message': 'Yetkisiz!'}), 403
-
-    total_users = User.query.count()
-    active_products = Product.query.filter_by(status='available').count()
-    
-    try:
-        total_volume = db.session.query(func.sum(Transaction.price)).filter(
-            Transaction.status == 'COMPLETED'
-        ).scalar() or 0
-    except:
-        total_volume = 0
-        
-    total_revenue = float(total_volume) * 0.03
+    counters = stats.get_counters()
+    total_revenue = float(counters['completed_volume']) * float(stats.COMMISSION_RATE)
 
     return jsonify({
-        'users': total_users,
-        'products': active_products,
+        'users': int(counters['users']),
+        'products': int(counters['active_products']),
         'income': round(total_revenue, 2)
     }), 200
 
+# 1b. GÜNLÜK İSTATİSTİK SERİSİ
+@admin_bp.route('/stats/timeseries', methods=['GET'])
+@admin_required
+def get_admin_stats_timeseries():
+    """
+    Günlük özetler (daily_stats). ?from=YYYY-MM-DD&to=YYYY-MM-DD, varsayılan son 30 gün.
+    """
+    try:
+        date_to = parse_date_arg('to') or datetime.utcnow().date()
+        date_from = parse_date_arg('from') or date_to - timedelta(days=29)
+    except ValueError:
+        return jsonify({'message': 'Tarih formatı geçersiz.'}), 400
+
+    rows = DailyStat.query.filter(DailyStat.day >= date_from, DailyStat.day <= date_to)\
+        .order_by(DailyStat.day).all()
+
+    return jsonify([{
+        'date': row.day.strftime('%Y-%m-%d'),
+        'new_users': row.new_users,
+        'new_products': row.new_products,
+        'completed_transactions': row.completed_transactions,
+        'volume': float(row.completed_volume),
+        'income': round(float(row.completed_volume) * float(stats.COMMISSION_RATE), 2)
+    } for row in rows]), 200
+
 # 2. TÜM VERİLERİ GETİR
 @admin_bp.route('/all-data', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_all_data():
-    if not check_admin(): return jsonify({'message': 'Yetkisiz!'}), 403
-
-    users = User.query.all()
-    users_data = [{'id': u.id, 'username': u.username, 'email': u.email, 'role': u.role} for u in users]
-
-    products = Product.query.all()
-    products_data = []
-    for p in products:
-        products_data.append({
-            'id': p.id, 
-            'title': p.title, 
-            'price': p.price, 
-            'owner': p.owner.username if p.owner else 'Bilinmiyor', 
-            'status': p.status,
-            'listing_type': getattr(p, 'listing_type', 'N/A')
-        })
-
-    transactions = Transaction.query.order_by(Transaction.created_at.desc()).all()
-    transactions_data = []
-    for t in transactions:
-        transactions_data.append({
-            'id': t.id, 
-            'product': t.product.title if t.product else 'Silinmiş Ürün', 
-            'buyer': t.buyer.username if t.buyer else 'Silinmiş Kullanıcı', 
-            'seller': t.seller.username if t.seller else 'Silinmiş Kullanıcı', 
-            'price': float(t.price), 
-            'type': getattr(t, 'transaction_type', 'standard'),
-            'status': t.status
-        })
+    users_data = rows_to_dicts(db.session.execute(admin_users_select()).all())
+
+    products_data = [serialize_admin_product(row) for row in db.session.execute(admin_products_select())]
+
+    transactions_data = [serialize_admin_transaction(row) for row in db.session.execute(admin_transactions_select())]
 
     return jsonify({
         'users': users_data,
@@ -80,32 +78,87 @@ def get_all_data():
         'transactions': transactions_data
     }), 200
 
+# 2b. TABLO DIŞA AKTARMA (akış)
+@admin_bp.route('/export/<table>', methods=['GET'])
+@admin_required
+def export_table(table):
+    """
+    Tabloyu NDJSON (varsayılan) veya CSV olarak akış halinde döner; bellek kullanımı
+    tablo boyutundan bağımsızdır (sunucu taraflı imleç + yield_per).
+    ?format=ndjson|csv  ?after_id=<id>  ?limit=<satır sayısı>
+    """
+    if table not in EXPORT_TABLES:
+        return jsonify({'message': 'Bilinmeyen tablo.'}), 404
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'message': 'Geçersiz format.'}), 400
+
+    try:
+        after_id = int(request.args.get('after_id', 0))
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+    except ValueError:
+        return jsonify({'message': 'Geçersiz sayfalama parametresi.'}), 400
+
+    build_select, id_column, serialize = EXPORT_TABLES[table]
+    stmt = build_select().order_by(None).order_by(id_column).where(id_column > after_id)
+    if limit:
+        stmt = stmt.limit(limit)
+
+    def generate():
+        result = db.session.execute(
+            stmt, execution_options={'stream_results': True, 'yield_per': EXPORT_BATCH_SIZE}
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header_written = False
+
+        for row in result:
+            data = serialize(row)
+            if export_format == 'ndjson':
+                yield json.dumps(data, ensure_ascii=False, default=str) + '\n'
+                continue
+
+            if not header_written:
+                writer.writerow(data.keys())
+                header_written = True
+            writer.writerow(data.values())
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={table}.{export_format}'
+    return response
+
 # 3. KULLANICI SİL
 @admin_bp.route('/delete-user/<int:user_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_user(user_id):
-    if not check_admin(): return jsonify({'message': 'Yetkisiz!'}), 403
     
     user = User.query.get_or_404(user_id)
     if user.role == 'admin':
         return jsonify({'message': 'Admin silinemez!'}), 400
         
+    stats.record_user_removed(user)
     db.session.delete(user)
     db.session.commit()
+    # 'memory' önbellekte diğer worker'lar eski damgayı JWT_USER_CACHE_TTL süresince tutar
+    forget_token_stamp(user_id)
     return jsonify({'message': 'Kullanıcı silindi.'}), 200
 
 # 4. ÜRÜN SİL
 @admin_bp.route('/delete-product/<int:product_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_product(product_id):
-    if not check_admin():
-        return jsonify({'message': 'Yetkisiz işlem!'}), 403
-    
     product = Product.query.get_or_404(product_id)
 
     try:
         images_to_delete = ProductImage.query.filter_by(product_id=product_id).all()
-        image_urls = [img.image_url for img in images_to_delete]
+        image_urls = [url for img in images_to_delete for url in [img.image_url, *variant_urls(img.variants)]]
+
+        stats.record_product_removed(product)
         
         Transaction.query.filter_by(product_id=product_id).delete(synchronize_session=False)
         if hasattr(Transaction, 'swap_product_id'):
@@ -116,14 +169,11 @@ def delete_product(product_id):
 
         ProductImage.query.filter_by(product_id=product_id).delete(synchronize_session=False)
         db.session.delete(product)
+        schedule_file_deletion(*image_urls)
         
         db.session.commit()
-
-        for url in image_urls:
-            try:
-                delete_file_from_url(url)
-            except:
-                pass
+        cache.invalidate_product(product_id)
+        janitor.wake()
 
         return jsonify({'message': 'Ürün başarıyla silindi.'}), 200
 
@@ -133,11 +183,12 @@ def delete_product(product_id):
 
 # 5. İŞLEM SİL
 @admin_bp.route('/delete-transaction/<int:transaction_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_transaction(transaction_id):
-    if not check_admin(): return jsonify({'message': 'Yetkisiz!'}), 403
     
     trans = Transaction.query.get_or_404(transaction_id)
+    if trans.status == 'COMPLETED':
+        stats.record_completed_transaction(trans.price, trans.created_at.date() if trans.created_at else None, sign=-1)
     db.session.delete(trans)
     db.session.commit()
     return jsonify({'message': 'İşlem kaydı silindi.'}), 200
\ No newline at end of file
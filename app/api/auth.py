@@ -2,9 +2,12 @@ import os
 import uuid
 from flask import Blueprint, request, jsonify, current_app
 from app.models import User
-from app import db, bcrypt
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from app.utils import save_file, delete_file_from_url
+from app import db, bcrypt, stats, images, janitor
+from app.images import process_profile_image, variant_urls
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.security import issue_access_token
+from app.utils import save_file
+from app.janitor import schedule_file_deletion
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -30,6 +33,8 @@ def register():
     new_user.set_password(data['password'])
     
     db.session.add(new_user)
+    stats.adjust(users=1)
+    stats.record_daily(new_users=1)
     db.session.commit()
     
     return jsonify({'message': 'Kayıt başarılı! Giriş yapabilirsiniz.'}), 201
@@ -48,7 +53,7 @@ def login():
     user = User.query.filter_by(username=username).first()
     
     if user and user.check_password(password):
-        access_token = create_access_token(identity=str(user.id))
+        access_token = issue_access_token(user)
         
         raw_role = user.role if user.role else 'customer'
         clean_role = str(raw_role).strip().lower()
@@ -87,6 +92,7 @@ def get_profile():
         'bio': user.bio,
         'location': user.location,
         'profile_image': user.profile_image,
+        'profile_image_variants': user.profile_image_variants,
         'role': user.role,
         'created_at': user.created_at
     }), 200
@@ -111,13 +117,18 @@ def update_profile():
         file = request.files['profile_image']
         
         if file and file.filename:
-            if user.profile_image:
-                delete_file_from_url(user.profile_image)
-            new_image_url = save_file(file, folder_name='profiles')
+            new_image_url = save_file(file)
             
             if new_image_url:
+                if user.profile_image:
+                    schedule_file_deletion(user.profile_image, *variant_urls(user.profile_image_variants))
                 user.profile_image = new_image_url
+                user.profile_image_variants = None
     db.session.commit()
+    janitor.wake()
+
+    if user.profile_image and not user.profile_image_variants:
+        images.submit(process_profile_image, user.id)
     
     return jsonify({
         'message': 'Profil güncellendi.',
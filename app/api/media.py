@@ -0,0 +1,67 @@
+import mimetypes
+import os
+from flask import Blueprint, abort, current_app, send_from_directory
+from werkzeug.security import safe_join
+
+media_bp = Blueprint('media', __name__)
+
+# Yüklenen dosyaların sunumu.
+# İçerik adresli dosyaların (app/storage.py) adı içeriğin özetidir ve asla değişmez; bu
+# yüzden bir yıl, 'immutable' olarak önbelleğe alınır ve tarayıcı yeniden doğrulamaz.
+# Eski düz yollardaki yüklemeler bir gün önbellekte tutulur.
+# Range (kısmi içerik) ve koşullu istekler (ETag / If-Modified-Since) send_file ile yanıtlanır.
+# Ön sunucu varsa dosya ona devredilir: MEDIA_ACCEL_REDIRECT (nginx X-Accel-Redirect iç
+# konum öneki) veya USE_X_SENDFILE (Apache / lighttpd).
+# MEDIA_ACCEL_REDIRECT yükleme klasörünü (UPLOAD_FOLDER) gösterir; depo kökü onun altındaysa
+# iç yol ondan türetilir, dışındaysa depo için ayrı iç konum MEDIA_ACCEL_OBJECTS ile verilir
+# (verilmezse depo dosyaları uygulama tarafından gönderilir).
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+LEGACY_CACHE = 'public, max-age=86400'
+
+
+def _send(directory, filename, accel, cache_control):
+    # '.incoming' gibi gizli klasörler (yarım yüklemeler) hiçbir zaman sunulmaz
+    if any(part.startswith('.') for part in filename.split('/')):
+        abort(404)
+
+    if accel:
+        path = safe_join(directory, filename)
+        if not path or not os.path.isfile(path):
+            abort(404)
+        response = current_app.response_class()
+        response.headers['X-Accel-Redirect'] = f"{accel.rstrip('/')}/{filename}"
+        response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    else:
+        response = send_from_directory(directory, filename, conditional=True)
+
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def _objects_accel():
+    """Depo kökünün ön sunucudaki iç konumu; yoksa None."""
+    config = current_app.config
+    if config.get('MEDIA_ACCEL_OBJECTS'):
+        return config['MEDIA_ACCEL_OBJECTS']
+    accel = config.get('MEDIA_ACCEL_REDIRECT')
+    if not accel:
+        return None
+    relative = os.path.relpath(os.path.realpath(config['STORAGE_LOCAL_ROOT']), os.path.realpath(config['UPLOAD_FOLDER']))
+    if relative == '..' or relative.startswith('..' + os.sep):
+        return None
+    return f"{accel.rstrip('/')}/{relative.replace(os.sep, '/')}"
+
+def serve_object(key):
+    """İçerik adresli depodaki dosya (yerel arka uç)."""
+    return _send(current_app.config['STORAGE_LOCAL_ROOT'], key, _objects_accel(), IMMUTABLE_CACHE)
+
+@media_bp.record
+def register_object_route(state):
+    # Depo URL öneki ayarlanabilir olduğundan kural kayıt anında eklenir
+    url = state.app.config['STORAGE_LOCAL_URL'].rstrip('/')
+    state.add_url_rule(f'{url}/<path:key>', 'serve_object', serve_object, methods=['GET'])
+
+@media_bp.route('/static/uploads/<path:filename>', methods=['GET'])
+def serve_upload(filename):
+    """İçerik adresli depodan önceki 'uploads/products/<id>/<uuid>.jpg' dosyaları."""
+    return _send(current_app.config['UPLOAD_FOLDER'], filename, current_app.config.get('MEDIA_ACCEL_REDIRECT'), LEGACY_CACHE)
@@ -1,8 +1,11 @@
-from flask import Blueprint, request, jsonify
-from app import db
-from app.models import Message, User, Product
+from flask import Blueprint, request, jsonify, make_response, Response
+from app import db, cache, events
+from app.cache import unread_key
+from app.models import Message, User, Product, Conversation
+from app.read_models import conversations_select, serialize_conversation_row
+from app.utils import encode_cursor, decode_cursor, get_page_limit
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, case
 
 messages_bp = Blueprint('messages', __name__)
 
@@ -25,6 +28,11 @@ def send_message():
     if not receiver_id or not content:
         return jsonify({'message': 'Alıcı ve mesaj içeriği zorunludur.'}), 400
 
+    try:
+        receiver_id = int(receiver_id)
+    except (TypeError, ValueError):
+        return jsonify({'message': 'Geçersiz alıcı.'}), 400
+
     if current_user_id == receiver_id:
         return jsonify({'message': 'Kendinize mesaj atamazsınız.'}), 400
 
@@ -35,93 +43,182 @@ def send_message():
         content=content
     )
 
-    db.session.add(new_msg)
-    db.session.commit()
+    try:
+        db.session.add(new_msg)
+        db.session.flush()
+        Conversation.record_message(new_msg)
+        User.query.filter_by(id=receiver_id)\
+            .update({'unread_count': User.unread_count + 1}, synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"HATA: Mesaj kaydedilemedi! {e}")
+        return jsonify({'message': 'Mesaj gönderilemedi.', 'error': str(e)}), 500
 
+    cache.delete_quietly(unread_key(receiver_id))
+    events.publish(receiver_id, 'message', {
+        'message_id': new_msg.id,
+        'sender_id': current_user_id,
+        'product_id': product_id
+    })
     return jsonify({'message': 'Mesaj gönderildi!'}), 201
 
+@messages_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    """
+    Server-Sent Events akışı: yeni mesajlar ('message') ve talep güncellemeleri
+    ('request', 'request_update'). Yeniden bağlanırken Last-Event-ID başlığı
+    (veya ?last_event_id=) ile kaçırılan olaylar tekrar gönderilir.
+    """
+    current_user_id = get_jwt_identity()
+    if isinstance(current_user_id, str):
+         current_user_id = int(current_user_id)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = Response(events.stream(current_user_id, last_event_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@messages_bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    """
+    Okunmamış mesaj sayısı. Sayaç önbellekten okunur; yoksa users tablosundan
+    (birincil anahtar ile) alınıp önbelleğe yazılır; önbellek erişilemezse
+    doğrudan users.unread_count döner. ETag ile 304 destekler.
+    """
+    current_user_id = get_jwt_identity()
+    if isinstance(current_user_id, str):
+         current_user_id = int(current_user_id)
+
+    key = unread_key(current_user_id)
+    count = cache.get_quietly(key)
+    if count is None:
+        count = db.session.query(User.unread_count).filter(User.id == current_user_id).scalar() or 0
+        cache.set_quietly(key, str(count))
+
+    response = make_response(jsonify({'unread_count': int(count)}), 200)
+    response.set_etag(f'unread-{current_user_id}-{count}')
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
 @messages_bp.route('/conversations', methods=['GET'])
 @jwt_required()
 def get_conversations():
     """
     Kullanıcının sohbet ettiği kişileri listeler (Gelen Kutusu Mantığı).
+    Özet tablosundan (conversations) tek sorguyla okunur.
+    'limit' veya 'cursor' verilirse { "items": [...], "next_cursor": "..." } döner.
     """
     current_user_id = get_jwt_identity()
     if isinstance(current_user_id, str):
          current_user_id = int(current_user_id)
 
-    all_msgs = Message.query.filter(
-        or_(Message.sender_id == current_user_id, Message.receiver_id == current_user_id)
-    ).order_by(Message.created_at.desc()).all()
-
-    conversations = {}
-    for msg in all_msgs:
-        other_user_id = msg.receiver_id if msg.sender_id == current_user_id else msg.sender_id
-        
-        if other_user_id not in conversations:
-            other_user = User.query.get(other_user_id)
-            if other_user:
-                unread_count = Message.query.filter(
-                    Message.sender_id == other_user_id,
-                    Message.receiver_id == current_user_id,
-                    Message.is_read == False
-                ).count()
-
-                conversations[other_user_id] = {
-                    'user_id': other_user.id,
-                    'username': other_user.username,
-                    'profile_image': other_user.profile_image,
-                    'last_message': msg.content,
-                    'date': msg.created_at.strftime('%Y-%m-%d %H:%M'),
-                    'is_unread': unread_count > 0,
-                    'unread_count': unread_count
-                }
-    
-    return jsonify(list(conversations.values())), 200
+    cursor = request.args.get('cursor')
+    paginate = cursor is not None or 'limit' in request.args
+
+    after = None
+    if cursor:
+        after = decode_cursor(cursor, int)
+        if not after:
+            return jsonify({'message': 'Geçersiz imleç.'}), 400
+
+    q = conversations_select(current_user_id, after=after)
+
+    if not paginate:
+        rows = db.session.execute(q).all()
+        return jsonify([serialize_conversation_row(row) for row in rows]), 200
+
+    limit = get_page_limit()
+    rows = db.session.execute(q.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.last_message_at, last.conversation_id)
+
+    return jsonify({
+        'items': [serialize_conversation_row(row) for row in rows[:limit]],
+        'next_cursor': next_cursor
+    }), 200
 
 @messages_bp.route('/<int:other_user_id>', methods=['GET'])
 @jwt_required()
 def get_chat_history(other_user_id):
     """
-    Belirli bir kişiyle olan tüm mesaj geçmişini getirir ve okundu yapar.
+    Belirli bir kişiyle olan mesaj geçmişini getirir ve okundu yapar.
+    ?limit=50&before_id=123 ile sayfalı çalışır: before_id'den önceki en yeni
+    'limit' mesaj (eskiden yeniye sıralı) döner.
     """
     current_user_id = get_jwt_identity()
     if isinstance(current_user_id, str):
          current_user_id = int(current_user_id)
-    
-    unread_messages = Message.query.filter(
-        Message.sender_id == other_user_id,
-        Message.receiver_id == current_user_id,
-        Message.is_read == False
-    ).all()
-
-    if unread_messages:
-        try:
-            for msg in unread_messages:
-                msg.is_read = True
-            
-            db.session.commit()
-            print(f"{len(unread_messages)} adet mesaj okundu olarak işaretlendi.")
-        except Exception as e:
-            db.session.rollback()
-            print(f"HATA: Mesajlar güncellenemedi! {e}")    
-
-    messages = Message.query.filter(
+
+    try:
+        before_id = int(request.args['before_id']) if request.args.get('before_id') else None
+    except ValueError:
+        return jsonify({'message': 'Geçersiz before_id.'}), 400
+    paginate = before_id is not None or 'limit' in request.args
+
+    try:
+        read_count = Message.query.filter(
+            Message.sender_id == other_user_id,
+            Message.receiver_id == current_user_id,
+            Message.is_read == False
+        ).update({'is_read': True}, synchronize_session=False)
+
+        if read_count:
+            Conversation.mark_read(current_user_id, other_user_id)
+            User.query.filter_by(id=current_user_id).update({
+                'unread_count': case((User.unread_count > read_count, User.unread_count - read_count), else_=0)
+            }, synchronize_session=False)
+        db.session.commit()
+
+        if read_count:
+            cache.delete_quietly(unread_key(current_user_id))
+            print(f"{read_count} adet mesaj okundu olarak işaretlendi.")
+    except Exception as e:
+        db.session.rollback()
+        print(f"HATA: Mesajlar güncellenemedi! {e}")    
+
+    q = db.session.query(Message.id, Message.sender_id, Message.content, Message.created_at).filter(
         or_(
             and_(Message.sender_id == current_user_id, Message.receiver_id == other_user_id),
             and_(Message.sender_id == other_user_id, Message.receiver_id == current_user_id)
         )
-    ).order_by(Message.created_at.asc()).all()
+    )
+
+    if paginate:
+        if before_id:
+            q = q.filter(Message.id < before_id)
+        messages = q.order_by(Message.created_at.desc(), Message.id.desc()).limit(get_page_limit(50, 200)).all()
+        messages.reverse()
+    else:
+        messages = q.order_by(Message.created_at.asc(), Message.id.asc()).all()
+
+    # Sohbette yalnızca iki kişi var; gönderen bilgisi mesaj başına değil bir kez çekilir
+    senders = {
+        u.id: u for u in db.session.query(User.id, User.username, User.profile_image)
+                              .filter(User.id.in_([current_user_id, other_user_id]))
+    }
 
     results = []
     for msg in messages:
+        sender = senders.get(msg.sender_id)
         results.append({
             'id': msg.id,
             'sender_id': msg.sender_id,
-            'sender_name': msg.sender.username,
-            'sender_image': msg.sender.profile_image,
+            'sender_name': sender.username if sender else None,
+            'sender_image': sender.profile_image if sender else None,
             'content': msg.content,
             'is_me': (msg.sender_id == current_user_id), 
             'date': msg.created_at.strftime('%H:%M')
         })
-    return jsonify(results), 200
\ No newline at end of file
+    return jsonify(results), 200
@@ -0,0 +1,25 @@
+import hmac
+from flask import Blueprint, current_app, request
+from app import metrics
+from app.metrics import CONTENT_TYPE, render
+from app.security import admin_required
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _has_scrape_token():
+    """Prometheus gibi toplayıcılar için sabit METRICS_TOKEN (Authorization: Bearer ...)."""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode())
+
+def _collect():
+    return current_app.response_class(render(metrics.collect()), content_type=CONTENT_TYPE)
+
+# METRİKLER (Prometheus metin biçimi)
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    if _has_scrape_token():
+        return _collect()
+    return admin_required(_collect)()
@@ -1,51 +1,77 @@
 import os
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
+from werkzeug.exceptions import HTTPException
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_, text
+from sqlalchemy import or_, and_, text
 from datetime import datetime, timedelta
 
 from app.models import Product, ProductImage, User, Transaction
-from app import db
-
-from app.utils import save_file, delete_file_from_url
+from app import db, cache, stats, images, janitor
+from app.cache import product_key
+from app.images import process_product_images, pick_variant, variant_urls
+from app.janitor import schedule_file_deletion
+from app.search import apply_search
+from app.read_models import product_list_select, my_products_select, rows_to_dicts, load_product_detail
+
+from app.utils import (
+    save_file, encode_cursor, decode_cursor, get_page_limit,
+    merge_date_ranges, parse_date_arg
+)
 
 products_bp = Blueprint('products', __name__)
 
 # 1. ÜRÜNLERİ LİSTELE
 @products_bp.route('/', methods=['GET'])
+@cache.cached_response('products')
 def get_products():
+    """
+    Satıştaki ürünleri listeler.
+    'limit' veya 'cursor' verilirse imleç tabanlı sayfalama yapılır:
+    { "items": [...], "next_cursor": "..." }
+    'search' verilirse tam metin arama yapılır (bkz. app/search.py).
+    """
     search_query = request.args.get('search', '')
     category_filter = request.args.get('category', '') 
+    cursor = request.args.get('cursor')
+    paginate = cursor is not None or 'limit' in request.args
 
-    q = Product.query.filter_by(status='available')
+    q = product_list_select()
 
     if category_filter:
-        q = q.filter(Product.category == category_filter)
+        q = q.where(Product.category == category_filter)
 
     if search_query:
-        search_filter = or_(
-            Product.title.ilike(f'%{search_query}%'),
-            Product.description.ilike(f'%{search_query}%'),
-        )
-        q = q.filter(search_filter)
+        # Sayfalı modda sıra (created_at, id) imlecine bağlı olduğundan alaka sıralaması yapılmaz
+        q = apply_search(q, search_query, db.engine.dialect.name, rank=not paginate)
+
+    q = q.order_by(Product.created_at.desc(), Product.id.desc())
+
+    if paginate:
+        limit = get_page_limit()
+        if cursor:
+            decoded = decode_cursor(cursor, int)
+            if not decoded:
+                return jsonify({'message': 'Geçersiz imleç.'}), 400
+            last_created_at, last_id = decoded
+            q = q.where(or_(
+                Product.created_at < last_created_at,
+                and_(Product.created_at == last_created_at, Product.id < last_id)
+            ))
+        rows = db.session.execute(q.limit(limit + 1)).all()
+    else:
+        rows = db.session.execute(q).all()
 
-    all_products = q.order_by(Product.created_at.desc()).all()
-    
-    output = []
-    for product in all_products:
-        output.append({
-            'id': product.id,
-            'title': product.title,
-            'description': product.description,
-            'category': product.category,
-            'price': product.price,
-            'image_url': product.image_url,
-            'status': product.status,
-            'owner_id': product.owner_id,
-            'listing_type': product.listing_type,
-            'created_at': product.created_at
-        })
-    return jsonify(output), 200
+    output = rows_to_dicts(rows[:limit] if paginate else rows)
+
+    if not paginate:
+        return jsonify(output), 200
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return jsonify({'items': output, 'next_cursor': next_cursor}), 200
 
 # 2. ÜRÜN OLUŞTUR
 @products_bp.route('/add', methods=['POST'])
@@ -72,35 +98,38 @@ def create_product():
             owner_id=current_user_id,
             status='available'
         )
-        
-        db.session.add(new_product)
-        db.session.commit()
 
-        files = request.files.getlist('images')
+        # Ürün, resimleri ve istatistikler tek transaction'da (tek commit) yazılır
         saved_urls = []
+        for file in request.files.getlist('images'):
+            if not file or not file.filename: continue
 
-        if files:
-            for file in files:
-                if not file or not file.filename: continue
-
-                file_url = save_file(file, folder_name='products', specific_id=new_product.id)
-                
-                if file_url:
-                    saved_urls.append(file_url)
-                    img_entry = ProductImage(image_url=file_url, product_id=new_product.id)
-                    db.session.add(img_entry)
-            
-            db.session.commit()
+            file_url = save_file(file)
+            if file_url:
+                saved_urls.append(file_url)
+                new_product.images.append(ProductImage(image_url=file_url))
 
         if saved_urls:
             new_product.image_url = saved_urls[0]
-            db.session.commit()
+
+        db.session.add(new_product)
+        stats.adjust(active_products=1)
+        stats.record_daily(new_products=1)
+        db.session.commit()
+
+        cache.bump_catalog_version()
+        if saved_urls:
+            images.submit(process_product_images, new_product.id)
 
         return jsonify({
             'message': 'Ürün ve resimler başarıyla kaydedildi.',
             'product_id': new_product.id
         }), 201
 
+    except HTTPException:
+        # Boyut/tür sınırları (413/415) uygulama seviyesindeki JSON hata yanıtlarına bırakılır
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         print(f"HATA OLUŞTU: {e}")
@@ -108,11 +137,15 @@ def create_product():
 
 # 3. TEK ÜRÜN DETAYI
 @products_bp.route('/<int:product_id>', methods=['GET'])
+@cache.cached_response('product', key=lambda product_id: product_key(product_id))
 def get_single_product(product_id):
-    product = Product.query.get_or_404(product_id)
-    owner = User.query.get(product.owner_id)
+    product = load_product_detail(product_id)
+    if not product:
+        abort(404)
+    owner = product.owner
 
-    images_list = [img.image_url for img in product.images]
+    # İşlenmiş resimler için 'full' türev (en fazla 1600px, EXIF'siz) döner
+    images_list = [pick_variant(img.variants, 'full') or img.image_url for img in product.images]
 
     return jsonify({
         'id': product.id,
@@ -139,21 +172,8 @@ def get_single_product(product_id):
 def get_my_products():
     current_user_id = int(get_jwt_identity())
     
-    my_products = Product.query.filter_by(owner_id=current_user_id)\
-                        .order_by(Product.created_at.desc()).all()
-    
-    output = []
-    for product in my_products:
-        output.append({
-            'id': product.id,
-            'title': product.title,
-            'price': product.price,
-            'image_url': product.image_url,
-            'status': product.status,
-            'category': product.category,
-            'listing_type': product.listing_type
-        })
-    return jsonify(output), 200
+    rows = db.session.execute(my_products_select(current_user_id)).all()
+    return jsonify(rows_to_dicts(rows)), 200
 
 # 5. ÜRÜN GÜNCELLE 
 @products_bp.route('/<int:product_id>', methods=['PUT'])
@@ -171,9 +191,13 @@ def update_product(product_id):
         if 'description' in data: product.description = data['description']
         if 'price' in data: product.price = data['price']
         if 'category' in data: product.category = data['category']
-        if 'status' in data: product.status = data['status']
+        if 'status' in data and data['status'] != product.status:
+            was_active = product.status == 'available'
+            product.status = data['status']
+            stats.adjust(active_products=int(product.status == 'available') - int(was_active))
         
         db.session.commit()
+        cache.invalidate_product(product_id)
         return jsonify({'message': 'Ürün güncellendi.'}), 200
     else:
         return jsonify({'message': 'Veri gönderilmedi.'}), 400
@@ -191,7 +215,9 @@ def delete_product(product_id):
 
     try:
         images_to_delete = ProductImage.query.filter_by(product_id=product_id).all()
-        image_urls = [img.image_url for img in images_to_delete]
+        image_urls = [url for img in images_to_delete for url in [img.image_url, *variant_urls(img.variants)]]
+
+        stats.record_product_removed(product)
 
         Transaction.query.filter_by(product_id=product_id).delete(synchronize_session=False)
         
@@ -206,14 +232,11 @@ def delete_product(product_id):
 
         ProductImage.query.filter_by(product_id=product_id).delete(synchronize_session=False)
         db.session.delete(product)
+        schedule_file_deletion(*image_urls)
         
         db.session.commit()
-
-        for url in image_urls:
-            try:
-                delete_file_from_url(url)
-            except:
-                pass
+        cache.invalidate_product(product_id)
+        janitor.wake()
             
         return jsonify({'message': 'Ürün ve tüm verileri başarıyla silindi.'}), 200
 
@@ -225,22 +248,36 @@ def delete_product(product_id):
 #  7. TAKVİM DOLULUK BİLGİSİ
 @products_bp.route('/<int:product_id>/availability', methods=['GET'])
 def get_product_availability(product_id):
+    """
+    Onaylı kiralamaların kapladığı tarihleri birleştirilmiş aralıklar olarak döner:
+    [["2026-01-01", "2026-01-05"], ...]
+    Opsiyonel ?from=YYYY-MM-DD&to=YYYY-MM-DD penceresi ile yalnızca çakışan kiralamalar sorgulanır.
+    """
     try:
-        rentals = Transaction.query.filter_by(product_id=product_id, status='APPROVED').all()
-        
-        booked_dates = []
-        
-        for rental in rentals:
-            if not rental.start_date or not rental.end_date:
-                continue
-
-            current_date = rental.start_date
-            while current_date <= rental.end_date:
-                booked_dates.append(current_date.strftime('%Y-%m-%d'))
-                current_date += timedelta(days=1)
-        
-        return jsonify(booked_dates), 200
+        try:
+            window_start = parse_date_arg('from')
+            window_end = parse_date_arg('to')
+        except ValueError:
+            return jsonify({'message': 'Tarih formatı geçersiz.'}), 400
+
+        q = db.session.query(Transaction.start_date, Transaction.end_date).filter(
+            Transaction.product_id == product_id,
+            Transaction.status == 'APPROVED',
+            Transaction.start_date.isnot(None),
+            Transaction.end_date.isnot(None)
+        )
+        if window_start:
+            q = q.filter(Transaction.end_date >= window_start)
+        if window_end:
+            q = q.filter(Transaction.start_date <= window_end)
+
+        rentals = q.order_by(Transaction.start_date).all()
+        booked_ranges = merge_date_ranges((r.start_date, r.end_date) for r in rentals)
+
+        return jsonify([
+            [start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')] for start, end in booked_ranges
+        ]), 200
 
     except Exception as e:
         print(f"HATA DETAYI: {e}") 
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
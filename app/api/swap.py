@@ -1,6 +1,6 @@
 from flask import request, jsonify, Blueprint
 from app.models import Product, SwapOffer, OfferStatus
-from app import db
+from app import db, events
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_cors import cross_origin
 
@@ -52,6 +52,8 @@ def make_swap_offer():
     db.session.add(new_offer)
     db.session.commit()
 
+    events.publish(target_product.owner_id, 'request', {'type': 'swap_offer', 'id': new_offer.id})
+
     return jsonify({
         'message': 'Takas teklifi başarıyla gönderildi.',
         'offer_id': new_offer.id,
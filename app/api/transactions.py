@@ -1,10 +1,14 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime
 from app.models import Product, Transaction, User, SwapOffer
-from app import db
+from app import db, cache, events, stats
+from app.booking import is_booking_conflict
+from app.read_models import request_feed_select, serialize_request_row
+from app.utils import encode_cursor, decode_cursor, get_page_limit
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_cors import cross_origin
-from operator import itemgetter 
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
 
 transactions_bp = Blueprint('transactions', __name__)
 
@@ -44,6 +48,10 @@ def create_swap_offer():
         db.session.add(new_offer)
         db.session.commit()
 
+        target_owner_id = db.session.query(Product.owner_id).filter(Product.id == target_product_id).scalar()
+        if target_owner_id:
+            events.publish(target_owner_id, 'request', {'type': 'swap_offer', 'id': new_offer.id})
+
         return jsonify({'message': 'Takas teklifi başarıyla gönderildi.'}), 201
 
     except Exception as e:
@@ -63,24 +71,44 @@ def buy_product():
     
     if not product_id: return jsonify({'message': 'product_id zorunludur.'}), 400
 
-    product = Product.query.get(product_id)
-    if not product: return jsonify({'message': 'Ürün bulunamadı.'}), 404
-    if product.status != 'available': return jsonify({'message': 'Bu ürün artık satışta değil.'}), 400
-    if product.listing_type == 'rent': return jsonify({'message': 'Bu ürün sadece kiralıktır.'}), 400
-    if product.owner_id == current_user_id: return jsonify({'message': 'Kendi ürününüzü alamazsınız.'}), 400
-
     try:
-        product.status = 'sold' 
+        # Koşullu tek UPDATE: ürün hâlâ satıştaysa 'sold' yapılır. Eşzamanlı alıcılardan
+        # yalnızca biri satırı güncelleyebilir, diğerleri 0 satır etkiler.
+        sold = db.session.execute(
+            update(Product)
+            .where(
+                Product.id == product_id,
+                Product.status == 'available',
+                or_(Product.listing_type.is_(None), Product.listing_type != 'rent'),
+                Product.owner_id != current_user_id
+            )
+            .values(status='sold')
+            .returning(Product.id, Product.owner_id, Product.price)
+            .execution_options(synchronize_session=False)
+        ).first()
+
+        if not sold:
+            db.session.rollback()
+            product = db.session.get(Product, product_id)
+            if not product: return jsonify({'message': 'Ürün bulunamadı.'}), 404
+            if product.listing_type == 'rent': return jsonify({'message': 'Bu ürün sadece kiralıktır.'}), 400
+            if product.owner_id == current_user_id: return jsonify({'message': 'Kendi ürününüzü alamazsınız.'}), 400
+            return jsonify({'message': 'Bu ürün artık satışta değil.'}), 400
+
         new_transaction = Transaction(
-            product_id=product.id,
+            product_id=sold.id,
             buyer_id=current_user_id,
-            seller_id=product.owner_id,
+            seller_id=sold.owner_id,
             transaction_type='SALE',
-            price=product.price,
+            price=sold.price,
             status='COMPLETED'
         )
         db.session.add(new_transaction)
+        stats.adjust(active_products=-1)
+        stats.record_completed_transaction(sold.price)
         db.session.commit()
+        cache.invalidate_product(sold.id)
+        events.publish(sold.owner_id, 'request', {'type': 'transaction', 'id': new_transaction.id})
 
         return jsonify({'message': 'Satın alma başarılı.', 'transaction_id': new_transaction.id}), 201
     except Exception as e:
@@ -106,16 +134,20 @@ def rent_product():
     try:
         s_date_clean = str(start_date_str).split('T')[0]
         e_date_clean = str(end_date_str).split('T')[0]
-        start_date = datetime.strptime(s_date_clean, '%Y-%m-%d')
-        end_date = datetime.strptime(e_date_clean, '%Y-%m-%d')
+        start_date = datetime.strptime(s_date_clean, '%Y-%m-%d').date()
+        end_date = datetime.strptime(e_date_clean, '%Y-%m-%d').date()
     except ValueError:
         return jsonify({'message': 'Tarih formatı geçersiz.'}), 400
 
+    if end_date < start_date:
+        return jsonify({'message': 'Bitiş tarihi başlangıçtan önce olamaz.'}), 400
+
     product = Product.query.get(product_id)
     if not product: return jsonify({'message': 'Ürün bulunamadı.'}), 404
     if product.status != 'available': return jsonify({'message': 'Ürün müsait değil.'}), 400
     
-    conflicting_approved = Transaction.query.filter(
+    # Erken uyarı amaçlı; asıl çakışma kuralı onay sırasında veritabanında uygulanır (app/booking.py)
+    conflicting_approved = db.session.query(Transaction.id).filter(
         Transaction.product_id == product_id,
         Transaction.status == 'APPROVED',
         Transaction.start_date <= end_date,
@@ -142,69 +174,56 @@ def rent_product():
         )
         db.session.add(new_transaction)
         db.session.commit()
+        events.publish(product.owner_id, 'request', {'type': 'transaction', 'id': new_transaction.id})
         return jsonify({'message': 'Kiralama talebi oluşturuldu.', 'transaction_id': new_transaction.id}), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Hata oluştu.', 'error': str(e)}), 500
 
 
+def _request_feed(direction):
+    """
+    Gelen/giden talepleri tek UNION ALL sorgusuyla döner.
+    ?status=PENDING ile filtrelenebilir. 'limit' veya 'cursor' verilirse
+    { "items": [...], "next_cursor": "..." } biçiminde sayfalı döner.
+    """
+    current_user_id = int(get_jwt_identity())
+    status = request.args.get('status')
+    cursor = request.args.get('cursor')
+    paginate = cursor is not None or 'limit' in request.args
+
+    after = None
+    if cursor:
+        after = decode_cursor(cursor, str, int)
+        if not after:
+            return jsonify({'message': 'Geçersiz imleç.'}), 400
+
+    q = request_feed_select(current_user_id, direction, status=status.upper() if status else None, after=after)
+
+    if not paginate:
+        rows = db.session.execute(q).all()
+        return jsonify([serialize_request_row(row, direction) for row in rows]), 200
+
+    limit = get_page_limit()
+    rows = db.session.execute(q.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.type, last.id)
+
+    return jsonify({
+        'items': [serialize_request_row(row, direction) for row in rows[:limit]],
+        'next_cursor': next_cursor
+    }), 200
+
+
 #  4. GELEN TALEPLER
 @transactions_bp.route('/incoming', methods=['GET'])
 @cross_origin()
 @jwt_required()
 def get_incoming_requests():
-    current_user_id = int(get_jwt_identity())
-    results = []
-
-    transactions = Transaction.query.filter_by(seller_id=current_user_id).all()
-    for t in transactions:
-        product = Product.query.get(t.product_id)
-        buyer = User.query.get(t.buyer_id)
-        
-        results.append({
-            'type': 'transaction',
-            'id': t.id,
-            'product_title': product.title if product else 'Silinmiş Ürün',
-            'product_image': product.image_url if product else None,
-            'buyer_name': buyer.username if buyer else 'Bilinmeyen',
-            'other_party_name': buyer.username if buyer else 'Bilinmeyen',
-            'transaction_type': t.transaction_type, 
-            'status': t.status, 
-            'price': float(t.price),
-            'start_date': t.start_date.strftime('%Y-%m-%d') if t.start_date else None,
-            'end_date': t.end_date.strftime('%Y-%m-%d') if t.end_date else None,
-            'date': t.created_at.strftime('%Y-%m-%d %H:%M'),
-            'message': None
-        })
-
-    swap_offers = SwapOffer.query.join(Product, SwapOffer.target_product_id == Product.id)\
-                  .filter(Product.owner_id == current_user_id).all()
-    
-    for s in swap_offers:
-        target_p = Product.query.get(s.target_product_id)
-        offered_p = Product.query.get(s.offered_product_id)
-        offerer = User.query.get(s.offerer_id)
-
-        results.append({
-            'type': 'swap_offer',
-            'id': s.id,
-            'product_title': target_p.title if target_p else 'Silinmiş',
-            'product_image': target_p.image_url if target_p else None,
-            'buyer_name': offerer.username if offerer else 'Bilinmeyen',
-            'other_party_name': offerer.username if offerer else 'Bilinmeyen',
-            'transaction_type': 'swap',
-            'status': s.status,
-            'price': 0,
-            'start_date': None,
-            'end_date': None,
-            'swap_product_title': offered_p.title if offered_p else 'Silinmiş',
-            'swap_product_image': offered_p.image_url if offered_p else None,
-            'date': s.created_at.strftime('%Y-%m-%d %H:%M'),
-            'message': s.message 
-        })
-
-    results.sort(key=itemgetter('date'), reverse=True)
-    return jsonify(results), 200
+    return _request_feed('incoming')
 
 
 #  5. GİDEN TALEPLER
@@ -212,57 +231,7 @@ def get_incoming_requests():
 @cross_origin()
 @jwt_required()
 def get_outgoing_requests():
-    current_user_id = int(get_jwt_identity())
-    results = []
-
-    transactions = Transaction.query.filter_by(buyer_id=current_user_id).all()
-    for t in transactions:
-        product = Product.query.get(t.product_id)
-        seller = User.query.get(t.seller_id)
-
-        results.append({
-            'type': 'transaction',
-            'id': t.id,
-            'product_title': product.title if product else 'Silinmiş',
-            'product_image': product.image_url if product else None,
-            'seller_name': seller.username if seller else 'Bilinmeyen',
-            'other_party_name': seller.username if seller else 'Bilinmeyen',
-            'transaction_type': t.transaction_type, 
-            'status': t.status, 
-            'price': float(t.price),
-            'start_date': t.start_date.strftime('%Y-%m-%d') if t.start_date else None,
-            'end_date': t.end_date.strftime('%Y-%m-%d') if t.end_date else None,
-            'date': t.created_at.strftime('%Y-%m-%d %H:%M'),
-            'message': None
-        })
-
-    my_swaps = SwapOffer.query.filter_by(offerer_id=current_user_id).all()
-    
-    for s in my_swaps:
-        target_p = Product.query.get(s.target_product_id)
-        offered_p = Product.query.get(s.offered_product_id)
-        target_owner = User.query.get(target_p.owner_id) if target_p else None
-
-        results.append({
-            'type': 'swap_offer',
-            'id': s.id,
-            'product_title': target_p.title if target_p else 'Silinmiş',
-            'product_image': target_p.image_url if target_p else None,
-            'seller_name': target_owner.username if target_owner else 'Bilinmeyen',
-            'other_party_name': target_owner.username if target_owner else 'Bilinmeyen',
-            'transaction_type': 'swap',
-            'status': s.status,
-            'price': 0,
-            'start_date': None,
-            'end_date': None,
-            'swap_product_title': offered_p.title if offered_p else 'Silinmiş',
-            'swap_product_image': offered_p.image_url if offered_p else None,
-            'date': s.created_at.strftime('%Y-%m-%d %H:%M'),
-            'message': s.message 
-        })
-
-    results.sort(key=itemgetter('date'), reverse=True)
-    return jsonify(results), 200
+    return _request_feed('outgoing')
 
 
 #  6. TALEP ONAYLA / REDDET
@@ -307,8 +276,11 @@ def respond_to_request(id):
                 target_p = Product.query.get(target_record.target_product_id)
                 offered_p = Product.query.get(target_record.offered_product_id)
                 
-                if target_p: target_p.status = 'sold'
-                if offered_p: offered_p.status = 'sold'
+                for p in (target_p, offered_p):
+                    if p and p.status != 'sold':
+                        if p.status == 'available':
+                            stats.adjust(active_products=-1)
+                        p.status = 'sold'
 
                 new_transaction = Transaction(
                     product_id=target_record.target_product_id,
@@ -320,6 +292,7 @@ def respond_to_request(id):
                 )
                 
                 db.session.add(new_transaction)
+                stats.record_completed_transaction(0)
 
             except Exception as e:
                 db.session.rollback()
@@ -332,8 +305,24 @@ def respond_to_request(id):
     
     try:
         db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_booking_conflict(e):
+            return jsonify({'message': 'Bu tarihlerde ürün için onaylanmış başka bir kiralama var.'}), 409
+        return jsonify({'message': 'Veritabanı hatası.', 'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': 'Veritabanı hatası.', 'error': str(e)}), 500
 
+    if record_type == 'swap' and action == 'approve':
+        cache.invalidate_product(target_record.target_product_id)
+        cache.invalidate_product(target_record.offered_product_id)
+
+    requester_id = target_record.buyer_id if record_type == 'transaction' else target_record.offerer_id
+    events.publish(requester_id, 'request_update', {
+        'type': 'transaction' if record_type == 'transaction' else 'swap_offer',
+        'id': target_record.id,
+        'status': target_record.status
+    })
+
     return jsonify({'message': f'Talep {action} edildi.', 'new_status': target_record.status}), 200
\ No newline at end of file
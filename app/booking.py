@@ -0,0 +1,68 @@
+from sqlalchemy import DDL, event
+from sqlalchemy.exc import IntegrityError
+from app.models import Transaction
+
+# Kiralama çakışma kuralı veritabanında uygulanır:
+# aynı ürün için iki APPROVED kiralamanın tarih aralıkları kesişemez.
+# PostgreSQL: daterange üzerinde EXCLUDE (gist) kısıtı.
+# SQLite:     yazma işlemleri zaten tek tek (serileştirilmiş) yürüdüğünden, aynı kontrolü
+#             INSERT/UPDATE öncesi çalışan trigger'lar yapar.
+# Çakışma, ilgili yazma (INSERT/UPDATE) sırasında IntegrityError olarak döner; ayrı bir
+# "önce kontrol et, sonra yaz" adımına gerek kalmaz.
+
+CONSTRAINT_NAME = 'transactions_no_overlapping_rentals'
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    f"""
+    ALTER TABLE transactions ADD CONSTRAINT {CONSTRAINT_NAME}
+    EXCLUDE USING gist (
+        product_id WITH =,
+        daterange(start_date, end_date, '[]') WITH &&
+    ) WHERE (status = 'APPROVED' AND start_date IS NOT NULL AND end_date IS NOT NULL)
+    """,
+]
+
+SQLITE_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_no_overlap_insert BEFORE INSERT ON transactions
+    WHEN NEW.status = 'APPROVED' AND NEW.start_date IS NOT NULL AND NEW.end_date IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, '{CONSTRAINT_NAME}')
+        WHERE EXISTS (
+            SELECT 1 FROM transactions t
+            WHERE t.product_id = NEW.product_id
+              AND t.status = 'APPROVED'
+              AND t.start_date <= NEW.end_date
+              AND t.end_date >= NEW.start_date
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_no_overlap_update
+    BEFORE UPDATE OF status, start_date, end_date, product_id ON transactions
+    WHEN NEW.status = 'APPROVED' AND NEW.start_date IS NOT NULL AND NEW.end_date IS NOT NULL
+    BEGIN
+        SELECT RAISE(ABORT, '{CONSTRAINT_NAME}')
+        WHERE EXISTS (
+            SELECT 1 FROM transactions t
+            WHERE t.product_id = NEW.product_id
+              AND t.id != NEW.id
+              AND t.status = 'APPROVED'
+              AND t.start_date <= NEW.end_date
+              AND t.end_date >= NEW.start_date
+        );
+    END
+    """,
+]
+
+for _statement in POSTGRES_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+for _statement in SQLITE_DDL:
+    event.listen(Transaction.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+def is_booking_conflict(error):
+    """IntegrityError'ın kiralama çakışma kuralından gelip gelmediğini söyler."""
+    return isinstance(error, IntegrityError) and CONSTRAINT_NAME in str(error.orig)
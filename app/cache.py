@@ -0,0 +1,234 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Okuma ağırlıklı uç noktalar için yanıt önbelleği.
+# Anahtarlar "katalog sürümü" içerir; ürün yazan her işlem sürümü artırır,
+# böylece eski kayıtlar silinmeden geçersiz hale gelir (TTL/LRU ile düşer).
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def product_key(product_id):
+    return f'product:{product_id}'
+
+def unread_key(user_id):
+    return f'unread:{user_id}'
+
+def token_stamp_key(user_id):
+    return f'token-stamp:{user_id}'
+
+
+class MemoryBackend:
+    """Süreç içi LRU + TTL önbellek."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        # Sayaçlar LRU dışında tutulur, tahliye edilmez
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+
+class RedisBackend:
+    """Redis protokolü konuşan bir istemci (redis.Redis veya eşdeğeri) üzerinde önbellek."""
+
+    def __init__(self, client, prefix='urun:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+    def get_counter(self, key):
+        value = self.client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+
+class Cache:
+    """
+    Flask eklentisi. Ayarlar:
+    CACHE_TYPE ('memory' | 'redis'), CACHE_REDIS_URL, CACHE_DEFAULT_TTL, CACHE_MAX_ENTRIES
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = 300
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        app.config.setdefault('CACHE_TYPE', 'memory')
+        app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('CACHE_DEFAULT_TTL', 300)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+
+        if backend is not None:
+            self.backend = backend
+        elif app.config['CACHE_TYPE'] == 'redis':
+            if redis is None:
+                raise RuntimeError("CACHE_TYPE='redis' için 'redis' paketi kurulu olmalı.")
+            self.backend = RedisBackend(redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+        else:
+            self.backend = MemoryBackend(app.config['CACHE_MAX_ENTRIES'])
+            if not (app.debug or app.testing):
+                # Katalog sürümü, ürün kayıtları ve okunmamış sayaçları süreç içinde kalır;
+                # birden çok worker'da bir yazma diğerlerinde TTL dolana kadar görünmez
+                print("UYARI: CACHE_TYPE='memory' yalnızca tek süreçlik kurulum içindir; "
+                      "birden çok worker varsa CACHE_TYPE='redis' kullanın.")
+
+        app.extensions['cache'] = self
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl if ttl is not None else self.default_ttl)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    # Yardımcı sayaçlar/damgalar için: önbellek hatası isteği bozmaz, yalnızca loglanır
+
+    def get_quietly(self, key):
+        try:
+            return self.get(key)
+        except Exception as e:
+            print(f"Önbellek okunamadı ({key}): {e}")
+            return None
+
+    def set_quietly(self, key, value, ttl=None):
+        try:
+            self.set(key, value, ttl)
+        except Exception as e:
+            print(f"Önbelleğe yazılamadı ({key}): {e}")
+
+    def delete_quietly(self, key):
+        try:
+            self.delete(key)
+        except Exception as e:
+            print(f"Önbellekten silinemedi ({key}): {e}")
+
+    def catalog_version(self):
+        return self.backend.get_counter(CATALOG_VERSION_KEY)
+
+    def bump_catalog_version(self):
+        """Ürün verisi değiştiğinde çağrılır; önbellekteki tüm ürün yanıtlarını geçersiz kılar."""
+        try:
+            return self.backend.incr(CATALOG_VERSION_KEY)
+        except Exception as e:
+            print(f"Önbellek sürümü artırılamadı: {e}")
+            return None
+
+    def invalidate_product(self, product_id):
+        """Tek ürünün detay önbelleğini siler ve listeleri geçersiz kılar."""
+        try:
+            self.delete(product_key(product_id))
+        except Exception as e:
+            print(f"Ürün önbelleği silinemedi: {e}")
+        return self.bump_catalog_version()
+
+    def cached_response(self, namespace, ttl=None, key=None):
+        """
+        GET görünümlerinin JSON yanıtını katalog sürümü + URL parametreleriyle önbelleğe alır.
+        key verilirse (görünüm argümanlarını alan fonksiyon) anahtar ondan üretilir ve
+        kayıt yalnızca açıkça silindiğinde (ya da TTL dolunca) geçersiz olur.
+        ETag üretir, If-None-Match eşleşirse 304 döner.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Anahtar da önbellekten (katalog sürümü) okunur; önbellek erişilemezse
+                # yanıt önbelleksiz üretilir
+                try:
+                    cache_key = key(**kwargs) if key else self._make_key(namespace)
+                    hit = self.get(cache_key)
+                except Exception as e:
+                    print(f"Önbellek okunamadı: {e}")
+                    cache_key = hit = None
+
+                if hit is not None:
+                    entry = json.loads(hit)
+                    response = make_response(entry['body'], 200)
+                    response.mimetype = 'application/json'
+                    response.set_etag(entry['etag'])
+                    response.headers['X-Cache'] = 'HIT'
+                    return response.make_conditional(request)
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+                body = response.get_data(as_text=True)
+                etag = hashlib.md5(body.encode('utf-8')).hexdigest()
+                if cache_key is not None:
+                    try:
+                        self.set(cache_key, json.dumps({'etag': etag, 'body': body}), ttl)
+                    except Exception as e:
+                        print(f"Önbelleğe yazılamadı: {e}")
+
+                response.set_etag(etag)
+                response.headers['X-Cache'] = 'MISS' if cache_key is not None else 'BYPASS'
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    def _make_key(self, namespace):
+        args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        return f'{namespace}:v{self.catalog_version()}:{request.path}?{args}'
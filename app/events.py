@@ -0,0 +1,256 @@
+import json
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Sunucudan istemciye anlık bildirimler (Server-Sent Events) için yayın/abone altyapısı.
+# Olaylar kullanıcı bazında yayınlanır; her olayın artan bir id'si vardır, böylece
+# yeniden bağlanan istemci Last-Event-ID ile kaçırdıklarını alabilir.
+# 'memory' arka ucu tek süreç içindir; birden çok worker için 'redis' kullanılır.
+# Bellek arka ucunda id'ler süreç yeniden başlayınca sıfırdan başlar ve her worker'da
+# ayrıdır; bu yüzden arka ucun son id'sinden büyük bir Last-Event-ID eski bir oturumdan
+# kalmış sayılır ve akış baştan (tüm geçmişle) başlatılır.
+
+
+class Subscription:
+    """Tek bir SSE bağlantısının sınırlı kuyruğu. Dolarsa en eski olay atılır."""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class MemoryBackend:
+    """Süreç içi yayıncı: abonelere doğrudan dağıtır, son olayları bellekte tutar."""
+
+    def __init__(self, replay_size=100):
+        self.replay_size = replay_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._history = defaultdict(lambda: deque(maxlen=self.replay_size))
+        self._last_id = 0
+
+    def publish(self, user_id, event_type, data):
+        with self._lock:
+            self._last_id += 1
+            event = {'id': self._last_id, 'type': event_type, 'data': data}
+            self._history[user_id].append(event)
+        self.dispatch(user_id, event)
+        return event['id']
+
+    def dispatch(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for sub in subscribers:
+            sub.put(event)
+
+    def subscribe(self, sub):
+        with self._lock:
+            self._subscribers[sub.user_id].add(sub)
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def replay(self, user_id, last_event_id):
+        with self._lock:
+            return [e for e in self._history.get(user_id, ()) if e['id'] > last_event_id]
+
+    def current_id(self):
+        with self._lock:
+            return self._last_id
+
+
+class RedisBackend(MemoryBackend):
+    """
+    Redis protokolü üzerinden çok worker'lı yayın: olay id'leri INCR ile, son olaylar
+    kullanıcı başına bir listede tutulur; her worker tek bir dinleyici thread ile
+    kendi yerel abonelerine dağıtır.
+    """
+
+    reconnect_delays = (1, 2, 5, 10, 30)
+
+    def __init__(self, client, replay_size=100, prefix='urun:events:'):
+        super().__init__(replay_size)
+        self.client = client
+        self.prefix = prefix
+        self._listener = None
+
+    def publish(self, user_id, event_type, data):
+        event_id = int(self.client.incr(self.prefix + 'seq'))
+        payload = json.dumps({'id': event_id, 'type': event_type, 'data': data, 'user_id': user_id})
+        history_key = f'{self.prefix}history:{user_id}'
+        self.client.rpush(history_key, payload)
+        self.client.ltrim(history_key, -self.replay_size, -1)
+        self.client.publish(f'{self.prefix}user:{user_id}', payload)
+        return event_id
+
+    def subscribe(self, sub):
+        self._ensure_listener()
+        super().subscribe(sub)
+
+    def current_id(self):
+        return int(self.client.get(self.prefix + 'seq') or 0)
+
+    def replay(self, user_id, last_event_id):
+        events = []
+        for raw in self.client.lrange(f'{self.prefix}history:{user_id}', 0, -1):
+            event = json.loads(raw)
+            if event['id'] > last_event_id:
+                event.pop('user_id', None)
+                events.append(event)
+        return events
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        # Bağlantı koparsa artan beklemeyle yeniden abone olunur; kopukken yayınlanan
+        # olaylar (kopmadan önce görülen son id'den sonrası) geçmişten yerel abonelere
+        # yeniden dağıtılır. Akış id'si gönderilmiş olanları tekrar yazmaz.
+        attempt = 0
+        seen_id = None
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f'{self.prefix}user:*')
+                if seen_id is None:
+                    seen_id = self.current_id()
+                else:
+                    self._resync(seen_id)
+                attempt = 0
+                for message in pubsub.listen():
+                    if message.get('type') != 'pmessage':
+                        continue
+                    try:
+                        event = json.loads(message['data'])
+                        user_id = event.pop('user_id')
+                        seen_id = max(seen_id, event['id'])
+                        self.dispatch(user_id, event)
+                    except Exception as e:
+                        print(f"Olay dağıtılamadı: {e}")
+            except Exception as e:
+                delay = self.reconnect_delays[min(attempt, len(self.reconnect_delays) - 1)]
+                print(f"Olay dinleyicisi koptu, {delay} sn sonra yeniden bağlanılacak: {e}")
+                attempt += 1
+                if pubsub is not None and hasattr(pubsub, 'close'):
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+                time.sleep(delay)
+
+    def _resync(self, after_id):
+        with self._lock:
+            user_ids = list(self._subscribers)
+        for user_id in user_ids:
+            for event in self.replay(user_id, after_id):
+                self.dispatch(user_id, event)
+
+
+class EventBroker:
+    """
+    Flask eklentisi. Ayarlar:
+    EVENTS_BACKEND ('memory' | 'redis'), EVENTS_REDIS_URL, EVENTS_QUEUE_SIZE,
+    EVENTS_REPLAY_SIZE, EVENTS_HEARTBEAT (saniye)
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.queue_size = 100
+        self.heartbeat = 15
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        app.config.setdefault('EVENTS_BACKEND', 'memory')
+        app.config.setdefault('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('EVENTS_QUEUE_SIZE', 100)
+        app.config.setdefault('EVENTS_REPLAY_SIZE', 100)
+        app.config.setdefault('EVENTS_HEARTBEAT', 15)
+
+        self.queue_size = app.config['EVENTS_QUEUE_SIZE']
+        self.heartbeat = app.config['EVENTS_HEARTBEAT']
+        replay_size = app.config['EVENTS_REPLAY_SIZE']
+
+        if backend is not None:
+            self.backend = backend
+        elif app.config['EVENTS_BACKEND'] == 'redis':
+            if redis is None:
+                raise RuntimeError("EVENTS_BACKEND='redis' için 'redis' paketi kurulu olmalı.")
+            self.backend = RedisBackend(redis.Redis.from_url(app.config['EVENTS_REDIS_URL']), replay_size)
+        else:
+            self.backend = MemoryBackend(replay_size)
+
+        app.extensions['events'] = self
+
+    def publish(self, user_id, event_type, data=None):
+        """Kullanıcıya olay gönderir. Hata isteği bozmaz, yalnızca loglanır."""
+        try:
+            return self.backend.publish(int(user_id), event_type, data or {})
+        except Exception as e:
+            print(f"Olay yayınlanamadı ({event_type}): {e}")
+            return None
+
+    def stream(self, user_id, last_event_id=None):
+        """
+        SSE metin akışı üreten generator. Önce kaçırılan olaylar (last_event_id sonrası),
+        sonra canlı olaylar gönderilir; boşta kalınca heartbeat yorumu yazılır.
+        Arka ucun son id'sinden büyük last_event_id eski bir oturumdandır, 0 sayılır.
+        """
+        sub = Subscription(user_id, self.queue_size)
+        self.backend.subscribe(sub)
+        try:
+            yield f'retry: {self.heartbeat * 1000}\n\n'
+            if last_event_id is not None and last_event_id > self.backend.current_id():
+                last_event_id = 0
+            sent_id = last_event_id or 0
+            if last_event_id is not None:
+                for event in self.backend.replay(user_id, last_event_id):
+                    sent_id = max(sent_id, event['id'])
+                    yield format_sse(event)
+            while True:
+                event = sub.get(timeout=self.heartbeat)
+                if event is None:
+                    yield ': heartbeat\n\n'
+                elif event['id'] > sent_id:
+                    sent_id = event['id']
+                    yield format_sse(event)
+        finally:
+            self.backend.unsubscribe(sub)
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
@@ -0,0 +1,201 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask.cli import AppGroup
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# Yüklenen resimler için arka plan işleme hattı.
+# Her kaynak resimden VARIANTS boyutlarında WebP ve JPEG türevleri üretilir ve içerik
+# adresli depoya (app/storage.py) yazılır. Türevler yeniden kodlandığı için EXIF (konum,
+# cihaz vb.) taşımaz; yön bilgisi önce piksellere uygulanır.
+# İşler commit'ten sonra sınırlı bir thread havuzunda yürür, istek beklemez. Havuz doluysa
+# iş atlanır; eksik türevler 'flask images process' ile tamamlanır.
+# Pillow kurulu değilse hat devre dışıdır ve uç noktalar orijinal resmi döner.
+
+VARIANTS = {'thumb': 320, 'card': 800, 'full': 1600}
+PROFILE_VARIANTS = ('thumb', 'card')
+FORMATS = {
+    'webp': ('WEBP', '.webp', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', '.jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_urls(variants):
+    """Türev sözlüğündeki tüm URL'ler (dosya silerken kullanılır)."""
+    return [url for formats in (variants or {}).values() for url in formats.values()]
+
+def pick_variant(variants, name, fmt='webp'):
+    return ((variants or {}).get(name) or {}).get(fmt)
+
+def _flatten(img):
+    """JPEG saydamlık desteklemez; saydam resimler beyaz zemine oturtulur."""
+    if img.mode in ('RGB', 'L'):
+        return img
+    img = img.convert('RGBA')
+    background = Image.new('RGB', img.size, (255, 255, 255))
+    background.paste(img, mask=img.getchannel('A'))
+    return background
+
+def render_variants(source_url, names=tuple(VARIANTS)):
+    """
+    Türevleri depoya yazar; {'thumb': {'webp': url, 'jpeg': url}, ...} döner.
+    Her türev bir depo referansıdır (commit çağırana aittir). Yarıda hata olursa o ana
+    kadar yazılan türevler silinmek üzere kuyruğa eklenir ve hata yeniden fırlatılır.
+    """
+    from app import storage
+    from app.janitor import schedule_file_deletion
+
+    saved = []
+    try:
+        with storage.open(source_url) as source, Image.open(source) as img:
+            # JPEG'de draft, kodu çözerken ölçekler; büyük telefon fotoğraflarında belleği ve süreyi düşürür
+            largest = max(VARIANTS[name] for name in names)
+            img.draft('RGB', (largest, largest))
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                img = img.convert('RGBA')
+
+            result = {}
+            for name in sorted(names, key=VARIANTS.get, reverse=True):
+                size = VARIANTS[name]
+                img.thumbnail((size, size), Image.Resampling.LANCZOS)
+                result[name] = {}
+                for fmt, (pil_format, ext, content_type, options) in FORMATS.items():
+                    frame = img if fmt == 'webp' else _flatten(img)
+                    buffer = io.BytesIO()
+                    frame.save(buffer, pil_format, **options)
+                    result[name][fmt] = storage.save_bytes(buffer.getvalue(), ext, content_type)
+                    saved.append(result[name][fmt])
+    except Exception:
+        # Çağıran commit ederse referanslar janitor'da bırakılır; rollback ederse ikisi birlikte geri alınır
+        schedule_file_deletion(*saved)
+        raise
+    return result
+
+
+#  İŞLER (app context içinde, commit'ten sonra çalışır)
+
+def process_product_images(product_id):
+    """Ürünün türevi olmayan resimlerini işler, kapak resminin küçük türevini ürüne yazar."""
+    from app import cache, db, janitor
+    from app.models import Product
+
+    product = db.session.get(Product, product_id)
+    if not product:
+        return
+
+    failed = False
+    for img in product.images:
+        if img.variants:
+            continue
+        try:
+            img.variants = render_variants(img.image_url)
+        except Exception as e:
+            failed = True
+            print(f"Resim işlenemedi ({img.image_url}): {e}")
+
+    cover = next((img for img in product.images if img.image_url == product.image_url), None)
+    if cover and cover.variants:
+        product.thumbnail_url = pick_variant(cover.variants, 'thumb')
+
+    db.session.commit()
+    if failed:
+        janitor.wake()
+    cache.invalidate_product(product_id)
+
+def process_profile_image(user_id):
+    from app import db
+    from app.models import User
+
+    user = db.session.get(User, user_id)
+    if not user or not user.profile_image or user.profile_image_variants:
+        return
+    user.profile_image_variants = render_variants(user.profile_image, PROFILE_VARIANTS)
+    db.session.commit()
+
+
+class ImagePipeline:
+    """
+    Flask eklentisi. Ayarlar:
+    IMAGE_WORKERS (thread sayısı; 0 = istek içinde senkron), IMAGE_QUEUE_SIZE (bekleyen iş sınırı)
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IMAGE_WORKERS', 2)
+        app.config.setdefault('IMAGE_QUEUE_SIZE', 32)
+
+        self.app = app
+        workers = app.config['IMAGE_WORKERS']
+        if workers > 0:
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='images')
+            self.slots = threading.BoundedSemaphore(workers + app.config['IMAGE_QUEUE_SIZE'])
+        else:
+            self.executor = None
+
+        app.extensions['images'] = self
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def submit(self, job, *args):
+        """İşi kuyruğa ekler. Pillow yoksa veya kuyruk doluysa False döner (iş atlanır)."""
+        if not self.enabled:
+            return False
+        if self.executor is None:
+            self._run(job, *args)
+            return True
+        if not self.slots.acquire(blocking=False):
+            print(f"Resim kuyruğu dolu, iş atlandı: {job.__name__}{args}")
+            return False
+        future = self.executor.submit(self._run, job, *args)
+        future.add_done_callback(lambda _: self.slots.release())
+        return True
+
+    def _run(self, job, *args):
+        from app import db
+        with self.app.app_context():
+            try:
+                job(*args)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Resim işleme hatası ({job.__name__}{args}): {e}")
+
+
+images_cli = AppGroup('images', help='Resim türevleri.')
+
+@images_cli.command('process')
+def process_command():
+    """Türevi eksik ürün ve profil resimlerini (senkron) işler."""
+    from app import db
+    from app.models import ProductImage, User
+
+    if Image is None:
+        raise click.ClickException("Pillow kurulu değil.")
+
+    product_ids = {product_id for product_id, variants in
+                   db.session.query(ProductImage.product_id, ProductImage.variants) if not variants}
+    for product_id in sorted(product_ids):
+        process_product_images(product_id)
+
+    user_ids = [user.id for user in User.query.filter(User.profile_image.isnot(None)) if not user.profile_image_variants]
+    for user_id in user_ids:
+        try:
+            process_profile_image(user_id)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Profil resmi işlenemedi (kullanıcı {user_id}): {e}")
+
+    click.echo(f"{len(product_ids)} ürün, {len(user_ids)} profil resmi işlendi.")
@@ -0,0 +1,272 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+# Dosya temizliği istek dışında yapılır.
+# Silinen kayıtların dosyaları, kaydı silen transaction'da file_jobs tablosuna iş olarak
+# eklenir (schedule_file_deletion). Böylece commit olmadan dosya silinmez, commit olan
+# hiçbir silme de kaybolmaz. İşler toplu olarak işlenir: referanslar bırakılıp iş satırları
+# tek commit'le silinir, ardından dosyalar kaldırılır. Başarısız fiziksel silmeler
+# artan beklemeyle yeniden denenir.
+# Hiçbir kayda bağlı olmayan (yetim) dosyalar 'flask files gc' ile toplanır.
+
+RETRY_DELAYS = (60, 300, 1800, 7200)
+
+
+def schedule_file_deletion(*urls):
+    """Dosyaları silinmek üzere kuyruğa ekler; commit çağırana aittir, sonra janitor.wake()."""
+    from app import db
+    from app.models import FileJob
+
+    for url in urls:
+        if url:
+            db.session.add(FileJob(url=url, action='release'))
+
+def process_file_jobs(batch_size=100):
+    """Zamanı gelmiş en fazla batch_size işi işler; işlenen iş sayısını döner."""
+    from app import db, storage
+    from app.models import FileJob
+
+    now = datetime.utcnow()
+    jobs = FileJob.query.filter(FileJob.run_after <= now)\
+        .order_by(FileJob.id).limit(batch_size)\
+        .with_for_update(skip_locked=True).all()
+    if not jobs:
+        db.session.rollback()
+        return 0
+
+    to_remove = []
+    for job in jobs:
+        if job.action == 'remove' or storage.release(job.url):
+            to_remove.append((job.url, job.attempts))
+        db.session.delete(job)
+    db.session.commit()
+
+    for url, attempts in to_remove:
+        try:
+            storage.remove(url)
+        except Exception as e:
+            if attempts >= len(RETRY_DELAYS):
+                print(f"Dosya silinemedi, vazgeçildi (gc toplayacak): {url} {e}")
+                continue
+            db.session.add(FileJob(
+                url=url, action='remove', attempts=attempts + 1, last_error=str(e),
+                run_after=now + timedelta(seconds=RETRY_DELAYS[attempts])
+            ))
+    db.session.commit()
+    return len(jobs)
+
+
+class FileJanitor:
+    """
+    Flask eklentisi: file_jobs kuyruğunu arka plan thread'inde işler. Ayarlar:
+    FILE_JANITOR_INTERVAL (saniye; 0 = thread yok, yalnızca 'flask files work'), FILE_JANITOR_BATCH
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FILE_JANITOR_INTERVAL', 30)
+        app.config.setdefault('FILE_JANITOR_BATCH', 100)
+        self.app = app
+        app.extensions['janitor'] = self
+
+    def wake(self):
+        """İş eklendikten (commit'ten) sonra çağrılır. Thread ilk çağrıda başlatılır."""
+        if self.app.config['FILE_JANITOR_INTERVAL'] <= 0:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='file-janitor', daemon=True)
+                self._thread.start()
+        self._event.set()
+
+    def _loop(self):
+        from app import db
+
+        batch_size = self.app.config['FILE_JANITOR_BATCH']
+        while True:
+            self._event.wait(self.app.config['FILE_JANITOR_INTERVAL'])
+            self._event.clear()
+            with self.app.app_context():
+                try:
+                    while process_file_jobs(batch_size) == batch_size:
+                        pass
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Dosya temizliği başarısız: {e}")
+
+
+#  YETİM DOSYA TOPLAMA
+
+def walk_files(root, after=(), exclude=()):
+    """
+    root altındaki dosyaları ad sırasıyla, listeyi belleğe almadan gezer. after (yol
+    parçaları demeti) verilirse yalnızca ondan sonra gelenler döner; bu sayede büyük bir
+    klasör ağacı birden çok çalıştırmada parça parça taranabilir. exclude içindeki
+    klasörlere girilmez.
+    """
+    excluded = {os.path.realpath(path) for path in exclude}
+
+    def walk(directory, parts):
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            path_parts = parts + (entry.name,)
+            if entry.is_dir(follow_symlinks=False):
+                if path_parts >= after[:len(path_parts)] and os.path.realpath(entry.path) not in excluded:
+                    yield from walk(entry.path, path_parts)
+            elif entry.is_file(follow_symlinks=False) and path_parts > after:
+                yield path_parts, entry
+    if os.path.isdir(root):
+        yield from walk(root, ())
+
+def _referenced_keys(keys):
+    """İçerik adresli depoda hâlâ referansı olan anahtarlar."""
+    from app import db
+    from app.models import StoredFile
+
+    if not keys:
+        return set()
+    return {key for (key,) in db.session.query(StoredFile.key).filter(StoredFile.key.in_(keys))}
+
+def _referenced_urls(urls):
+    """Eski (içerik adresli olmayan) URL'lerden hâlâ bir kayda bağlı olanlar."""
+    from app import db
+    from app.models import Product, ProductImage, User
+
+    found = set()
+    if urls:
+        for column in (ProductImage.image_url, Product.image_url, Product.thumbnail_url, User.profile_image):
+            found.update(value for (value,) in db.session.query(column).filter(column.in_(urls)))
+    return found
+
+def _gc_sources():
+    """
+    Taranacak klasörler: (ad, kök, atlanacak klasörler, referans türü). Yerel depo kökü
+    (STORAGE_LOCAL_ROOT) anahtarlarla, yükleme klasörünün geri kalanı eski URL'lerle
+    ('/static/uploads/...') denetlenir. S3 deposundaki nesneler taranmaz.
+    """
+    from app import storage
+    from app.storage import LocalBackend
+
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    sources = []
+    object_root = None
+    if isinstance(storage.backend, LocalBackend):
+        object_root = storage.backend.root
+        sources.append(('objects', object_root, (), 'key'))
+    sources.append(('uploads', upload_folder, (object_root,) if object_root else (), 'url'))
+    return sources
+
+def _read_gc_cursor(path):
+    """'kaynak:yol/parçaları' -> (kaynak, parçalar); eski biçimde kaynak 'uploads' sayılır."""
+    if not os.path.exists(path):
+        return None, ()
+    with open(path, encoding='utf-8') as f:
+        value = f.read().strip()
+    source, sep, rest = value.partition(':')
+    if not sep:
+        source, rest = 'uploads', value
+    return source, tuple(part for part in rest.split('/') if part)
+
+
+files_cli = AppGroup('files', help='Yüklenen dosyaların temizliği.')
+
+@files_cli.command('work')
+def work_command():
+    """Bekleyen dosya silme işlerini (file_jobs) işler."""
+    total = 0
+    batch_size = current_app.config['FILE_JANITOR_BATCH']
+    while True:
+        processed = process_file_jobs(batch_size)
+        total += processed
+        if processed < batch_size:
+            break
+    click.echo(f"{total} dosya işi işlendi.")
+
+@files_cli.command('gc')
+@click.option('--limit', default=0, help='Bu çalıştırmada en fazla kaç dosya taranacağı (0 = sınırsız).')
+@click.option('--batch', default=500, help='Veritabanında tek sorguda kontrol edilecek dosya sayısı.')
+@click.option('--min-age', default=60, help='Bundan (dakika) daha yeni dosyalara dokunulmaz.')
+@click.option('--dry-run', is_flag=True, help='Silmeden yalnızca listeler.')
+def gc_command(limit, batch, min_age, dry_run):
+    """
+    Yerel depo kökünü ve static/uploads altını tarar; hiçbir kayda (stored_files,
+    ProductImage, Product, User) bağlı olmayan dosyaları siler. --limit ile kalınan yer
+    kaydedilir, sonraki çalıştırma oradan devam eder.
+    """
+    from app import storage
+
+    cursor_path = os.path.join(current_app.instance_path, 'files-gc.cursor')
+    sources = _gc_sources()
+    cursor_source, after = _read_gc_cursor(cursor_path)
+    names = [name for name, *_ in sources]
+    start = names.index(cursor_source) if cursor_source in names else 0
+    if cursor_source not in names:
+        after = ()
+
+    cutoff = time.time() - min_age * 60
+    scanned = removed = 0
+    last = None
+    pending = []
+
+    def flush():
+        nonlocal removed
+        referenced = _referenced_keys([ref for kind, ref, _, _ in pending if kind == 'key'])
+        referenced |= _referenced_urls([ref for kind, ref, _, _ in pending if kind == 'url'])
+        for kind, ref, label, path in pending:
+            if ref in referenced:
+                continue
+            click.echo(f"{'[deneme] ' if dry_run else ''}yetim: {label}")
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+            removed += 1
+        pending.clear()
+
+    finished = True
+    for name, root, exclude, kind in sources[start:]:
+        for parts, entry in walk_files(root, after if name == names[start] else (), exclude):
+            last = (name, parts)
+            scanned += 1
+            # Yarıda kalmış yüklemelerin geçici dosyaları (.incoming) da hiçbir anahtara
+            # karşılık gelmediğinden aynı yoldan toplanır
+            if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                ref = '/'.join(parts)
+                if kind == 'key':
+                    pending.append((kind, ref, storage.backend.url(ref), entry.path))
+                else:
+                    pending.append((kind, '/static/uploads/' + ref, '/static/uploads/' + ref, entry.path))
+            if len(pending) >= batch:
+                flush()
+            if limit and scanned >= limit:
+                finished = False
+                break
+        if not finished:
+            break
+    flush()
+
+    position = f"{last[0]}:{'/'.join(last[1])}" if last else ''
+    if not dry_run:
+        if finished and os.path.exists(cursor_path):
+            os.remove(cursor_path)
+        elif not finished:
+            os.makedirs(current_app.instance_path, exist_ok=True)
+            with open(cursor_path, 'w', encoding='utf-8') as f:
+                f.write(position)
+
+    state = 'tarama tamamlandı' if finished else f"kalınan yer: {position}"
+    click.echo(f"{scanned} dosya tarandı, {removed} yetim dosya {'bulundu' if dry_run else 'silindi'} ({state}).")
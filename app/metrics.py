@@ -0,0 +1,256 @@
+import atexit
+import itertools
+import json
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from flask import g, request
+
+# İstek metrikleri (Prometheus metin biçimi, /metrics).
+# Uç nokta / yöntem / durum kodu başına istek sayısı ile süre, yanıt boyutu ve veritabanı
+# süresi histogramları tutulur (veritabanı süresi app/profiling.py sayacından okunur).
+# Sayaçlar şeritlere bölünmüştür: her thread kendi şeridine yazar, kilit çekişmesi olmaz;
+# şeritler yalnızca okumada birleştirilir.
+# Çok süreçli (gunicorn vb.) çalışmada METRICS_DIR verilir: her worker anlık görüntüsünü
+# METRICS_FLUSH_INTERVAL saniyede bir metrics-<pid>-<rastgele>.json dosyasına yazar, /metrics
+# tüm dosyaları toplar. Kapanan worker'ların dosyaları sayaçlar gerilemesin diye silinmez;
+# dosya adındaki rastgele ek, aynı pid'i alan yeni bir worker'ın eski dosyanın üzerine
+# yazmasını önler. Klasör sunucu her başlatıldığında temizlenmelidir.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STRIPES = 16
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# Histogram: [toplam, kova_0, ..., kova_n, +Inf] (kovalar kümülatif değil)
+
+def _new_histogram(buckets):
+    return [0.0] + [0] * (len(buckets) + 1)
+
+def _observe(histogram, buckets, value):
+    histogram[0] += value
+    histogram[1 + bisect_left(buckets, value)] += 1
+
+def _new_series():
+    return {
+        'requests': 0,
+        'db_queries': 0,
+        'latency': _new_histogram(LATENCY_BUCKETS),
+        'size': _new_histogram(SIZE_BUCKETS),
+        'db': _new_histogram(LATENCY_BUCKETS),
+    }
+
+def _merge(into, snapshot):
+    for key, series in snapshot.items():
+        target = into.get(key)
+        if target is None:
+            into[key] = {name: list(value) if isinstance(value, list) else value for name, value in series.items()}
+            continue
+        for name, value in series.items():
+            if isinstance(value, list):
+                target[name] = [a + b for a, b in zip(target[name], value)]
+            else:
+                target[name] += value
+
+
+class Metrics:
+    """
+    Flask eklentisi (profiler'dan sonra). Ayarlar:
+    METRICS_ENABLED, METRICS_DIR (çok süreç), METRICS_FLUSH_INTERVAL (saniye),
+    METRICS_TOKEN (/metrics için admin token'ı yerine kullanılabilecek sabit Bearer token)
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._reset()
+        if app is not None:
+            self.init_app(app)
+
+    def _reset(self):
+        # fork edilen worker ana süreçten kopyalanan sayaçlarla başlamasın diye pid'e bağlıdır
+        self._pid = os.getpid()
+        self._file_id = f'{self._pid}-{secrets.token_hex(4)}'
+        self._stripes = [(threading.Lock(), {}) for _ in range(STRIPES)]
+        self._next_stripe = itertools.count()
+        self._local = threading.local()
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_DIR', None)
+        app.config.setdefault('METRICS_FLUSH_INTERVAL', 10)
+        app.config.setdefault('METRICS_TOKEN', None)
+
+        self.app = app
+        app.extensions['metrics'] = self
+        if app.config['METRICS_ENABLED']:
+            app.before_request(self._start)
+            app.after_request(self._finish)
+
+    def _start(self):
+        g._metrics_started = time.perf_counter()
+
+    def _finish(self, response):
+        from app.profiling import current_queries
+
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        queries = current_queries()
+        self.observe(
+            request.endpoint or 'unmatched', request.method, response.status_code,
+            time.perf_counter() - started, response.content_length,
+            queries.duration if queries else None, queries.count if queries else 0,
+        )
+        return response
+
+    def _stripe(self):
+        if os.getpid() != self._pid:
+            self._reset()
+        stripe = getattr(self._local, 'stripe', None)
+        if stripe is None:
+            stripe = self._local.stripe = self._stripes[next(self._next_stripe) % STRIPES]
+        return stripe
+
+    def observe(self, endpoint, method, status, duration, size=None, db_time=None, db_queries=0):
+        lock, series_map = self._stripe()
+        key = (endpoint, method, str(status))
+        with lock:
+            series = series_map.get(key)
+            if series is None:
+                series = series_map[key] = _new_series()
+            series['requests'] += 1
+            series['db_queries'] += db_queries
+            _observe(series['latency'], LATENCY_BUCKETS, duration)
+            if size is not None:
+                _observe(series['size'], SIZE_BUCKETS, size)
+            if db_time is not None:
+                _observe(series['db'], LATENCY_BUCKETS, db_time)
+
+        if self.app.config['METRICS_DIR'] and self._flusher is None:
+            self._start_flusher()
+
+    def snapshot(self):
+        """Bu sürecin sayaçları: {(uç nokta, yöntem, durum): seri}."""
+        merged = {}
+        for lock, series_map in self._stripes:
+            with lock:
+                _merge(merged, series_map)
+        return merged
+
+    #  ÇOK SÜREÇ
+
+    def _path(self):
+        if os.getpid() != self._pid:
+            self._reset()
+        return os.path.join(self.app.config['METRICS_DIR'], f'metrics-{self._file_id}.json')
+
+    def flush(self):
+        directory = self.app.config['METRICS_DIR']
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = self._path()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([[list(key), series] for key, series in self.snapshot().items()], f)
+        os.replace(tmp_path, path)
+
+    def _start_flusher(self):
+        with self._flusher_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+            atexit.register(self._flush_quietly)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.app.config['METRICS_FLUSH_INTERVAL'])
+            self._flush_quietly()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Metrikler yazılamadı: {e}")
+
+    def collect(self):
+        """Tüm süreçlerin birleşik sayaçları (METRICS_DIR yoksa yalnızca bu süreç)."""
+        directory = self.app.config['METRICS_DIR']
+        if not directory:
+            return self.snapshot()
+
+        self.flush()
+        merged = {}
+        for name in os.listdir(directory):
+            if not (name.startswith('metrics-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(directory, name), encoding='utf-8') as f:
+                    _merge(merged, {tuple(key): series for key, series in json.load(f)})
+            except (OSError, ValueError) as e:
+                print(f"Metrik dosyası okunamadı ({name}): {e}")
+        return merged
+
+
+#  PROMETHEUS METİN BİÇİMİ
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _format_bound(bound):
+    return f'{bound:g}' if isinstance(bound, float) else str(bound)
+
+def _histogram_lines(name, labels, histogram, buckets):
+    cumulative = 0
+    for bound, count in zip(buckets, histogram[1:]):
+        cumulative += count
+        yield f'{name}_bucket{_labels(**labels, le=_format_bound(bound))} {cumulative}'
+    cumulative += histogram[-1]
+    yield f'{name}_bucket{_labels(**labels, le="+Inf")} {cumulative}'
+    yield f'{name}_sum{_labels(**labels)} {histogram[0]:.6f}'
+    yield f'{name}_count{_labels(**labels)} {cumulative}'
+
+def render(collected):
+    """collect() çıktısını Prometheus metin biçimine çevirir."""
+    rows = []
+    for (endpoint, method, status), series in sorted(collected.items()):
+        labels = {
+            'blueprint': endpoint.rpartition('.')[0],
+            'endpoint': endpoint,
+            'method': method,
+            'status': status,
+        }
+        rows.append((labels, series))
+
+    lines = [
+        '# HELP http_requests_total İşlenen HTTP istekleri.',
+        '# TYPE http_requests_total counter',
+    ]
+    lines += [f'http_requests_total{_labels(**labels)} {series["requests"]}' for labels, series in rows]
+
+    lines += [
+        '# HELP http_request_db_queries_total İsteklerde çalıştırılan SQL ifadeleri.',
+        '# TYPE http_request_db_queries_total counter',
+    ]
+    lines += [f'http_request_db_queries_total{_labels(**labels)} {series["db_queries"]}' for labels, series in rows]
+
+    for name, field, buckets, help_text in (
+        ('http_request_duration_seconds', 'latency', LATENCY_BUCKETS, 'İstek işleme süresi.'),
+        ('http_response_size_bytes', 'size', SIZE_BUCKETS, 'Yanıt gövdesi boyutu (bilinen uzunluklar).'),
+        ('http_request_db_seconds', 'db', LATENCY_BUCKETS, 'İstek başına toplam SQL süresi.'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for labels, series in rows:
+            lines += _histogram_lines(name, labels, series[field], buckets)
+
+    return '\n'.join(lines) + '\n'
@@ -1,5 +1,6 @@
 from datetime import datetime
 import enum
+from sqlalchemy.exc import IntegrityError
 from app import db, bcrypt
 
 class ListingType(str, enum.Enum):
@@ -27,6 +28,13 @@ class User(db.Model):
     bio = db.Column(db.Text, nullable=True)             
     location = db.Column(db.String(100), nullable=True)   
     profile_image = db.Column(db.String(255), nullable=True) 
+    profile_image_variants = db.Column(db.JSON, nullable=True)
+
+    # Okunmamış gelen mesaj sayısı; send_message / get_chat_history tarafından güncel tutulur
+    unread_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Access token'lardaki 'ver' claim'i ile karşılaştırılır; artırılınca eski token'lar geçersiz olur
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     products = db.relationship('Product', backref='owner', lazy=True)
 
@@ -38,6 +46,13 @@ class User(db.Model):
 
 class Product(db.Model):
     __tablename__ = 'products'
+    __table_args__ = (
+        db.Index('ix_products_status_created_at_id', 'status', 'created_at', 'id'),
+        # Kategori filtreli liste (status + category, created_at DESC)
+        db.Index('ix_products_status_category_created_at_id', 'status', 'category', 'created_at', 'id'),
+        # /my-products ve gelen takas tekliflerinde hedef ürünün sahibi
+        db.Index('ix_products_owner_created_at', 'owner_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -49,6 +64,8 @@ class Product(db.Model):
     status = db.Column(db.String(20), default='available')
     
     image_url = db.Column(db.String(500), nullable=True)
+    # Kapak resminin küçük (thumb) türevi; listeler bunu döner (bkz. app/images.py)
+    thumbnail_url = db.Column(db.String(500), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow) 
     
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -57,6 +74,13 @@ class Product(db.Model):
 
 class SwapOffer(db.Model):
     __tablename__ = 'swap_offers'
+    __table_args__ = (
+        # Bekleyen teklif kontrolü ve gelen tekliflerde hedef ürün JOIN'i
+        db.Index('ix_swap_offers_target_offered_status', 'target_product_id', 'offered_product_id', 'status'),
+        db.Index('ix_swap_offers_offered_product', 'offered_product_id'),
+        # Giden teklifler (talep akışı)
+        db.Index('ix_swap_offers_offerer_created_at', 'offerer_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     offerer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -71,13 +95,26 @@ class SwapOffer(db.Model):
 
 class ProductImage(db.Model):
     __tablename__ = 'product_images'
+    __table_args__ = (
+        db.Index('ix_product_images_product', 'product_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     image_url = db.Column(db.String(255), nullable=False) 
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    # {'thumb': {'webp': url, 'jpeg': url}, 'card': {...}, 'full': {...}}; işlenene kadar None
+    variants = db.Column(db.JSON, nullable=True)
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_product_status_dates', 'product_id', 'status', 'start_date', 'end_date'),
+        # Talep akışı: gelen (satıcı) ve giden (alıcı) işlemler, created_at DESC
+        db.Index('ix_transactions_seller_created_at', 'seller_id', 'created_at'),
+        db.Index('ix_transactions_buyer_created_at', 'buyer_id', 'created_at'),
+        # Yönetici işlem listesi
+        db.Index('ix_transactions_created_at', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     
@@ -101,6 +138,9 @@ class Transaction(db.Model):
 
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        db.Index('ix_messages_sender_receiver_created_at', 'sender_id', 'receiver_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -112,4 +152,107 @@ class Message(db.Model):
 
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_messages')
     receiver = db.relationship('User', foreign_keys=[receiver_id], backref='received_messages')
-    product = db.relationship('Product', backref='messages')
\ No newline at end of file
+    product = db.relationship('Product', backref='messages')
+
+class Conversation(db.Model):
+    """
+    Gelen kutusu özeti: her kullanıcı çifti için tek satır.
+    user_low_id < user_high_id olacak şekilde tutulur; unread_low / unread_high
+    ilgili tarafın okumadığı mesaj sayısıdır.
+    """
+    __tablename__ = 'conversations'
+    __table_args__ = (
+        db.UniqueConstraint('user_low_id', 'user_high_id', name='uq_conversations_pair'),
+        db.Index('ix_conversations_low_last_at', 'user_low_id', 'last_message_at'),
+        db.Index('ix_conversations_high_last_at', 'user_high_id', 'last_message_at'),
+    )
+
+    PREVIEW_LENGTH = 200
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_low_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_high_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    last_message_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=True)
+    last_message_preview = db.Column(db.String(200), nullable=True)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+    unread_low = db.Column(db.Integer, nullable=False, default=0)
+    unread_high = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def pair(user_a, user_b):
+        return (user_a, user_b) if user_a < user_b else (user_b, user_a)
+
+    @classmethod
+    def get_or_create(cls, user_a, user_b):
+        low, high = cls.pair(user_a, user_b)
+        conv = cls.query.filter_by(user_low_id=low, user_high_id=high).first()
+        if conv:
+            return conv
+        try:
+            # Aynı çift için eşzamanlı ilk mesajda unique kısıtı çakışabilir
+            with db.session.begin_nested():
+                conv = cls(user_low_id=low, user_high_id=high, unread_low=0, unread_high=0)
+                db.session.add(conv)
+        except IntegrityError:
+            conv = cls.query.filter_by(user_low_id=low, user_high_id=high).one()
+        return conv
+
+    @classmethod
+    def record_message(cls, message):
+        """Yeni mesajı özete işler; mesajla aynı transaction içinde çağrılmalı (flush sonrası)."""
+        conv = cls.get_or_create(message.sender_id, message.receiver_id)
+        conv.last_message_id = message.id
+        conv.last_message_preview = (message.content or '')[:cls.PREVIEW_LENGTH]
+        conv.last_message_at = message.created_at
+        if message.receiver_id == conv.user_low_id:
+            conv.unread_low = cls.unread_low + 1
+        else:
+            conv.unread_high = cls.unread_high + 1
+        return conv
+
+    @classmethod
+    def mark_read(cls, reader_id, other_user_id):
+        """reader_id tarafının okunmamış sayacını sıfırlar."""
+        low, high = cls.pair(reader_id, other_user_id)
+        column = 'unread_low' if reader_id == low else 'unread_high'
+        return cls.query.filter_by(user_low_id=low, user_high_id=high)\
+            .update({column: 0}, synchronize_session=False)
+
+class PlatformCounter(db.Model):
+    """Yönetim paneli sayaçları (users, active_products, completed_volume); bkz. app/stats.py"""
+    __tablename__ = 'platform_counters'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+class DailyStat(db.Model):
+    """Günlük özet satırları; /api/admin/stats/timeseries bu tablodan okunur."""
+    __tablename__ = 'daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    new_users = db.Column(db.Integer, nullable=False, default=0)
+    new_products = db.Column(db.Integer, nullable=False, default=0)
+    completed_transactions = db.Column(db.Integer, nullable=False, default=0)
+    completed_volume = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+class StoredFile(db.Model):
+    """İçerik adresli depodaki bir dosya ve ona kaç kaydın referans verdiği; bkz. app/storage.py"""
+    __tablename__ = 'stored_files'
+
+    key = db.Column(db.String(255), primary_key=True)  # 'ab/cd/<sha256><uzantı>'
+    size = db.Column(db.BigInteger, nullable=False, default=0)
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class FileJob(db.Model):
+    """Bekleyen dosya silme işi; silinen kayıtla aynı transaction'da eklenir, bkz. app/janitor.py"""
+    __tablename__ = 'file_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(500), nullable=False)
+    # 'release': referansı bırak, son referanssa sil / 'remove': yalnızca fiziksel silme (tekrar deneme)
+    action = db.Column(db.String(20), nullable=False, default='release')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
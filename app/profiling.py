@@ -0,0 +1,139 @@
+import json
+import re
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# İstek başına SQL ölçümü.
+# Her veritabanı motoruna SQLAlchemy olay dinleyicileri eklenir; istek içinde çalışan her
+# ifade sayılır ve süresi toplanır. Aynı biçimdeki (parametreleri ve IN listeleri
+# ayıklanmış) ifade SQL_N_PLUS_ONE_THRESHOLD kez tekrarlanırsa N+1 olarak işaretlenir.
+# Yanıta Server-Timing başlığı eklenir (tarayıcı geliştirici araçlarında görünür).
+# Sorun varsa (N+1, bütçe aşımı, yavaş istek) tek satırlık JSON kayıt yazılır.
+# SQL_QUERY_BUDGETS uç nokta başına sorgu sınırıdır; SQL_QUERY_BUDGET_STRICT açıkken
+# (testlerde varsayılan) aşım QueryBudgetExceeded hatasıyla isteği düşürür.
+# Akış yanıtlarının (SSE, dışa aktarma) gövdesi after_request'ten sonra üretildiğinden
+# oradaki sorgular sayılmaz.
+
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)'
+_IN_LIST_RE = re.compile(rf'\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def statement_shape(statement):
+    """İfadenin biçimi: IN (?, ?, ...) listeleri tek yer tutucuya indirgenir."""
+    return _IN_LIST_RE.sub('(?)', _WHITESPACE_RE.sub(' ', statement).strip())
+
+class RequestQueries:
+    """Bir isteğin SQL sayacı (flask.g üzerinde)."""
+
+    __slots__ = ('started', 'count', 'duration', 'shapes')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+def current_queries():
+    """Etkin isteğin sayacı; istek dışında veya ölçüm kapalıyken None."""
+    return g.get('_sql_queries') if has_request_context() else None
+
+
+# Başlangıç zamanı ifadenin kendi yürütme bağlamında tutulur; hata veren ifadenin
+# zamanı bağlantıda birikmez, bir sonraki ifadeye de karışmaz
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_queries() is not None:
+        context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = current_queries()
+    started = getattr(context, '_query_start', None)
+    if queries is not None and started is not None:
+        queries.record(statement, time.perf_counter() - started)
+
+
+class QueryProfiler:
+    """
+    Flask eklentisi (db.init_app'ten sonra). Ayarlar:
+    SQL_PROFILING, SQL_N_PLUS_ONE_THRESHOLD, SQL_SLOW_REQUEST_MS (0 = her isteği kaydet),
+    SQL_QUERY_BUDGETS ({'blueprint.uc_nokta': en fazla sorgu}), SQL_QUERY_BUDGET_STRICT
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app import db
+
+        app.config.setdefault('SQL_PROFILING', True)
+        app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD', 5)
+        app.config.setdefault('SQL_SLOW_REQUEST_MS', 500)
+        app.config.setdefault('SQL_QUERY_BUDGETS', {})
+        app.config.setdefault('SQL_QUERY_BUDGET_STRICT', app.config.get('TESTING', False))
+
+        self.app = app
+        app.extensions['profiler'] = self
+        if not app.config['SQL_PROFILING']:
+            return
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self):
+        g._sql_queries = RequestQueries()
+
+    def _finish(self, response):
+        queries = current_queries()
+        if queries is None:
+            return response
+
+        config = self.app.config
+        db_ms = queries.duration * 1000
+        total_ms = (time.perf_counter() - queries.started) * 1000
+        response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{queries.count} queries"')
+        response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+
+        repeated = queries.repeated(config['SQL_N_PLUS_ONE_THRESHOLD'])
+        budget = config['SQL_QUERY_BUDGETS'].get(request.endpoint)
+        over_budget = budget is not None and queries.count > budget
+        slow_ms = config['SQL_SLOW_REQUEST_MS']
+
+        if repeated or over_budget or total_ms >= slow_ms:
+            print(json.dumps({
+                'event': 'sql_profile',
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'queries': queries.count,
+                'db_ms': round(db_ms, 1),
+                'total_ms': round(total_ms, 1),
+                'budget': budget,
+                'n_plus_one': [{'count': n, 'statement': shape[:300]} for shape, n in repeated],
+            }, ensure_ascii=False))
+
+        if over_budget and config['SQL_QUERY_BUDGET_STRICT']:
+            raise QueryBudgetExceeded(f"{request.endpoint}: {queries.count} sorgu (bütçe {budget})")
+        return response
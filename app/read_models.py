@@ -0,0 +1,257 @@
+from sqlalchemy import Date, Numeric, String, Text, and_, case, cast, literal, null, or_, select, union_all
+from sqlalchemy.orm import aliased, joinedload
+from app import db
+from app.models import Conversation, Product, SwapOffer, Transaction, User
+
+# Liste uç noktaları için okuma modeli.
+# ORM nesnesi oluşturmadan yalnızca gereken sütunları Core select() ile çeker,
+# satırları doğrudan sözlüğe çevirir (identity map / attribute instrumentation yok).
+
+PRODUCT_LIST_COLUMNS = (
+    Product.id,
+    Product.title,
+    Product.category,
+    Product.price,
+    Product.image_url,
+    Product.thumbnail_url,
+    Product.status,
+    Product.owner_id,
+    Product.listing_type,
+    Product.created_at,
+)
+
+MY_PRODUCT_COLUMNS = (
+    Product.id,
+    Product.title,
+    Product.price,
+    Product.image_url,
+    Product.thumbnail_url,
+    Product.status,
+    Product.category,
+    Product.listing_type,
+)
+
+
+def rows_to_dicts(rows):
+    return [dict(row._mapping) for row in rows]
+
+def product_list_select():
+    """Ana sayfa listesi: açıklama (TEXT) sütunu çekilmez."""
+    return select(*PRODUCT_LIST_COLUMNS).where(Product.status == 'available')
+
+def load_product_detail(product_id):
+    """Ürün, sahibi ve galeri resimlerini tek sorguda (JOIN) yükler. Bulunamazsa None."""
+    return db.session.execute(
+        select(Product)
+        .options(joinedload(Product.owner), joinedload(Product.images))
+        .where(Product.id == product_id)
+    ).unique().scalar_one_or_none()
+
+def my_products_select(owner_id):
+    return select(*MY_PRODUCT_COLUMNS)\
+        .where(Product.owner_id == owner_id)\
+        .order_by(Product.created_at.desc())
+
+def admin_users_select():
+    return select(User.id, User.username, User.email, User.role).order_by(User.id)
+
+def admin_products_select():
+    return select(
+        Product.id,
+        Product.title,
+        Product.price,
+        User.username.label('owner'),
+        Product.status,
+        Product.listing_type,
+    ).outerjoin(User, Product.owner_id == User.id).order_by(Product.id)
+
+def admin_transactions_select():
+    buyer = aliased(User)
+    seller = aliased(User)
+    return select(
+        Transaction.id,
+        Product.title.label('product'),
+        buyer.username.label('buyer'),
+        seller.username.label('seller'),
+        Transaction.price,
+        Transaction.transaction_type.label('type'),
+        Transaction.status,
+    ).outerjoin(Product, Transaction.product_id == Product.id)\
+     .outerjoin(buyer, Transaction.buyer_id == buyer.id)\
+     .outerjoin(seller, Transaction.seller_id == seller.id)\
+     .order_by(Transaction.created_at.desc())
+
+def serialize_admin_product(row):
+    data = dict(row._mapping)
+    data['owner'] = data['owner'] or 'Bilinmiyor'
+    data['listing_type'] = data['listing_type'] or 'N/A'
+    return data
+
+def serialize_admin_transaction(row):
+    data = dict(row._mapping)
+    data['product'] = data['product'] or 'Silinmiş Ürün'
+    data['buyer'] = data['buyer'] or 'Silinmiş Kullanıcı'
+    data['seller'] = data['seller'] or 'Silinmiş Kullanıcı'
+    data['price'] = float(data['price'])
+    data['type'] = data['type'] or 'standard'
+    return data
+
+
+#  TALEP AKIŞI (gelen / giden)
+# İşlemler ve takas teklifleri tek bir UNION ALL sorgusunda, ürün ve kullanıcı
+# bilgileriyle birlikte çekilir; sıralama ve sayfalama veritabanında yapılır.
+
+def _transaction_branch(user_id, direction, status):
+    other = aliased(User)
+    if direction == 'incoming':
+        user_filter = Transaction.seller_id == user_id
+        other_join = Transaction.buyer_id == other.id
+    else:
+        user_filter = Transaction.buyer_id == user_id
+        other_join = Transaction.seller_id == other.id
+
+    q = select(
+        literal('transaction').label('type'),
+        Transaction.id.label('id'),
+        Product.title.label('product_title'),
+        Product.image_url.label('product_image'),
+        other.username.label('other_party_name'),
+        Transaction.transaction_type.label('transaction_type'),
+        Transaction.status.label('status'),
+        cast(Transaction.price, Numeric(10, 2)).label('price'),
+        Transaction.start_date.label('start_date'),
+        Transaction.end_date.label('end_date'),
+        cast(null(), String).label('swap_product_title'),
+        cast(null(), String).label('swap_product_image'),
+        cast(null(), Text).label('message'),
+        Transaction.created_at.label('created_at'),
+    ).select_from(Transaction)\
+     .outerjoin(Product, Transaction.product_id == Product.id)\
+     .outerjoin(other, other_join)\
+     .where(user_filter)
+
+    if status:
+        q = q.where(Transaction.status == status)
+    return q
+
+def _swap_branch(user_id, direction, status):
+    target = aliased(Product)
+    offered = aliased(Product)
+    other = aliased(User)
+
+    q = select(
+        literal('swap_offer').label('type'),
+        SwapOffer.id.label('id'),
+        target.title.label('product_title'),
+        target.image_url.label('product_image'),
+        other.username.label('other_party_name'),
+        literal('swap').label('transaction_type'),
+        SwapOffer.status.label('status'),
+        cast(literal(0), Numeric(10, 2)).label('price'),
+        cast(null(), Date).label('start_date'),
+        cast(null(), Date).label('end_date'),
+        offered.title.label('swap_product_title'),
+        offered.image_url.label('swap_product_image'),
+        SwapOffer.message.label('message'),
+        SwapOffer.created_at.label('created_at'),
+    ).select_from(SwapOffer)
+
+    if direction == 'incoming':
+        q = q.join(target, SwapOffer.target_product_id == target.id)\
+             .outerjoin(other, SwapOffer.offerer_id == other.id)\
+             .where(target.owner_id == user_id)
+    else:
+        q = q.outerjoin(target, SwapOffer.target_product_id == target.id)\
+             .outerjoin(other, target.owner_id == other.id)\
+             .where(SwapOffer.offerer_id == user_id)
+
+    q = q.outerjoin(offered, SwapOffer.offered_product_id == offered.id)
+    if status:
+        q = q.where(SwapOffer.status == status)
+    return q
+
+def request_feed_select(user_id, direction, status=None, after=None):
+    """
+    direction: 'incoming' (satıcı/ürün sahibi olarak) veya 'outgoing' (alıcı/teklif veren olarak).
+    after: (created_at, type, id) imleci; verilirse bu kaydın sonrasındakiler döner.
+    Sıralama: created_at DESC, type DESC, id DESC.
+    """
+    feed = union_all(
+        _transaction_branch(user_id, direction, status),
+        _swap_branch(user_id, direction, status),
+    ).subquery('feed')
+
+    q = select(feed)
+    if after:
+        created_at, kind, item_id = after
+        q = q.where(or_(
+            feed.c.created_at < created_at,
+            and_(feed.c.created_at == created_at, feed.c.type < kind),
+            and_(feed.c.created_at == created_at, feed.c.type == kind, feed.c.id < item_id),
+        ))
+    return q.order_by(feed.c.created_at.desc(), feed.c.type.desc(), feed.c.id.desc())
+
+def serialize_request_row(row, direction):
+    deleted_product = 'Silinmiş Ürün' if row.type == 'transaction' and direction == 'incoming' else 'Silinmiş'
+    other_party = row.other_party_name or 'Bilinmeyen'
+    data = {
+        'type': row.type,
+        'id': row.id,
+        'product_title': row.product_title or deleted_product,
+        'product_image': row.product_image,
+        'buyer_name' if direction == 'incoming' else 'seller_name': other_party,
+        'other_party_name': other_party,
+        'transaction_type': row.transaction_type,
+        'status': row.status,
+        'price': float(row.price or 0),
+        'start_date': row.start_date.strftime('%Y-%m-%d') if row.start_date else None,
+        'end_date': row.end_date.strftime('%Y-%m-%d') if row.end_date else None,
+        'date': row.created_at.strftime('%Y-%m-%d %H:%M') if row.created_at else None,
+        'message': row.message,
+    }
+    if row.type == 'swap_offer':
+        data['swap_product_title'] = row.swap_product_title or 'Silinmiş'
+        data['swap_product_image'] = row.swap_product_image
+    return data
+
+
+#  GELEN KUTUSU
+
+def conversations_select(user_id, after=None):
+    """
+    Kullanıcının sohbet özetleri, son mesaja göre yeniden eskiye.
+    after: (last_message_at, conversation_id) imleci.
+    """
+    is_low = Conversation.user_low_id == user_id
+    other_id = case((is_low, Conversation.user_high_id), else_=Conversation.user_low_id)
+    unread = case((is_low, Conversation.unread_low), else_=Conversation.unread_high)
+
+    q = select(
+        Conversation.id.label('conversation_id'),
+        User.id.label('user_id'),
+        User.username,
+        User.profile_image,
+        Conversation.last_message_preview.label('last_message'),
+        Conversation.last_message_at,
+        unread.label('unread_count'),
+    ).join(User, User.id == other_id)\
+     .where(or_(Conversation.user_low_id == user_id, Conversation.user_high_id == user_id))
+
+    if after:
+        last_at, conv_id = after
+        q = q.where(or_(
+            Conversation.last_message_at < last_at,
+            and_(Conversation.last_message_at == last_at, Conversation.id < conv_id)
+        ))
+    return q.order_by(Conversation.last_message_at.desc(), Conversation.id.desc())
+
+def serialize_conversation_row(row):
+    return {
+        'user_id': row.user_id,
+        'username': row.username,
+        'profile_image': row.profile_image,
+        'last_message': row.last_message,
+        'date': row.last_message_at.strftime('%Y-%m-%d %H:%M') if row.last_message_at else None,
+        'is_unread': row.unread_count > 0,
+        'unread_count': row.unread_count
+    }
@@ -0,0 +1,115 @@
+import re
+import unicodedata
+from sqlalchemy import DDL, column, event, func, literal_column, or_, table
+from app.models import Product
+
+# Ürün arama altyapısı.
+# PostgreSQL: products.search_vector (tsvector, 'turkish' sözlüğü) + GIN indeks,
+#             trigger ile güncel tutulur.
+# SQLite:     products_fts (FTS5) sanal tablosu, trigger'larla products ile senkron.
+# Diğer veritabanlarında ILIKE taramasına düşülür.
+
+TS_CONFIG = 'turkish'
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+products_fts = table('products_fts', column('rowid'))
+
+POSTGRES_DDL = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('turkish', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('turkish', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER products_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        title, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF title, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO products_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+for _statement in POSTGRES_DDL:
+    event.listen(Product.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+for _statement in SQLITE_DDL:
+    event.listen(Product.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+def tokenize(search_query):
+    """
+    Arama metnini kelimelere ayırır (noktalama ve operatörler atılır).
+    'İ'.lower() 'i' + birleşik nokta (U+0307) verir ve \\w bu noktayı kelime dışı sayar
+    ('İzmir' -> 'i', 'zmir'); bu yüzden 'İ' önce 'i' yapılır. FTS5 (unicode61) de 'I' ve 'İ'
+    harflerini 'i' olarak indeksler.
+    """
+    text = unicodedata.normalize('NFC', search_query).replace('İ', 'i')
+    return _WORD_RE.findall(text.lower())
+
+def apply_search(q, search_query, dialect_name, rank=True):
+    """
+    Verilen Product sorgusuna (Query veya Core select) tam metin arama filtresi ekler.
+    Her kelime önek (prefix) olarak eşleşir, tüm kelimeler zorunludur.
+    rank=True ise sonuçlar alaka düzeyine göre sıralanır; çağıran taraf
+    ek sıralamayı (created_at, id) bunun ardından ekler.
+    """
+    words = tokenize(search_query)
+    if not words:
+        return q
+
+    if dialect_name == 'postgresql':
+        ts_query = func.to_tsquery(TS_CONFIG, ' & '.join(f'{w}:*' for w in words))
+        vector = literal_column('products.search_vector')
+        q = q.filter(vector.op('@@')(ts_query))
+        if rank:
+            q = q.order_by(func.ts_rank(vector, ts_query).desc())
+        return q
+
+    if dialect_name == 'sqlite':
+        fts = literal_column('products_fts')
+        match = ' '.join('"{}"*'.format(w.replace('"', '')) for w in words)
+        q = q.join(products_fts, products_fts.c.rowid == Product.id)\
+             .filter(fts.op('MATCH')(match))
+        if rank:
+            q = q.order_by(func.bm25(fts))
+        return q
+
+    for w in words:
+        q = q.filter(or_(Product.title.ilike(f'%{w}%'), Product.description.ilike(f'%{w}%')))
+    return q
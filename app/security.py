@@ -0,0 +1,101 @@
+from functools import wraps
+import click
+from flask import current_app, jsonify
+from flask.cli import AppGroup
+from flask_jwt_extended import create_access_token, get_jwt, verify_jwt_in_request
+from app import cache, db, jwt
+from app.cache import token_stamp_key
+from app.models import User
+
+# Yetkilendirme.
+# Access token kullanıcının rolünü ('role') ve sürüm damgasını ('ver' = users.token_version)
+# taşır; yetki kontrolü için her istekte users tablosuna gidilmez.
+# Token'ın hâlâ geçerli olup olmadığı, önbellekteki güncel "sürüm:rol" damgasıyla
+# karşılaştırılarak anlaşılır. Damga önbellekte yoksa birincil anahtarla tek sorgu yapılır
+# ve JWT_USER_CACHE_TTL saniye saklanır. revoke_tokens() sürümü artırır; damga
+# tutmayan token'lar 401 ile reddedilir ve istemci yeniden giriş yapar.
+# Damga silme (forget_token_stamp) yalnızca paylaşılan önbellekte (CACHE_TYPE='redis')
+# tüm worker'lara hemen yansır. 'memory' önbellekte her süreç kendi damgasını tuttuğundan
+# diğer worker'lar (ve CLI'den yapılan değişikliklerde tüm sunucu) eski damgayı en fazla
+# JWT_USER_CACHE_TTL saniye daha kullanır. Önbellek erişilemezse damga her istekte
+# veritabanından okunur.
+
+
+def normalize_role(role):
+    return str(role or 'customer').strip().lower()
+
+def issue_access_token(user):
+    """Rol ve sürüm damgası ek claim olarak eklenmiş access token üretir."""
+    return create_access_token(identity=str(user.id), additional_claims={
+        'role': normalize_role(user.role),
+        'ver': user.token_version or 0,
+    })
+
+def _current_stamp(user_id):
+    key = token_stamp_key(user_id)
+    stamp = cache.get_quietly(key)
+    if stamp is None:
+        row = db.session.query(User.token_version, User.role).filter(User.id == user_id).first()
+        stamp = f'{row.token_version}:{normalize_role(row.role)}' if row else 'deleted'
+        cache.set_quietly(key, stamp, ttl=current_app.config.get('JWT_USER_CACHE_TTL', 60))
+    return stamp
+
+@jwt.token_in_blocklist_loader
+def is_token_revoked(jwt_header, jwt_payload):
+    if 'ver' not in jwt_payload or 'role' not in jwt_payload:
+        return True  # Damgasız (eski biçim) token
+    try:
+        user_id = int(jwt_payload['sub'])
+    except (TypeError, ValueError):
+        return True
+    return _current_stamp(user_id) != f"{jwt_payload['ver']}:{jwt_payload['role']}"
+
+def revoke_tokens(user_id):
+    """
+    Kullanıcının mevcut tüm token'larını geçersiz kılar (rol/şifre değişikliği sonrası).
+    Commit çağırana aittir; commit'ten sonra forget_token_stamp() çağrılmalıdır.
+    """
+    User.query.filter_by(id=user_id)\
+        .update({'token_version': User.token_version + 1}, synchronize_session=False)
+
+def forget_token_stamp(user_id):
+    cache.delete_quietly(token_stamp_key(user_id))
+
+def role_required(*roles):
+    """jwt_required() + token'daki role claim'i kontrolü (veritabanı sorgusu yapmaz)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if get_jwt().get('role') not in roles:
+                return jsonify({'message': 'Yetkisiz!'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+admin_required = role_required('admin')
+
+
+users_cli = AppGroup('users', help='Kullanıcı yönetimi.')
+
+@users_cli.command('set-role')
+@click.argument('username')
+@click.argument('role')
+def set_role_command(username, role):
+    """
+    Kullanıcının rolünü değiştirir ve açık oturumlarını sonlandırır. Sunucu 'memory'
+    önbellek kullanıyorsa eski token'lar en geç JWT_USER_CACHE_TTL saniye sonra reddedilir.
+    """
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise click.ClickException(f"Kullanıcı bulunamadı: {username}")
+
+    user.role = normalize_role(role)
+    revoke_tokens(user.id)
+    db.session.commit()
+    forget_token_stamp(user.id)
+    if current_app.config['CACHE_TYPE'] == 'redis':
+        click.echo(f"{username} rolü '{user.role}' yapıldı; mevcut token'ları geçersiz.")
+    else:
+        ttl = current_app.config.get('JWT_USER_CACHE_TTL', 60)
+        click.echo(f"{username} rolü '{user.role}' yapıldı; mevcut token'ları en geç {ttl} sn içinde geçersiz olur.")
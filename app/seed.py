@@ -0,0 +1,357 @@
+import csv
+import io
+import random
+import time
+from array import array
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, func, insert, text, update
+
+# Yük testi için sentetik veri ('flask seed').
+# Satırlar ORM nesnesi oluşturulmadan, bellekte biriktirilmeden toplu yazılır:
+# PostgreSQL'de COPY (psycopg2 / psycopg), diğer veritabanlarında toplu (executemany) INSERT.
+# Dağılımlar gerçek kullanıma benzer: satıcılar üs yasasına uyar (az sayıda kullanıcı
+# ürünlerin çoğunu listeler), kiralama ve takasların bir kısmı az sayıdaki popüler ürüne
+# yığılır, mesajların bir kısmı birkaç çok konuşkan sohbette toplanır.
+# Aynı --seed ve seçeneklerle boş veritabanında her zaman aynı veri üretilir; dolu
+# veritabanında kimlikler mevcut en büyük kimliğin devamından başlar.
+# Sayaçlar (okunmamış, sohbet özeti, platform istatistikleri) ve resim referansları
+# üretilen veriyle tutarlı tutulur.
+
+CATEGORIES = ('Elektronik', 'Giyim', 'Ev & Yaşam', 'Kitap', 'Spor', 'Oyuncak', 'Bahçe', 'Müzik', 'Kamp', 'Fotoğraf')
+ADJECTIVES = ('Az kullanılmış', 'Sıfır', 'Temiz', 'Vintage', 'Profesyonel', 'Katlanır', 'Kablosuz', 'Büyük', 'Kompakt', 'Orijinal')
+NOUNS = ('kamera', 'bisiklet', 'çadır', 'matkap', 'projeksiyon', 'gitar', 'kaykay', 'drone', 'mont', 'masa',
+         'koltuk', 'hoparlör', 'lens', 'uyku tulumu', 'oyun konsolu', 'roman seti', 'tripod', 'klavye')
+MESSAGE_LINES = ('Merhaba, ürün hâlâ duruyor mu?', 'Hafta sonu için uygun mu?', 'Fiyatta pazarlık payı var mı?',
+                 'Teslimat nasıl olur?', 'Tamam, anlaştık.', 'Fotoğraf daha gönderebilir misiniz?',
+                 'Yarın alabilirim.', 'Teşekkürler!', 'Kaç gün için kiralayabilirim?', 'Takas düşünür müsünüz?')
+PLACEHOLDER_IMAGES = 16
+
+
+def placeholder_gif(red, green, blue):
+    """Tek renkli 1x1 GIF; her renk içerik adresli depoda ayrı bir dosyadır."""
+    return (b'GIF89a\x01\x00\x01\x00\x80\x00\x00' + bytes((red, green, blue)) + b'\x00\x00\x00'
+            b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;')
+
+class PowerLaw:
+    """ids içinden, k. sıradakini k^-alpha ağırlığıyla seçer (sıralar karıştırılmış gelir)."""
+
+    def __init__(self, rng, ids, alpha):
+        self.rng = rng
+        self.ids = ids
+        self.cumulative = list(accumulate(k ** -alpha for k in range(1, len(ids) + 1)))
+
+    def __call__(self):
+        return self.ids[bisect(self.cumulative, self.rng.random() * self.cumulative[-1])]
+
+class BulkWriter:
+    """Satırları (sütun sırasıyla demet) batch_size'lık gruplar halinde yazar."""
+
+    def __init__(self, table, columns, batch_size):
+        from app import db
+
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self.connection = db.session.connection()
+        self.use_copy = self.connection.dialect.name == 'postgresql' and \
+            self.connection.dialect.driver in ('psycopg2', 'psycopg')
+        self.rows = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.flush()
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.use_copy:
+            self._copy()
+        else:
+            self.connection.execute(insert(self.table), [dict(zip(self.columns, row)) for row in self.rows])
+        self.count += len(self.rows)
+        self.rows = []
+
+    def _copy(self):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(self.rows)  # None -> boş alan -> NULL
+        sql = f'COPY {self.table.name} ({", ".join(self.columns)}) FROM STDIN WITH (FORMAT csv)'
+        cursor = self.connection.connection.cursor()
+        try:
+            if hasattr(cursor, 'copy_expert'):
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+            else:
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+
+def _next_id(model):
+    from app import db
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+def _reset_sequences(tables):
+    """COPY/INSERT kimlikleri açıkça verdiğinden PostgreSQL dizileri ileri alınır."""
+    from app import db
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+def generate(rng, users, products, images, rentals, swaps, messages, start, days,
+             seller_alpha=1.1, hot_fraction=0.01, hot_share=0.3, chatty_share=0.3,
+             password='seed1234', batch_size=10000, echo=print):
+    """Veriyi üretir ve commit eder; tablo başına yazılan satır sayısını döner."""
+    from app import bcrypt, db, janitor, stats, storage
+    from app.janitor import schedule_file_deletion
+    from app.models import Conversation, Message, Product, ProductImage, StoredFile, SwapOffer, Transaction, User
+    from app.utils import upsert_increment
+
+    span = days * 86400
+    counts = {}
+
+    def step(name, writer):
+        counts[name] = writer.count
+        db.session.commit()
+        echo(f"{name}: {writer.count} satır ({time.perf_counter() - started:.1f} sn)")
+
+    started = time.perf_counter()
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(text('PRAGMA synchronous = OFF'))
+
+    # 1. KULLANICILAR
+    first_user = _next_id(User)
+    user_ids = list(range(first_user, first_user + users))
+    user_created = array('d')  # başlangıçtan itibaren saniye
+    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    columns = ('id', 'username', 'email', 'password_hash', 'role', 'created_at', 'location',
+               'unread_count', 'token_version')
+    with BulkWriter(User.__table__, columns, batch_size) as writer:
+        for user_id in user_ids:
+            offset = rng.random() * span * 0.8
+            user_created.append(offset)
+            writer.add((user_id, f'user{user_id}', f'user{user_id}@seed.example', password_hash, 'customer',
+                        start + timedelta(seconds=offset), rng.choice(('İstanbul', 'Ankara', 'İzmir', None)), 0, 0))
+    step('users', writer)
+
+    rng.shuffle(user_ids)  # üs yasasındaki sıralar kimlik sırasından bağımsız olsun
+    pick_seller = PowerLaw(rng, user_ids, seller_alpha)
+
+    def pick_other_user(user_id):
+        other = first_user + rng.randrange(users)
+        return other if other != user_id or users == 1 else first_user + (other - first_user + 1) % users
+
+    # 2. YER TUTUCU RESİMLER (içerik adresli depo; referans sayıları sonda düzeltilir)
+    placeholders = [storage.save_bytes(placeholder_gif(*(rng.randrange(256) for _ in range(3))), '.gif', 'image/gif')
+                    for _ in range(min(PLACEHOLDER_IMAGES, max(products, 1)))]
+    image_refs = [0] * len(placeholders)
+
+    def pick_image():
+        index = rng.randrange(len(placeholders))
+        image_refs[index] += 1
+        return placeholders[index]
+
+    # 3. ÜRÜNLER ve RESİMLERİ
+    first_product = _next_id(Product)
+    owners = array('l')
+    prices = array('d')
+    product_columns = ('id', 'title', 'description', 'category', 'price', 'listing_type', 'status',
+                       'image_url', 'created_at', 'owner_id')
+    image_columns = ('id', 'image_url', 'product_id')
+    next_image_id = _next_id(ProductImage)
+    with BulkWriter(Product.__table__, product_columns, batch_size) as product_writer, \
+            BulkWriter(ProductImage.__table__, image_columns, batch_size) as image_writer:
+        for product_id in range(first_product, first_product + products):
+            owner_id = pick_seller()
+            created = user_created[owner_id - first_user]
+            price = float(round(rng.lognormvariate(5, 1.2), 2))
+            title = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}'
+            gallery = [pick_image() for _ in range(rng.randint(1, images))] if images else []
+            owners.append(owner_id)
+            prices.append(price)
+            product_writer.add((
+                product_id, title, f'{title}. {rng.choice(CATEGORIES)} kategorisinde, iyi durumda.',
+                rng.choice(CATEGORIES), price, rng.choices(('sale', 'rent', 'swap'), (5, 4, 1))[0],
+                'available' if rng.random() < 0.85 else 'sold',
+                gallery[0] if gallery else None,
+                start + timedelta(seconds=created + rng.random() * (span - created)), owner_id,
+            ))
+            for url in gallery:
+                image_writer.add((next_image_id, url, product_id))
+                next_image_id += 1
+    step('products', product_writer)
+    step('product_images', image_writer)
+
+    # save_bytes her resim için bir referans aldı; kullanılmayanlar silme kuyruğuna gider
+    for url, refs in zip(placeholders, image_refs):
+        if refs:
+            upsert_increment(StoredFile, {'key': storage.backend.key_from_url(url)}, {'refcount': refs - 1})
+        else:
+            schedule_file_deletion(url)
+    db.session.commit()
+    janitor.wake()
+
+    hot_products = rng.sample(range(first_product, first_product + products),
+                              max(1, int(products * hot_fraction))) if products else []
+
+    def pick_product():
+        if rng.random() < hot_share:
+            return rng.choice(hot_products)
+        return first_product + rng.randrange(products)
+
+    # 4. KİRALAMA / SATIŞ İŞLEMLERİ
+    # Onaylı kiralamalar aynı ürün için çakışamaz (app/booking.py): her ürünün onaylıları
+    # 10 günlük ardışık dilimlere yerleştirilir
+    approved_slots = array('l', [0]) * products
+    columns = ('id', 'product_id', 'buyer_id', 'seller_id', 'transaction_type', 'price', 'status',
+               'start_date', 'end_date', 'created_at')
+    first_transaction = _next_id(Transaction)
+    with BulkWriter(Transaction.__table__, columns, batch_size) as writer:
+        for transaction_id in range(first_transaction, first_transaction + (rentals if products else 0)):
+            product_id = pick_product()
+            seller_id = owners[product_id - first_product]
+            buyer_id = pick_other_user(seller_id)
+            created = start + timedelta(seconds=rng.random() * span)
+            if rng.random() < 0.25:
+                writer.add((transaction_id, product_id, buyer_id, seller_id, 'SALE',
+                            prices[product_id - first_product], 'COMPLETED', None, None, created))
+                continue
+
+            status = rng.choices(('PENDING', 'APPROVED', 'REJECTED', 'COMPLETED'), (3, 4, 1, 2))[0]
+            length = rng.randint(1, 7)
+            if status == 'APPROVED':
+                slot = approved_slots[product_id - first_product]
+                approved_slots[product_id - first_product] = slot + 1
+                start_date = start.date() + timedelta(days=slot * 10 + rng.randint(0, 9 - length))
+            else:
+                start_date = (created + timedelta(days=rng.randint(1, 30))).date()
+            writer.add((transaction_id, product_id, buyer_id, seller_id, 'RENT',
+                        round(prices[product_id - first_product] * length, 2), status,
+                        start_date, start_date + timedelta(days=length), created))
+    step('transactions', writer)
+
+    # 5. TAKAS TEKLİFLERİ
+    columns = ('id', 'offerer_id', 'target_product_id', 'offered_product_id', 'message', 'status', 'created_at')
+    first_offer = _next_id(SwapOffer)
+    with BulkWriter(SwapOffer.__table__, columns, batch_size) as writer:
+        offer_id = first_offer
+        for _ in range(swaps if products > 1 else 0):
+            target_id = pick_product()
+            offered_id = first_product + rng.randrange(products)
+            offerer_id = owners[offered_id - first_product]
+            if offerer_id == owners[target_id - first_product]:
+                continue  # kendi ürününe teklif verilemez
+            writer.add((offer_id, offerer_id, target_id, offered_id, rng.choice(MESSAGE_LINES),
+                        rng.choices(('PENDING', 'APPROVED', 'REJECTED'), (5, 2, 3))[0],
+                        start + timedelta(seconds=rng.random() * span)))
+            offer_id += 1
+    step('swap_offers', writer)
+
+    # 6. MESAJLAR ve SOHBET ÖZETLERİ
+    # Sohbet çiftleri önceden seçilir; ilk %1'i (konuşkan) mesajların chatty_share kadarını alır.
+    # Mesajlar zaman sırasıyla üretildiğinden her çiftin son mesajı, üretilen son mesajıdır.
+    pairs = []
+    if users > 1 and messages:
+        seen = set()
+        for _ in range(max(1, messages // 25) * 3):
+            a = pick_seller()
+            pair = Conversation.pair(a, pick_other_user(a))
+            if pair[0] != pair[1] and pair not in seen:
+                seen.add(pair)
+                pairs.append(pair)
+            if len(pairs) >= max(1, messages // 25):
+                break
+    chatty = pairs[:max(1, len(pairs) // 100)]
+    summaries = {}  # çift -> [son mesaj id, önizleme, zaman, unread_low, unread_high]
+    unread = {}
+
+    columns = ('id', 'sender_id', 'receiver_id', 'product_id', 'content', 'is_read', 'created_at')
+    first_message = _next_id(Message)
+    with BulkWriter(Message.__table__, columns, batch_size) as writer:
+        for i in range(messages if pairs else 0):
+            message_id = first_message + i
+            low, high = rng.choice(chatty) if rng.random() < chatty_share else rng.choice(pairs)
+            sender_id, receiver_id = (low, high) if rng.random() < 0.5 else (high, low)
+            created = start + timedelta(seconds=span * (i + rng.random()) / messages)
+            content = rng.choice(MESSAGE_LINES)
+            # Son mesajlara doğru okunmamış oranı artar
+            is_read = rng.random() > 0.3 * (i / messages) ** 8
+            product_id = first_product + rng.randrange(products) if products and rng.random() < 0.3 else None
+            writer.add((message_id, sender_id, receiver_id, product_id, content, is_read, created))
+
+            summary = summaries.get((low, high))
+            if summary is None:
+                summary = summaries[(low, high)] = [None, None, None, 0, 0]
+            summary[0:3] = message_id, content[:Conversation.PREVIEW_LENGTH], created
+            if not is_read:
+                summary[3 if receiver_id == low else 4] += 1
+                unread[receiver_id] = unread.get(receiver_id, 0) + 1
+    step('messages', writer)
+
+    columns = ('id', 'user_low_id', 'user_high_id', 'last_message_id', 'last_message_preview',
+               'last_message_at', 'unread_low', 'unread_high')
+    first_conversation = _next_id(Conversation)
+    with BulkWriter(Conversation.__table__, columns, batch_size) as writer:
+        for conversation_id, ((low, high), summary) in enumerate(summaries.items(), first_conversation):
+            writer.add((conversation_id, low, high, *summary))
+    step('conversations', writer)
+
+    if unread:
+        stmt = update(User.__table__).where(User.__table__.c.id == bindparam('user_id'))\
+            .values(unread_count=bindparam('count'))
+        items = [{'user_id': user_id, 'count': count} for user_id, count in unread.items()]
+        for i in range(0, len(items), batch_size):
+            db.session.execute(stmt, items[i:i + batch_size])
+
+    _reset_sequences(('users', 'products', 'product_images', 'transactions', 'swap_offers', 'messages', 'conversations'))
+    stats.rebuild()
+    db.session.commit()
+    echo(f"Sayaçlar ve istatistikler güncellendi ({time.perf_counter() - started:.1f} sn)")
+    return counts
+
+
+@click.command('seed')
+@click.option('--users', default=1000, show_default=True)
+@click.option('--products', default=10000, show_default=True)
+@click.option('--images', default=3, show_default=True, help='Ürün başına en fazla resim.')
+@click.option('--rentals', default=20000, show_default=True, help='Kiralama/satış işlemi sayısı.')
+@click.option('--swaps', default=5000, show_default=True, help='Takas teklifi sayısı.')
+@click.option('--messages', default=50000, show_default=True)
+@click.option('--seed', 'seed_value', default=42, show_default=True, help='Rastgelelik tohumu (aynı tohum, aynı veri).')
+@click.option('--start', default='2025-01-01', show_default=True, help='Verinin başladığı tarih (YYYY-AA-GG).')
+@click.option('--days', default=365, show_default=True, help='Verinin yayıldığı gün sayısı.')
+@click.option('--seller-alpha', default=1.1, show_default=True, help='Satıcı dağılımının üssü (büyük = daha yığılmış).')
+@click.option('--hot-fraction', default=0.01, show_default=True, help='Popüler ürünlerin oranı.')
+@click.option('--hot-share', default=0.3, show_default=True, help='İşlem ve tekliflerin popüler ürünlere düşen payı.')
+@click.option('--chatty-share', default=0.3, show_default=True, help='Mesajların konuşkan sohbetlere (ilk %1) düşen payı.')
+@click.option('--password', default='seed1234', show_default=True, help='Tüm üretilen kullanıcıların şifresi.')
+@click.option('--batch-size', default=10000, show_default=True)
+@with_appcontext
+def seed_command(seed_value, start, **options):
+    """Yük testi için sentetik kullanıcı, ürün, işlem, teklif ve mesaj üretir."""
+    try:
+        start = datetime.strptime(start, '%Y-%m-%d')
+    except ValueError:
+        raise click.BadParameter('YYYY-AA-GG biçiminde olmalı.', param_hint='--start')
+    for name in ('hot_fraction', 'hot_share', 'chatty_share'):
+        if not 0 <= options[name] <= 1:
+            raise click.BadParameter('0 ile 1 arasında olmalı.', param_hint=f"--{name.replace('_', '-')}")
+
+    counts = generate(random.Random(seed_value), start=start, echo=click.echo, **options)
+    click.echo(f"Tamamlandı: {sum(counts.values())} satır.")
@@ -0,0 +1,114 @@
+from datetime import datetime
+from decimal import Decimal
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func
+from app import db
+from app.models import DailyStat, PlatformCounter, Product, Transaction, User
+from app.utils import upsert_increment
+
+# Yönetim paneli istatistikleri.
+# Sayaçlar (platform_counters) ve günlük özet (daily_stats) her yazma işleminde, aynı
+# transaction içinde artımlı olarak güncellenir; panel ham tabloları taramaz.
+# 'flask stats rebuild' tüm değerleri ham tablolardan yeniden hesaplar (kayma onarımı /
+# periyodik rollup için cron'a eklenebilir).
+
+COMMISSION_RATE = Decimal('0.03')
+COUNTERS = ('users', 'active_products', 'completed_volume')
+
+
+def adjust(**deltas):
+    """Sayaçlara artış/azalış uygular: adjust(users=1), adjust(active_products=-1, completed_volume=120)."""
+    for name, delta in deltas.items():
+        if name not in COUNTERS:
+            raise ValueError(f'Bilinmeyen sayaç: {name}')
+        if delta:
+            upsert_increment(PlatformCounter, {'name': name}, {'value': delta})
+
+def record_daily(day=None, **deltas):
+    """Günlük satıra artış uygular: record_daily(new_users=1)."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if deltas:
+        upsert_increment(DailyStat, {'day': day or datetime.utcnow().date()}, deltas)
+
+def record_completed_transaction(price, day=None, sign=1):
+    """Tamamlanan (veya sign=-1 ile silinen) bir işlemin hacmini sayaçlara ve güne işler."""
+    price = Decimal(str(price or 0))
+    adjust(completed_volume=sign * price)
+    record_daily(day, completed_transactions=sign, completed_volume=sign * price)
+
+# Günlük özetteki new_users / new_products o gün oluşturulup hâlâ duran kayıtları sayar
+# (rebuild() ile aynı tanım); silinen kaydın oluşturulduğu günden düşülür.
+
+def record_user_removed(user):
+    """Kullanıcı silinmeden önce çağrılır: kullanıcı sayacını ve oluşturulduğu günü geri alır."""
+    adjust(users=-1)
+    if user.created_at:
+        record_daily(user.created_at.date(), new_users=-1)
+
+def record_product_removed(product):
+    """
+    Ürün (ve ona bağlı işlemler) silinmeden önce çağrılır: aktif ürün sayacını, ürünün
+    oluşturulduğu günü ve silinecek tamamlanmış işlemlerin hacmini geri alır.
+    """
+    if product.status == 'available':
+        adjust(active_products=-1)
+    if product.created_at:
+        record_daily(product.created_at.date(), new_products=-1)
+    completed = db.session.query(Transaction.price, Transaction.created_at).filter(
+        Transaction.product_id == product.id, Transaction.status == 'COMPLETED'
+    ).all()
+    for price, created_at in completed:
+        record_completed_transaction(price, created_at.date() if created_at else None, sign=-1)
+
+def get_counters():
+    values = dict(db.session.query(PlatformCounter.name, PlatformCounter.value).all())
+    if any(name not in values for name in COUNTERS):
+        # Eksik sayaç varsa (ör. tablo sonradan kurulmuşsa) hepsini ham tablolardan hesapla;
+        # aksi halde ilk yazmayla oluşan satır 0'dan başlamış olur
+        rebuild()
+        db.session.commit()
+        values = dict(db.session.query(PlatformCounter.name, PlatformCounter.value).all())
+    return {name: values.get(name, 0) for name in COUNTERS}
+
+def rebuild():
+    """Sayaçları ve günlük özetleri ham tablolardan yeniden hesaplar (commit çağırana aittir)."""
+    completed = Transaction.status == 'COMPLETED'
+    totals = {
+        'users': db.session.query(func.count(User.id)).scalar() or 0,
+        'active_products': db.session.query(func.count(Product.id)).filter(Product.status == 'available').scalar() or 0,
+        'completed_volume': db.session.query(func.sum(Transaction.price)).filter(completed).scalar() or 0,
+    }
+    PlatformCounter.query.delete()
+    db.session.add_all([PlatformCounter(name=name, value=value) for name, value in totals.items()])
+
+    days = {}
+    def row(day):
+        if isinstance(day, str):
+            day = datetime.strptime(day, '%Y-%m-%d').date()
+        return days.setdefault(day, DailyStat(
+            day=day, new_users=0, new_products=0, completed_transactions=0, completed_volume=0
+        ))
+
+    for day, count in db.session.query(func.date(User.created_at), func.count()).filter(User.created_at.isnot(None)).group_by(func.date(User.created_at)):
+        row(day).new_users = count
+    for day, count in db.session.query(func.date(Product.created_at), func.count()).filter(Product.created_at.isnot(None)).group_by(func.date(Product.created_at)):
+        row(day).new_products = count
+    for day, count, volume in db.session.query(func.date(Transaction.created_at), func.count(), func.sum(Transaction.price))\
+            .filter(completed, Transaction.created_at.isnot(None)).group_by(func.date(Transaction.created_at)):
+        row(day).completed_transactions = count
+        row(day).completed_volume = volume or 0
+
+    DailyStat.query.delete()
+    db.session.add_all(days.values())
+    return totals
+
+
+stats_cli = AppGroup('stats', help='Yönetim paneli istatistikleri.')
+
+@stats_cli.command('rebuild')
+def rebuild_command():
+    """Sayaçları ve günlük özetleri ham tablolardan yeniden hesaplar."""
+    totals = rebuild()
+    db.session.commit()
+    click.echo(f"İstatistikler yeniden hesaplandı: {totals}")
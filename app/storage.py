@@ -0,0 +1,397 @@
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+    ClientError = Exception
+
+# İçerik adresli dosya deposu.
+# Yüklenen dosya okunurken SHA-256 özeti hesaplanır ve dosya 'ab/cd/<özet><uzantı>'
+# anahtarıyla saklanır; aynı içerik ikinci kez yüklenirse yeniden yazılmaz.
+# Her anahtarın kaç kayıtta kullanıldığı stored_files.refcount'ta tutulur. Fiziksel
+# silme yalnızca son referans bırakıldığında yapılır.
+# Yükleme ile silme yarışmasın diye: save() satırı yeni açtıysa (refcount 1) dosyayı her
+# zaman yeniden yazar; remove() silmeden önce anahtarı refcount 0 bir satırla sahiplenir.
+# Bu satır eklenirken aynı anahtarı alıp commit etmemiş bir save() beklenir, silme
+# sürerken gelen save() de remove()'u çağıranın commit'ini bekler.
+# Arka uçlar: 'local' (static/uploads/objects altında) ve 's3' (S3 uyumlu; boto3 gerekir).
+
+CHUNK_SIZE = 64 * 1024
+EXTENSION_RE = re.compile(r'^\.[a-z0-9]{1,8}$')
+SNIFF_BYTES = 16
+
+
+def content_key(digest, ext):
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+def clean_extension(filename_or_ext):
+    """'foto.JPG' veya '.jpg' -> '.jpg'; güvenli olmayan uzantılar '' olur."""
+    ext = (os.path.splitext(filename_or_ext)[1] or filename_or_ext).lower()
+    return ext if EXTENSION_RE.match(ext) else ''
+
+def format_size(size):
+    """1536 -> '1.5 KB', 10485760 -> '10 MB', 500 -> '500 bayt'."""
+    for unit, factor in (('MB', 1024 * 1024), ('KB', 1024)):
+        if size >= factor:
+            return f'{size / factor:.1f}'.rstrip('0').rstrip('.') + f' {unit}'
+    return f'{size} bayt'
+
+
+def sniff_content_type(head):
+    """Dosyanın ilk baytlarından resim türünü tanır; istemcinin bildirdiği türe güvenilmez."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[4:8] == b'ftyp' and head[8:12] in (b'avif', b'avis'):
+        return 'image/avif'
+    if head[4:8] == b'ftyp' and head[8:12] in (b'heic', b'heix', b'mif1'):
+        return 'image/heic'
+    return None
+
+
+class HashingUpload:
+    """
+    Multipart ayrıştırılırken dosya parçalarının yazıldığı geçici dosya.
+    Yazarken SHA-256 özetini çıkarır, dosya başına boyut sınırını ve (ilk baytlardan)
+    tür kontrolünü uygular; sınır aşılırsa okuma o anda kesilir.
+    """
+
+    def __init__(self, directory, max_size=None, allowed_types=None):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', delete=False)
+        self.path = self.file.name
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.max_size = max_size
+        self.allowed_types = allowed_types
+        self.content_type = None
+        self._head = b''
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size and self.size > self.max_size:
+            self.close()
+            raise RequestEntityTooLarge(f'Dosya boyutu sınırı aşıldı (en fazla {format_size(self.max_size)}).')
+        if self.content_type is None and len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_type()
+        self.hasher.update(data)
+        return self.file.write(data)
+
+    def seek(self, offset, whence=0):
+        # Ayrıştırıcı dosya bitince başa sarar; çok küçük dosyaların türü burada denetlenir
+        if self.content_type is None:
+            self._check_type()
+        return self.file.seek(offset, whence)
+
+    def _check_type(self):
+        self.content_type = sniff_content_type(self._head) or ''
+        if self.allowed_types and self.content_type not in self.allowed_types:
+            self.close()
+            raise UnsupportedMediaType('Desteklenmeyen dosya türü.')
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+    def detach(self):
+        """Yazmayı bitirir ve dosya yolunu döner (dosya taşınmadan önce kapatılmalı)."""
+        self.file.close()
+        return self.path
+
+    def close(self):
+        """Dosya depoya taşınmadıysa geçici dosyayı siler."""
+        self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+class UploadRequest(Request):
+    """Yüklemeleri HashingUpload'a akıtan istek sınıfı (app.request_class)."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        from app import storage
+
+        upload = HashingUpload(
+            storage.temp_dir,
+            current_app.config.get('UPLOAD_MAX_FILE_SIZE'),
+            current_app.config.get('UPLOAD_ALLOWED_TYPES'),
+        )
+        self.__dict__.setdefault('_uploads', []).append(upload)
+        return upload
+
+    def close(self):
+        super().close()
+        # Ayrıştırma yarıda kesildiyse request.files'a hiç girmemiş geçici dosyalar da temizlenir
+        for upload in self.__dict__.get('_uploads', ()):
+            upload.close()
+
+
+class LocalBackend:
+    """Dosyaları yerel diskte, parçalı (sharded) klasörlerde tutar."""
+
+    def __init__(self, root, url_prefix):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip('/')
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, fileobj, content_type=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Geçici dosyaya yazıp atomik olarak yerine koy; yarım dosya asla görünmez
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_file(self, key, path, content_type=None):
+        """Geçici dosyayı kopyalamadan yerine taşır (aynı dosya sistemi)."""
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            os.replace(path, dest)
+        except OSError:
+            shutil.move(path, dest)
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key):
+        return f'{self.url_prefix}/{key}'
+
+    def key_from_url(self, url):
+        prefix = self.url_prefix + '/'
+        return url[len(prefix):] if url and url.startswith(prefix) else None
+
+    def path(self, key):
+        return self._path(key)
+
+
+class S3Backend:
+    """S3 uyumlu nesne deposu (AWS S3, MinIO, Ceph RGW...). İstemci boto3 'client' arayüzündedir."""
+
+    def __init__(self, client, bucket, public_url, prefix=''):
+        self.client = client
+        self.bucket = bucket
+        self.public_url = public_url.rstrip('/')
+        self.prefix = prefix
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def put(self, key, fileobj, content_type=None):
+        extra = {'CacheControl': 'public, max-age=31536000, immutable'}
+        if content_type:
+            extra['ContentType'] = content_type
+        self.client.upload_fileobj(fileobj, self.bucket, self.prefix + key, ExtraArgs=extra)
+
+    def put_file(self, key, path, content_type=None):
+        with open(path, 'rb') as fileobj:
+            self.put(key, fileobj, content_type)
+
+    def open(self, key):
+        body = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)['Body']
+        return io.BytesIO(body.read())
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def url(self, key):
+        return f'{self.public_url}/{self.prefix}{key}'
+
+    def key_from_url(self, url):
+        prefix = f'{self.public_url}/{self.prefix}'
+        return url[len(prefix):] if url and url.startswith(prefix) else None
+
+    def path(self, key):
+        return None
+
+
+class Storage:
+    """
+    Flask eklentisi. Ayarlar:
+    STORAGE_BACKEND ('local' | 's3'), STORAGE_LOCAL_ROOT, STORAGE_LOCAL_URL,
+    STORAGE_S3_BUCKET, STORAGE_S3_ENDPOINT_URL, STORAGE_S3_PUBLIC_URL, STORAGE_S3_PREFIX
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.temp_dir = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        app.config.setdefault('STORAGE_BACKEND', 'local')
+        app.config.setdefault('STORAGE_LOCAL_ROOT', os.path.join(app.config['UPLOAD_FOLDER'], 'objects'))
+        app.config.setdefault('STORAGE_LOCAL_URL', '/static/uploads/objects')
+        app.config.setdefault('STORAGE_S3_BUCKET', None)
+        app.config.setdefault('STORAGE_S3_ENDPOINT_URL', None)
+        app.config.setdefault('STORAGE_S3_PUBLIC_URL', None)
+        app.config.setdefault('STORAGE_S3_PREFIX', '')
+
+        if backend is not None:
+            self.backend = backend
+        elif app.config['STORAGE_BACKEND'] == 's3':
+            if boto3 is None:
+                raise RuntimeError("STORAGE_BACKEND='s3' için 'boto3' paketi kurulu olmalı.")
+            bucket = app.config['STORAGE_S3_BUCKET']
+            endpoint = app.config['STORAGE_S3_ENDPOINT_URL']
+            public_url = app.config['STORAGE_S3_PUBLIC_URL'] or f"{endpoint or 'https://s3.amazonaws.com'}/{bucket}"
+            client = boto3.client('s3', endpoint_url=endpoint)
+            self.backend = S3Backend(client, bucket, public_url, app.config['STORAGE_S3_PREFIX'])
+        else:
+            self.backend = LocalBackend(app.config['STORAGE_LOCAL_ROOT'], app.config['STORAGE_LOCAL_URL'])
+
+        # Yerel depoda geçici yüklemeler aynı dosya sisteminde tutulur ki taşıma kopyasız olsun
+        self.temp_dir = os.path.join(self.backend.root, '.incoming') if isinstance(self.backend, LocalBackend) else None
+        app.extensions['storage'] = self
+
+    def save(self, stream, ext='', content_type=None):
+        """
+        Akışı parça parça okuyup özetini çıkarır ve saklar; URL döner. Referans sayısı
+        çağıranın transaction'ında artırılır (commit çağırana aittir).
+        """
+        if isinstance(stream, HashingUpload):
+            # Özet ve boyut yükleme sırasında hesaplandı; dosya yeniden okunmaz
+            key = content_key(stream.hexdigest(), clean_extension(ext))
+            if self._retain(key, stream.size) == 1 or not self.backend.exists(key):
+                self.backend.put_file(key, stream.detach(), stream.content_type or content_type)
+            return self.backend.url(key)
+
+        hasher = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as buffer:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                buffer.write(chunk)
+                size += len(chunk)
+
+            key = content_key(hasher.hexdigest(), clean_extension(ext))
+            if self._retain(key, size) == 1 or not self.backend.exists(key):
+                buffer.seek(0)
+                self.backend.put(key, buffer, content_type)
+        return self.backend.url(key)
+
+    def save_bytes(self, data, ext='', content_type=None):
+        return self.save(io.BytesIO(data), ext, content_type)
+
+    def open(self, url):
+        """Depodaki (veya eski düz yoldaki) dosyayı okumak için açar."""
+        key = self.backend.key_from_url(url)
+        if key:
+            return self.backend.open(key)
+        return open(legacy_path(url), 'rb')
+
+    def release(self, url):
+        """
+        Bir referansı çağıranın transaction'ında bırakır. Dosya artık kullanılmıyorsa True
+        döner; fiziksel silme commit'ten sonra remove() ile yapılır (bkz. app/janitor.py).
+        İçerik adresli olmayan (eski) URL'lerin referans sayısı yoktur, her zaman True döner.
+        """
+        from app import db
+        from app.models import StoredFile
+
+        key = self.backend.key_from_url(url)
+        if not key:
+            return True
+
+        remaining = db.session.execute(
+            db.update(StoredFile).where(StoredFile.key == key)
+            .values(refcount=StoredFile.refcount - 1)
+            .returning(StoredFile.refcount)
+        ).scalar()
+        if remaining is not None and remaining > 0:
+            return False
+
+        db.session.execute(db.delete(StoredFile).where(StoredFile.key == key, StoredFile.refcount <= 0))
+        return True
+
+    def remove(self, url):
+        """
+        Dosyayı fiziksel olarak siler. İçerik adresli dosya bu arada yeniden yüklenip
+        referans aldıysa silinmez. Commit çağırana aittir; anahtar commit'e kadar kilitli kalır.
+        """
+        from app import db
+        from app.models import StoredFile
+        from app.utils import insert_if_absent
+
+        key = self.backend.key_from_url(url)
+        if not key:
+            return delete_legacy_file(url)
+        if not insert_if_absent(StoredFile, {'key': key}, values={'refcount': 0}):
+            return False
+        try:
+            self.backend.delete(key)
+        finally:
+            db.session.execute(db.delete(StoredFile).where(StoredFile.key == key, StoredFile.refcount <= 0))
+        return True
+
+    def _retain(self, key, size):
+        """Referans sayısını artırır ve yeni değerini döner."""
+        from app.models import StoredFile
+        from app.utils import upsert_increment
+        return upsert_increment(StoredFile, {'key': key}, {'refcount': 1}, values={'size': size}).refcount
+
+
+def legacy_path(url):
+    return os.path.join(current_app.root_path, url.lstrip('/'))
+
+def delete_legacy_file(url):
+    """İçerik adresli depodan önceki 'uploads/products/<id>/<uuid>.jpg' dosyalarını siler."""
+    file_path = legacy_path(url)
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        return False
+
+    # Klasör boş kaldıysa (ör. products/<id>) kaldırılır; doluysa rmdir zaten başarısız olur
+    directory = os.path.dirname(file_path)
+    if os.path.basename(directory) != 'uploads':
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+    return True
@@ -1,8 +1,10 @@
+import base64
 import json
 import os
-import uuid
+from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
-from flask import current_app
+from flask import current_app, request
+from sqlalchemy.dialects import postgresql, sqlite
 
 def get_districts_by_city(city_name):
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,63 +20,103 @@ def get_districts_by_city(city_name):
         return []
     return []
 
-def delete_file_from_url(image_url):
+def save_file(file):
     """
-    Verilen resim URL'sinden tam dosya yolunu bulur ve siler.
-    Ayrıca klasör (ID klasörü) boş kalırsa onu da temizler.
+    Yüklenen dosyayı içerik adresli depoya kaydeder ve URL'sini döner.
+    Aynı içerik daha önce yüklendiyse yeniden yazılmaz, referans sayısı artar.
     """
-    try:
-        if not image_url: return False
-        relative_path = image_url.lstrip('/')
-        
-        file_path = os.path.join(current_app.root_path, relative_path)
-        
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"Dosya silindi: {file_path}")
-            
-            directory = os.path.dirname(file_path)
-            
-            if not os.listdir(directory) and 'uploads' not in os.path.basename(directory):
-                try:
-                    os.rmdir(directory)
-                    print(f"Boş klasör temizlendi: {directory}")
-                except OSError:
-                    pass
+    from app import storage
 
-            return True
-        else:
-            print(f"Dosya bulunamadı: {file_path}")
-            return False
+    if not file or not file.filename:
+        return None
 
-    except Exception as e:
-        print(f"Dosya silinirken hata oluştu: {e}")
-        return False
+    return storage.save(file.stream, secure_filename(file.filename), file.mimetype)
 
-def save_file(file, folder_name='others', specific_id=None):
+def encode_cursor(created_at, *keys):
     """
-    Dosyayı kaydeder.
-    specific_id: Eğer verilirse 'products/16' gibi alt klasör oluşturur.
+    Sayfalama imleci üretir: (created_at, id, ...) değerlerini opak bir metne çevirir.
     """
-    if not file or not file.filename:
+    payload = json.dumps([created_at.isoformat() if created_at else None, *keys])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, *key_types):
+    """
+    encode_cursor ile üretilen imleci çözer; created_at'ten sonraki değerler
+    key_types ile dönüştürülür (ör. decode_cursor(c, int)). Geçersizse None döner.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, *keys = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if len(keys) != len(key_types):
+            return None
+        keys = [key_type(key) for key_type, key in zip(key_types, keys)]
+        return ((datetime.fromisoformat(created_at) if created_at else None), *keys)
+    except (ValueError, TypeError):
+        return None
+
+def get_page_limit(default=20, maximum=100):
+    """
+    İstekteki 'limit' parametresini okur ve [1, maximum] aralığına sıkıştırır.
+    """
+    try:
+        limit = int(request.args.get('limit', default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+def merge_date_ranges(ranges):
+    """
+    Başlangıca göre sıralı (start, end) tarih aralıklarını birleştirir.
+    Çakışan ve uç uca eklenen (ertesi gün başlayan) aralıklar tek aralık olur.
+    """
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+def parse_date_arg(name):
+    """İstekteki 'YYYY-MM-DD' parametresini date'e çevirir; yoksa None, hatalıysa ValueError."""
+    value = request.args.get(name)
+    if not value:
         return None
+    return datetime.strptime(value.split('T')[0], '%Y-%m-%d').date()
 
-    original_filename = secure_filename(file.filename)
-    ext = os.path.splitext(original_filename)[1]
-    unique_filename = f"{uuid.uuid4().hex}{ext}"
-    base_folder = os.path.join(current_app.root_path, 'static', 'uploads')
+def _upsert_insert(model):
+    from app import db
 
-    if specific_id:
-        target_folder = os.path.join(base_folder, folder_name, str(specific_id))
-        relative_url = f"/static/uploads/{folder_name}/{specific_id}/{unique_filename}"
-    else:
-        target_folder = os.path.join(base_folder, folder_name)
-        relative_url = f"/static/uploads/{folder_name}/{unique_filename}"
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert(model)
+    if dialect == 'sqlite':
+        return sqlite.insert(model)
+    raise NotImplementedError(f'{dialect} için upsert desteklenmiyor.')
 
-    if not os.path.exists(target_folder):
-        os.makedirs(target_folder)
+def upsert_increment(model, keys, increments, values=None):
+    """
+    Satır yoksa ekler, varsa sütunlara artış uygular (INSERT ... ON CONFLICT DO UPDATE).
+    values: yalnızca ilk eklemede yazılan ek sütunlar. Artırılan sütunların yeni
+    değerlerini (satır olarak) döner.
+    """
+    from app import db
+
+    stmt = _upsert_insert(model).values(**keys, **increments, **(values or {}))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: getattr(model, name) + stmt.excluded[name] for name in increments}
+    ).returning(*(getattr(model, name) for name in increments))
+    return db.session.execute(stmt).one()
+
+def insert_if_absent(model, keys, values=None):
+    """
+    Satır yoksa ekler (INSERT ... ON CONFLICT DO NOTHING); eklediyse True döner.
+    Aynı anahtarı ekleyip henüz commit etmemiş bir transaction varsa onun bitmesini bekler.
+    """
+    from app import db
 
-    file_path = os.path.join(target_folder, unique_filename)
-    file.save(file_path)
-    
-    return relative_url
\ No newline at end of file
+    stmt = _upsert_insert(model).values(**keys, **(values or {}))
+    stmt = stmt.on_conflict_do_nothing(index_elements=list(keys))
+    return db.session.execute(stmt).rowcount == 1
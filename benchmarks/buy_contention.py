@@ -0,0 +1,120 @@
+"""
+Satın alma eşzamanlılık testi: aynı ürünü çok sayıda iş parçacığı aynı anda almaya çalışır.
+Her ürün için tam olarak bir başarılı satın alma (201) ve tek bir SALE kaydı beklenir.
+
+Kullanım:
+    python benchmarks/buy_contention.py --products 20 --buyers 16
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/buy_contention.py
+
+Not: --database-url (veya BENCH_DATABASE_URL) verilirse tablolar o veritabanında oluşturulur
+ve silinir; yalnızca bu iş için ayrılmış boş bir veritabanı verin. Uygulamanın DATABASE_URL'i
+bilerek kullanılmaz.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert
+
+from app import create_app, db
+from app.config import Config
+from app.models import Product, Transaction, User
+from app.security import issue_access_token
+
+
+def build_app(database_url):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 32, 'max_overflow': 32} \
+            if database_url.startswith('postgresql') else {'connect_args': {'timeout': 30}}
+
+    return create_app(BenchConfig)
+
+def seed(products, buyers):
+    db.session.execute(insert(User), [{
+        'username': f'buyer_{i}', 'email': f'buyer_{i}@example.com', 'password_hash': 'x', 'role': 'customer'
+    } for i in range(buyers + 1)])
+    seller_id = db.session.query(func.min(User.id)).scalar()
+    db.session.execute(insert(Product), [{
+        'title': f'Popüler ürün {i}', 'category': 'Elektronik', 'price': 100.0,
+        'listing_type': 'sale', 'status': 'available', 'owner_id': seller_id,
+    } for i in range(products)])
+    db.session.commit()
+    buyer_ids = [u.id for u in User.query.filter(User.id != seller_id).all()]
+    product_ids = [p.id for p in Product.query.all()]
+    return buyer_ids, product_ids
+
+def contend(app, product_id, tokens):
+    results = Counter()
+    barrier = threading.Barrier(len(tokens))
+    lock = threading.Lock()
+
+    def worker(token):
+        client = app.test_client()
+        barrier.wait()
+        r = client.post('/api/transactions/buy', json={'product_id': product_id},
+                        headers={'Authorization': f'Bearer {token}'})
+        with lock:
+            results[r.status_code] += 1
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in tokens]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--buyers', type=int, default=16)
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL'),
+                        help='Tabloları silinecek ayrı bir veritabanı (varsayılan: geçici SQLite).')
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url and database_url == os.environ.get('DATABASE_URL'):
+        parser.error("--database-url uygulamanın DATABASE_URL'i olamaz (tablolar silinir).")
+    if not database_url:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    app = build_app(database_url)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        buyer_ids, product_ids = seed(args.products, args.buyers)
+        tokens = [issue_access_token(db.session.get(User, uid)) for uid in buyer_ids]
+
+    totals = Counter()
+    failures = 0
+    started = time.perf_counter()
+    for product_id in product_ids:
+        results = contend(app, product_id, tokens)
+        totals.update(results)
+        if results[201] != 1:
+            failures += 1
+            print(f'HATA: ürün {product_id} için {results[201]} başarılı satın alma: {dict(results)}')
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        per_product = db.session.query(Transaction.product_id, func.count())\
+            .group_by(Transaction.product_id).all()
+        duplicates = [pid for pid, count in per_product if count != 1]
+        db.drop_all()
+
+    attempts = sum(totals.values())
+    print(f'{len(product_ids)} ürün x {len(tokens)} alıcı = {attempts} deneme, {elapsed:.2f} sn')
+    print(f'Durum kodları: {dict(totals)}')
+    print(f'Verim: {attempts / elapsed:,.0f} deneme/sn')
+
+    if failures or duplicates or len(per_product) != len(product_ids):
+        print('SONUÇ: BAŞARISIZ (birden fazla ya da hiç kazanan olmayan ürünler var)')
+        sys.exit(1)
+    print('SONUÇ: Her ürün için tam olarak bir kazanan.')
+
+if __name__ == '__main__':
+    main()
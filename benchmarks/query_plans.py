@@ -0,0 +1,280 @@
+"""
+Uç nokta sorgularının planları: her sıcak uç noktanın sorgusu tohumlanmış veride
+EXPLAIN ANALYZE (PostgreSQL) / EXPLAIN QUERY PLAN (SQLite) ile çalıştırılır; plan ve
+en iyi çalışma süresi raporlanır.
+
+Kullanım:
+    python benchmarks/query_plans.py                      # geçici SQLite
+    python benchmarks/query_plans.py --compare            # sorgu indeksleri olmadan da ölç
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/query_plans.py --users 5000 --products 200000
+
+Not: --database-url (veya BENCH_DATABASE_URL) verilirse tablolar o veritabanında oluşturulur
+ve silinir; yalnızca bu iş için ayrılmış boş bir veritabanı verin. Uygulamanın DATABASE_URL'i
+bilerek kullanılmaz.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, func, insert, or_, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app import create_app, db
+from app.config import Config
+from app.models import Conversation, Message, Product, ProductImage, SwapOffer, Transaction, User
+from app.read_models import (
+    admin_transactions_select, conversations_select, my_products_select, product_list_select, request_feed_select
+)
+
+# 6f4b1d9e2c57 (sorgu indeksleri) ile eklenenler; --compare bunları silip yeniden ölçer
+QUERY_INDEXES = {
+    'products': ('ix_products_status_category_created_at_id', 'ix_products_owner_created_at'),
+    'product_images': ('ix_product_images_product',),
+    'transactions': ('ix_transactions_seller_created_at', 'ix_transactions_buyer_created_at', 'ix_transactions_created_at'),
+    'swap_offers': ('ix_swap_offers_target_offered_status', 'ix_swap_offers_offered_product', 'ix_swap_offers_offerer_created_at'),
+}
+CATEGORIES = ('Elektronik', 'Giyim', 'Ev', 'Kitap', 'Spor', 'Oyuncak', 'Bahçe', 'Müzik')
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if compiler.dialect.name == 'postgresql' else 'EXPLAIN QUERY PLAN '
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def build_app(database_url):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    return create_app(BenchConfig)
+
+def _batched(rows, batch_size=5000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _insert(model, rows):
+    for batch in _batched(rows):
+        db.session.execute(insert(model), batch)
+
+def seed(users, products, rng):
+    """Satıcılar üs yasasına göre dağılır: az sayıda kullanıcı ürünlerin çoğunu listeler."""
+    base = datetime(2025, 1, 1)
+    _insert(User, ({
+        'username': f'bench_{i}', 'email': f'bench_{i}@example.com', 'password_hash': 'x', 'role': 'customer',
+        'created_at': base,
+    } for i in range(users)))
+
+    def owner():
+        return min(int(rng.paretovariate(1.2)), users)
+
+    _insert(Product, ({
+        'title': f'Ürün {i}', 'description': 'Açıklama', 'category': rng.choice(CATEGORIES),
+        'price': float(rng.randint(10, 5000)), 'listing_type': rng.choice(('sale', 'rent', 'swap')),
+        'status': 'available' if rng.random() < 0.8 else 'sold',
+        'image_url': f'/static/uploads/products/{i}/a.jpg',
+        'created_at': base + timedelta(minutes=i), 'owner_id': owner(),
+    } for i in range(products)))
+
+    _insert(ProductImage, ({
+        'product_id': product_id, 'image_url': f'/static/uploads/products/{product_id}/{n}.jpg',
+    } for product_id in range(1, products + 1) for n in range(3)))
+
+    # Onaylı kiralamalar çakışamaz (app/booking.py); her ürünün onaylıları art arda dizilir
+    next_free = {}
+
+    def transaction(i):
+        product_id = rng.randint(1, products)
+        status = rng.choice(('PENDING', 'APPROVED', 'COMPLETED'))
+        start = date(2025, 1, 1) + timedelta(days=rng.randint(0, 600))
+        if status == 'APPROVED':
+            start = max(start, next_free.get(product_id, start))
+        end = start + timedelta(days=rng.randint(1, 10))
+        if status == 'APPROVED':
+            next_free[product_id] = end + timedelta(days=1)
+        return {
+            'product_id': product_id, 'buyer_id': owner(), 'seller_id': owner(),
+            'transaction_type': 'RENT', 'price': 100, 'status': status,
+            'start_date': start, 'end_date': end,
+            'created_at': base + timedelta(minutes=i * 3),
+        }
+    _insert(Transaction, (transaction(i) for i in range(products)))
+
+    _insert(SwapOffer, ({
+        'offerer_id': owner(), 'target_product_id': rng.randint(1, products),
+        'offered_product_id': rng.randint(1, products), 'message': 'Takas?',
+        'status': rng.choice(('PENDING', 'ACCEPTED', 'REJECTED')), 'created_at': base + timedelta(minutes=i * 5),
+    } for i in range(products // 2)))
+
+    # Mesajlar: kullanıcı 1 ile 2 arasında uzun bir sohbet, gerisi rastgele çiftler
+    def message(i):
+        sender, receiver = (1, 2) if i % 4 == 0 else (owner(), rng.randint(1, users))
+        if i % 8 == 0:
+            sender, receiver = receiver, sender
+        return {
+            'sender_id': sender, 'receiver_id': receiver, 'content': f'Mesaj {i}',
+            'is_read': rng.random() < 0.7, 'created_at': base + timedelta(seconds=i * 30),
+        }
+    _insert(Message, (message(i) for i in range(products * 2)))
+
+    least, greatest = (func.min, func.max) if db.engine.dialect.name == 'sqlite' else (func.least, func.greatest)
+    low = least(Message.sender_id, Message.receiver_id)
+    high = greatest(Message.sender_id, Message.receiver_id)
+    pairs = db.session.query(low, high, func.max(Message.id), func.max(Message.created_at)).group_by(low, high).all()
+    _insert(Conversation, ({
+        'user_low_id': low, 'user_high_id': high, 'last_message_id': last_id,
+        'last_message_preview': 'Mesaj', 'last_message_at': last_at,
+    } for low, high, last_id, last_at in pairs if low != high))
+
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def endpoint_queries(hot_user, hot_product, offer):
+    """(ad, sorgu) çiftleri; uç noktaların çalıştırdığı sorgularla aynı biçimde."""
+    newest = product_list_select().order_by(Product.created_at.desc(), Product.id.desc())
+    history_filter = or_(
+        and_(Message.sender_id == 1, Message.receiver_id == 2),
+        and_(Message.sender_id == 2, Message.receiver_id == 1),
+    )
+    return [
+        ('products.list', newest.limit(20)),
+        ('products.list?category', newest.where(Product.category == 'Kitap').limit(20)),
+        ('products.detail', select(Product).options(joinedload(Product.owner), joinedload(Product.images))
+            .where(Product.id == hot_product)),
+        ('products.my_products', my_products_select(hot_user)),
+        ('products.availability', select(Transaction.start_date, Transaction.end_date).where(
+            Transaction.product_id == hot_product, Transaction.status == 'APPROVED',
+            Transaction.end_date >= date(2025, 6, 1)).order_by(Transaction.start_date)),
+        ('products.delete:swap_offers', select(SwapOffer.id).where(SwapOffer.offered_product_id == hot_product)),
+        ('transactions.incoming', request_feed_select(hot_user, 'incoming').limit(20)),
+        ('transactions.outgoing', request_feed_select(hot_user, 'outgoing').limit(20)),
+        ('transactions.incoming?status', request_feed_select(hot_user, 'incoming', status='PENDING').limit(20)),
+        ('swap.pending_check', select(SwapOffer.id).filter_by(
+            target_product_id=offer.target_product_id, offered_product_id=offer.offered_product_id,
+            status='PENDING').limit(1)),
+        ('messages.inbox', conversations_select(hot_user).limit(20)),
+        ('messages.history', select(Message.id, Message.sender_id, Message.content, Message.created_at)
+            .where(history_filter).order_by(Message.created_at.desc(), Message.id.desc()).limit(50)),
+        ('messages.unread', select(func.count()).select_from(Message).where(
+            Message.sender_id == 2, Message.receiver_id == 1, Message.is_read == False)),
+        ('admin.transactions', admin_transactions_select().limit(100)),
+    ]
+
+def explain(stmt):
+    # Sonuç sütunları iç sorgununkiyle eşleştirildiğinden tür dönüştürmeleri atlanır, satırlar ham okunur
+    rows = db.session.execute(Explain(stmt)).cursor.fetchall()
+    if db.engine.dialect.name == 'postgresql':
+        return [row[0] for row in rows]
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+def measure(stmt, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        # unique(): ürün detayı koleksiyon joinedload'u içerir
+        count = len(db.session.execute(stmt).unique().all())
+        elapsed = time.perf_counter() - started
+        db.session.expunge_all()
+        best = elapsed if best is None else min(best, elapsed)
+    return count, best
+
+def run(queries, repeat, verbose):
+    results = {}
+    for name, stmt in queries:
+        count, best = measure(stmt, repeat)
+        results[name] = best
+        print(f'{name:<32} {count:>6} satır  {best * 1000:>9.2f} ms')
+        if verbose:
+            for line in explain(stmt):
+                print(f'    {line}')
+    return results
+
+def set_query_indexes(create):
+    for table_name, names in QUERY_INDEXES.items():
+        table = db.metadata.tables[table_name]
+        for index in table.indexes:
+            if index.name in names:
+                (index.create if create else index.drop)(bind=db.engine)
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--compare', action='store_true', help='Sorgu indeksleri olmadan da çalıştırır.')
+    parser.add_argument('--quiet', action='store_true', help='Planları yazdırmaz, yalnızca süreleri.')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL'),
+                        help='Tabloları silinecek ayrı bir veritabanı (varsayılan: geçici SQLite).')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    database_url = args.database_url
+    if database_url and database_url == os.environ.get('DATABASE_URL'):
+        parser.error("--database-url uygulamanın DATABASE_URL'i olamaz (tablolar silinir).")
+    if not database_url:
+        tmp_dir = tempfile.mkdtemp()
+        database_url = 'sqlite:///' + os.path.join(tmp_dir, 'bench.db')
+
+    app = build_app(database_url)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f'{args.users} kullanıcı, {args.products} ürün ve ilişkili kayıtlar ekleniyor...')
+        seed(args.users, args.products, random.Random(args.seed))
+
+        # En çok ürünü olan satıcı ve en çok kiralanan ürün en kötü durumu temsil eder
+        hot_user = db.session.query(Product.owner_id).group_by(Product.owner_id)\
+            .order_by(func.count().desc()).limit(1).scalar()
+        hot_product = db.session.query(Transaction.product_id).group_by(Transaction.product_id)\
+            .order_by(func.count().desc()).limit(1).scalar()
+        offer = SwapOffer.query.first()
+        queries = endpoint_queries(hot_user, hot_product, offer)
+
+        print(f'\n== {db.engine.dialect.name}, sorgu indeksleriyle ==')
+        with_indexes = run(queries, args.repeat, not args.quiet)
+
+        if args.compare:
+            set_query_indexes(create=False)
+            print('\n== sorgu indeksleri olmadan ==')
+            without_indexes = run(queries, args.repeat, not args.quiet)
+            set_query_indexes(create=True)
+
+            print('\n== karşılaştırma ==')
+            for name, _ in queries:
+                before, after = without_indexes[name], with_indexes[name]
+                print(f'{name:<32} {before * 1000:>9.2f} ms -> {after * 1000:>9.2f} ms  ({before / after:.1f}x)')
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Liste okuma yolu karşılaştırması: ORM nesneleri vs. sütun projeksiyonlu Core select().
+
+Kullanım:
+    python benchmarks/read_models.py                 # 100.000 ürün, geçici SQLite
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/read_models.py --rows 100000
+
+Not: --database-url (veya BENCH_DATABASE_URL) verilirse tablolar o veritabanında oluşturulur
+ve silinir; yalnızca bu iş için ayrılmış boş bir veritabanı verin. Uygulamanın DATABASE_URL'i
+bilerek kullanılmaz.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from app import create_app, db
+from app.config import Config
+from app.models import Product, User
+from app.read_models import product_list_select, rows_to_dicts
+
+
+def build_app(database_url):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    return create_app(BenchConfig)
+
+def seed(rows, batch_size=5000):
+    db.session.execute(insert(User), [{
+        'username': f'bench_{i}', 'email': f'bench_{i}@example.com', 'password_hash': 'x', 'role': 'customer'
+    } for i in range(100)])
+
+    base = datetime(2025, 1, 1)
+    description = 'Uzun ürün açıklaması. ' * 40
+    for start in range(0, rows, batch_size):
+        db.session.execute(insert(Product), [{
+            'title': f'Ürün {i}',
+            'description': description,
+            'category': 'Elektronik',
+            'price': float(i % 1000),
+            'listing_type': 'sale',
+            'status': 'available',
+            'image_url': f'/static/uploads/products/{i}/a.jpg',
+            'created_at': base + timedelta(minutes=i),
+            'owner_id': (i % 100) + 1,
+        } for i in range(start, min(start + batch_size, rows))])
+    db.session.commit()
+
+def orm_path():
+    output = []
+    for product in Product.query.filter_by(status='available').order_by(Product.created_at.desc()).all():
+        output.append({
+            'id': product.id,
+            'title': product.title,
+            'description': product.description,
+            'category': product.category,
+            'price': product.price,
+            'image_url': product.image_url,
+            'status': product.status,
+            'owner_id': product.owner_id,
+            'listing_type': product.listing_type,
+            'created_at': product.created_at
+        })
+    db.session.expunge_all()
+    return output
+
+def core_path():
+    stmt = product_list_select().order_by(Product.created_at.desc(), Product.id.desc())
+    return rows_to_dicts(db.session.execute(stmt).all())
+
+def measure(name, fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = len(fn())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{name:<6} {count:>8} satır  {best * 1000:>9.1f} ms  {count / best:>12,.0f} satır/sn')
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL'),
+                        help='Tabloları silinecek ayrı bir veritabanı (varsayılan: geçici SQLite).')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    database_url = args.database_url
+    if database_url and database_url == os.environ.get('DATABASE_URL'):
+        parser.error("--database-url uygulamanın DATABASE_URL'i olamaz (tablolar silinir).")
+    if not database_url:
+        tmp_dir = tempfile.mkdtemp()
+        database_url = 'sqlite:///' + os.path.join(tmp_dir, 'bench.db')
+
+    app = build_app(database_url)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f'{args.rows} ürün ekleniyor...')
+        seed(args.rows)
+
+        orm = measure('ORM', orm_path, args.repeat)
+        core = measure('Core', core_path, args.repeat)
+        print(f'Hızlanma: {orm / core:.2f}x')
+
+        db.drop_all()
+
+if __name__ == '__main__':
+    main()
@@ -107,7 +107,7 @@ function SwapOfferModal({ isOpen, onClose, targetProduct }) {
                                         >
                                             <Card.Section>
                                                 <Image 
-                                                    src={getImageUrl(prod.image_url)} 
+                                                    src={getImageUrl(prod.thumbnail_url || prod.image_url)} 
                                                     height={140} 
                                                     alt={prod.title} 
                                                     fallbackSrc="https://placehold.co/400x200?text=Resim+Yok"
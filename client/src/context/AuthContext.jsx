@@ -13,9 +13,8 @@ export const AuthProvider = ({ children }) => {
     if (!sessionStorage.getItem('token')) return;
 
     try {
-        const res = await axiosClient.get('/messages/conversations');
-        const unreadChats = res.data.filter(c => c.is_unread).length;
-        setUnreadCount(unreadChats); 
+        const res = await axiosClient.get('/messages/unread-count');
+        setUnreadCount(res.data.unread_count); 
 
     } catch (error) {
         console.error("Mesaj sayısı güncellenemedi:", error);
@@ -52,8 +51,19 @@ export const AuthProvider = ({ children }) => {
   useEffect(() => {
     if (user) {
         updateUnreadCount(); 
-        const interval = setInterval(updateUnreadCount, 30000);
-        return () => clearInterval(interval);
+
+        // Yeni mesajlar SSE ile anında gelir; periyodik sorgu yalnızca yedek olarak kalır
+        const token = sessionStorage.getItem('token');
+        const source = token
+            ? new EventSource(`${axiosClient.defaults.baseURL}/messages/stream?jwt=${encodeURIComponent(token)}`)
+            : null;
+        if (source) source.addEventListener('message', updateUnreadCount);
+
+        const interval = setInterval(updateUnreadCount, source ? 300000 : 30000);
+        return () => {
+            clearInterval(interval);
+            if (source) source.close();
+        };
     }
   }, [user]);
 
@@ -183,7 +183,7 @@ function Home() {
                                 <Card.Section>
                                     <Box pos="relative"> 
                                         <Image
-                                            src={getImageUrl(product.image_url)}
+                                            src={getImageUrl(product.thumbnail_url || product.image_url)}
                                             height={180}
                                             alt={product.title}
                                             fit="cover" 
@@ -50,11 +50,23 @@ function ProductDetail() {
 
   const fetchAvailability = async () => {
     try {
-        const res = await axiosClient.get(`/products/${id}/availability`);
-        
-        const timestamps = res.data.map(dateStr => {
+        const today = new Date();
+        const from = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+        const res = await axiosClient.get(`/products/${id}/availability`, { params: { from } });
+
+        // Sunucu birleştirilmiş [başlangıç, bitiş] aralıkları döner; takvim için günlere açıyoruz
+        const toDate = (dateStr) => {
             const [year, month, day] = dateStr.split('-').map(Number);
-            return new Date(year, month - 1, day).getTime();
+            return new Date(year, month - 1, day);
+        };
+        const timestamps = [];
+        res.data.forEach(([startStr, endStr]) => {
+            const current = toDate(startStr);
+            const end = toDate(endStr);
+            while (current <= end) {
+                timestamps.push(current.getTime());
+                current.setDate(current.getDate() + 1);
+            }
         });
 
         setBusyTimestamps(timestamps);
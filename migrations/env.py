@@ -34,10 +34,23 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Tam metin arama nesneleri modelde değil, app/search.py DDL'i ve 7e2d4b9c1a06 ile
+    # yönetilir; autogenerate bunları silmeye çalışmasın
+    if type_ == 'column' and name == 'search_vector' and object.table.name == 'products':
+        return False
+    if type_ == 'index' and name == 'ix_products_search_vector':
+        return False
+    if type_ == 'table' and name.startswith('products_fts'):
+        return False
+    return True
+
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -54,6 +67,7 @@ def run_migrations_online():
                 logger.info('No changes in schema detected.')
 
     conf_args = current_app.extensions['migrate'].configure_args
+    conf_args.setdefault('include_object', include_object)
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
 
@@ -0,0 +1,76 @@
+"""Platform istatistikleri
+
+Revision ID: 1b7e5d2c9f04
+Revises: f07c3d8a1e92
+Create Date: 2026-10-18 15:02:41.271903
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b7e5d2c9f04'
+down_revision = 'f07c3d8a1e92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('platform_counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    daily_stats = op.create_table('daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('new_users', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('new_products', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed_transactions', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed_volume', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    # Mevcut veriden doldurulur (app/stats.py rebuild() ile aynı sorgular); aksi halde
+    # dağıtımdan sonraki ilk yazma sayaçları 0'dan başlatır
+    op.execute(
+        "INSERT INTO platform_counters (name, value) "
+        "SELECT 'users', COUNT(id) FROM users"
+    )
+    op.execute(
+        "INSERT INTO platform_counters (name, value) "
+        "SELECT 'active_products', COUNT(id) FROM products WHERE status = 'available'"
+    )
+    op.execute(
+        "INSERT INTO platform_counters (name, value) "
+        "SELECT 'completed_volume', COALESCE(SUM(price), 0) FROM transactions WHERE status = 'COMPLETED'"
+    )
+
+    bind = op.get_bind()
+    days = {}
+    def row(day):
+        if isinstance(day, str):
+            day = datetime.strptime(day, '%Y-%m-%d').date()
+        return days.setdefault(day, {
+            'day': day, 'new_users': 0, 'new_products': 0, 'completed_transactions': 0, 'completed_volume': 0
+        })
+
+    for day, count in bind.execute(sa.text(
+            "SELECT date(created_at), COUNT(*) FROM users WHERE created_at IS NOT NULL GROUP BY date(created_at)")):
+        row(day)['new_users'] = count
+    for day, count in bind.execute(sa.text(
+            "SELECT date(created_at), COUNT(*) FROM products WHERE created_at IS NOT NULL GROUP BY date(created_at)")):
+        row(day)['new_products'] = count
+    for day, count, volume in bind.execute(sa.text(
+            "SELECT date(created_at), COUNT(*), SUM(price) FROM transactions "
+            "WHERE status = 'COMPLETED' AND created_at IS NOT NULL GROUP BY date(created_at)")):
+        row(day)['completed_transactions'] = count
+        row(day)['completed_volume'] = volume or 0
+
+    if days:
+        op.bulk_insert(daily_stats, list(days.values()))
+
+
+def downgrade():
+    op.drop_table('daily_stats')
+    op.drop_table('platform_counters')
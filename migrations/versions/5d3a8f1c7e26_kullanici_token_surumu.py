@@ -0,0 +1,26 @@
+"""Kullanici token surumu
+
+Revision ID: 5d3a8f1c7e26
+Revises: 1b7e5d2c9f04
+Create Date: 2026-10-18 15:24:06.915230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d3a8f1c7e26'
+down_revision = '1b7e5d2c9f04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
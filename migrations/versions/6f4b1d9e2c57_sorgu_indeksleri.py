@@ -0,0 +1,54 @@
+"""Sorgu indeksleri
+
+Revision ID: 6f4b1d9e2c57
+Revises: e81c5f3a9d62
+Create Date: 2026-10-18 17:21:08.562341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f4b1d9e2c57'
+down_revision = 'e81c5f3a9d62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index('ix_products_status_category_created_at_id', ['status', 'category', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_products_owner_created_at', ['owner_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.create_index('ix_product_images_product', ['product_id'], unique=False)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_seller_created_at', ['seller_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_transactions_buyer_created_at', ['buyer_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_transactions_created_at', ['created_at'], unique=False)
+
+    with op.batch_alter_table('swap_offers', schema=None) as batch_op:
+        batch_op.create_index('ix_swap_offers_target_offered_status', ['target_product_id', 'offered_product_id', 'status'], unique=False)
+        batch_op.create_index('ix_swap_offers_offered_product', ['offered_product_id'], unique=False)
+        batch_op.create_index('ix_swap_offers_offerer_created_at', ['offerer_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('swap_offers', schema=None) as batch_op:
+        batch_op.drop_index('ix_swap_offers_offerer_created_at')
+        batch_op.drop_index('ix_swap_offers_offered_product')
+        batch_op.drop_index('ix_swap_offers_target_offered_status')
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_created_at')
+        batch_op.drop_index('ix_transactions_buyer_created_at')
+        batch_op.drop_index('ix_transactions_seller_created_at')
+
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_images_product')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_owner_created_at')
+        batch_op.drop_index('ix_products_status_category_created_at_id')
@@ -0,0 +1,90 @@
+"""Urun tam metin arama
+
+Revision ID: 7e2d4b9c1a06
+Revises: 3c9a1f7d2b84
+Create Date: 2026-10-18 11:02:17.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2d4b9c1a06'
+down_revision = '3c9a1f7d2b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("ALTER TABLE products ADD COLUMN search_vector tsvector")
+        op.execute("""
+            CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('turkish', coalesce(NEW.title, '')), 'A') ||
+                    setweight(to_tsvector('turkish', coalesce(NEW.description, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER products_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF title, description ON products
+            FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()
+        """)
+        op.execute("""
+            UPDATE products SET search_vector =
+                setweight(to_tsvector('turkish', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('turkish', coalesce(description, '')), 'B')
+        """)
+        op.execute("CREATE INDEX ix_products_search_vector ON products USING GIN (search_vector)")
+
+    elif bind.dialect.name == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE products_fts USING fts5(
+                title, description,
+                content='products', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_au AFTER UPDATE OF title, description ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO products_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+        """)
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+        op.execute("DROP TRIGGER IF EXISTS products_search_vector_trigger ON products")
+        op.execute("DROP FUNCTION IF EXISTS products_search_vector_update()")
+        op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
+
+    elif bind.dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,38 @@
+"""Resim turevleri
+
+Revision ID: 9c4e2a7b3f15
+Revises: 5d3a8f1c7e26
+Create Date: 2026-10-18 15:48:33.502174
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e2a7b3f15'
+down_revision = '5d3a8f1c7e26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('variants', sa.JSON(), nullable=True))
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumbnail_url', sa.String(length=500), nullable=True))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('profile_image_variants')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_column('thumbnail_url')
+
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.drop_column('variants')
@@ -0,0 +1,26 @@
+"""Kiralama musaitlik indeksi
+
+Revision ID: a41f6c3e8d27
+Revises: 7e2d4b9c1a06
+Create Date: 2026-10-18 11:48:03.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f6c3e8d27'
+down_revision = '7e2d4b9c1a06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_product_status_dates', ['product_id', 'status', 'start_date', 'end_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_product_status_dates')
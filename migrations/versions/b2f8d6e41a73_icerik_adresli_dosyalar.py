@@ -0,0 +1,32 @@
+"""Icerik adresli dosyalar
+
+Revision ID: b2f8d6e41a73
+Revises: 9c4e2a7b3f15
+Create Date: 2026-10-18 16:11:57.148620
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2f8d6e41a73'
+down_revision = '9c4e2a7b3f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Mevcut 'uploads/products/<id>/...' dosyaları olduğu gibi kalır; silinirken eski yol
+    # mantığıyla silinirler. Yalnızca yeni yüklemeler içerik adresli depoya yazılır.
+    op.create_table('stored_files',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('size', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('refcount', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('stored_files')
@@ -0,0 +1,74 @@
+"""Kiralama cakisma kisiti
+
+Revision ID: c58e0b2f9a13
+Revises: a41f6c3e8d27
+Create Date: 2026-10-18 12:31:55.114620
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c58e0b2f9a13'
+down_revision = 'a41f6c3e8d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not: Mevcut veride çakışan APPROVED kiralamalar varsa kısıt eklenemez; önce temizlenmeli.
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.execute("""
+            ALTER TABLE transactions ADD CONSTRAINT transactions_no_overlapping_rentals
+            EXCLUDE USING gist (
+                product_id WITH =,
+                daterange(start_date, end_date, '[]') WITH &&
+            ) WHERE (status = 'APPROVED' AND start_date IS NOT NULL AND end_date IS NOT NULL)
+        """)
+
+    elif bind.dialect.name == 'sqlite':
+        op.execute("""
+            CREATE TRIGGER transactions_no_overlap_insert BEFORE INSERT ON transactions
+            WHEN NEW.status = 'APPROVED' AND NEW.start_date IS NOT NULL AND NEW.end_date IS NOT NULL
+            BEGIN
+                SELECT RAISE(ABORT, 'transactions_no_overlapping_rentals')
+                WHERE EXISTS (
+                    SELECT 1 FROM transactions t
+                    WHERE t.product_id = NEW.product_id
+                      AND t.status = 'APPROVED'
+                      AND t.start_date <= NEW.end_date
+                      AND t.end_date >= NEW.start_date
+                );
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER transactions_no_overlap_update
+            BEFORE UPDATE OF status, start_date, end_date, product_id ON transactions
+            WHEN NEW.status = 'APPROVED' AND NEW.start_date IS NOT NULL AND NEW.end_date IS NOT NULL
+            BEGIN
+                SELECT RAISE(ABORT, 'transactions_no_overlapping_rentals')
+                WHERE EXISTS (
+                    SELECT 1 FROM transactions t
+                    WHERE t.product_id = NEW.product_id
+                      AND t.id != NEW.id
+                      AND t.status = 'APPROVED'
+                      AND t.start_date <= NEW.end_date
+                      AND t.end_date >= NEW.start_date
+                );
+            END
+        """)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("ALTER TABLE transactions DROP CONSTRAINT IF EXISTS transactions_no_overlapping_rentals")
+
+    elif bind.dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS transactions_no_overlap_update")
+        op.execute("DROP TRIGGER IF EXISTS transactions_no_overlap_insert")
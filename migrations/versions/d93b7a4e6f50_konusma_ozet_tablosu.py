@@ -0,0 +1,65 @@
+"""Konusma ozet tablosu
+
+Revision ID: d93b7a4e6f50
+Revises: c58e0b2f9a13
+Create Date: 2026-10-18 13:20:46.275381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93b7a4e6f50'
+down_revision = 'c58e0b2f9a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_low_id', sa.Integer(), nullable=False),
+    sa.Column('user_high_id', sa.Integer(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_preview', sa.String(length=200), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.Column('unread_low', sa.Integer(), nullable=False),
+    sa.Column('unread_high', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['last_message_id'], ['messages.id'], ),
+    sa.ForeignKeyConstraint(['user_high_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_low_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_low_id', 'user_high_id', name='uq_conversations_pair')
+    )
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.create_index('ix_conversations_low_last_at', ['user_low_id', 'last_message_at'], unique=False)
+        batch_op.create_index('ix_conversations_high_last_at', ['user_high_id', 'last_message_at'], unique=False)
+
+    # Mevcut mesajlardan özetleri doldur
+    op.execute("""
+        INSERT INTO conversations (user_low_id, user_high_id, last_message_id, unread_low, unread_high)
+        SELECT lo, hi, MAX(id),
+               SUM(CASE WHEN receiver_id = lo AND is_read IS NOT TRUE THEN 1 ELSE 0 END),
+               SUM(CASE WHEN receiver_id = hi AND is_read IS NOT TRUE THEN 1 ELSE 0 END)
+        FROM (
+            SELECT id, receiver_id, is_read,
+                   CASE WHEN sender_id < receiver_id THEN sender_id ELSE receiver_id END AS lo,
+                   CASE WHEN sender_id < receiver_id THEN receiver_id ELSE sender_id END AS hi
+            FROM messages
+        ) AS m
+        GROUP BY lo, hi
+    """)
+    op.execute("""
+        UPDATE conversations SET
+            last_message_preview = (SELECT substr(content, 1, 200) FROM messages WHERE messages.id = conversations.last_message_id),
+            last_message_at = (SELECT created_at FROM messages WHERE messages.id = conversations.last_message_id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_high_last_at')
+        batch_op.drop_index('ix_conversations_low_last_at')
+
+    op.drop_table('conversations')
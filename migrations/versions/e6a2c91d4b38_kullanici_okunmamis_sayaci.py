@@ -0,0 +1,33 @@
+"""Kullanici okunmamis sayaci
+
+Revision ID: e6a2c91d4b38
+Revises: d93b7a4e6f50
+Create Date: 2026-10-18 13:52:09.631842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a2c91d4b38'
+down_revision = 'd93b7a4e6f50'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE users SET unread_count = (
+            SELECT COUNT(*) FROM messages
+            WHERE messages.receiver_id = users.id AND messages.is_read IS NOT TRUE
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('unread_count')
@@ -0,0 +1,38 @@
+"""Dosya silme kuyrugu
+
+Revision ID: e81c5f3a9d62
+Revises: b2f8d6e41a73
+Create Date: 2026-10-18 16:52:20.734118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81c5f3a9d62'
+down_revision = 'b2f8d6e41a73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('file_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('action', sa.String(length=20), server_default='release', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('file_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_file_jobs_run_after'), ['run_after'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('file_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_file_jobs_run_after'))
+
+    op.drop_table('file_jobs')
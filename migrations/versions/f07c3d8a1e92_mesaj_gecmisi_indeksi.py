@@ -0,0 +1,26 @@
+"""Mesaj gecmisi indeksi
+
+Revision ID: f07c3d8a1e92
+Revises: e6a2c91d4b38
+Create Date: 2026-10-18 14:37:12.408856
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f07c3d8a1e92'
+down_revision = 'e6a2c91d4b38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_messages_sender_receiver_created_at', ['sender_id', 'receiver_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_sender_receiver_created_at')
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import fakeredis
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import cache, create_app, db, storage
+from app.cache import MemoryBackend, RedisBackend
+from app.config import Config
+from app.models import User
+from app.storage import LocalBackend
+
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    TESTING = True
+    JWT_SECRET_KEY = 'test-' * 8
+    FILE_JANITOR_INTERVAL = 0
+    IMAGE_WORKERS = 0
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    # Eklentiler modül düzeyinde tek örnektir; önbellek testler arasında taşınmasın
+    cache.backend = MemoryBackend()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(username, role='customer'):
+        user = User(username=username, email=f'{username}@example.com', role=role)
+        user.set_password('sifre')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+
+@pytest.fixture
+def login(client):
+    def login(username):
+        r = client.post('/api/auth/login', json={'username': username, 'password': 'sifre'})
+        assert r.status_code == 200, r.get_json()
+        return {'Authorization': f"Bearer {r.get_json()['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def redis_server():
+    """Redis yerine geçen süreç içi sunucu; server.connected = False kesinti benzetir."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_cache(app, redis_server):
+    cache.backend = RedisBackend(fakeredis.FakeRedis(server=redis_server))
+    return cache.backend
+
+
+@pytest.fixture
+def local_storage(app, tmp_path):
+    """Geçici klasörde yerel depo (app/static/uploads'a yazılmaz)."""
+    previous = storage.backend
+    storage.init_app(app, backend=LocalBackend(str(tmp_path / 'objects'), '/static/uploads/objects'))
+    yield storage.backend
+    storage.init_app(app, backend=previous)
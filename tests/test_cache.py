@@ -0,0 +1,61 @@
+import fakeredis
+from flask import Flask
+
+from app import cache
+from app.cache import CATALOG_VERSION_KEY, Cache, RedisBackend
+
+
+def test_redis_backend_roundtrip(redis_server):
+    backend = RedisBackend(fakeredis.FakeRedis(server=redis_server), prefix='test:')
+
+    assert backend.get('yok') is None
+    backend.set('anahtar', 'değer', ttl=60)
+    assert backend.get('anahtar') == 'değer'
+    assert 0 < fakeredis.FakeRedis(server=redis_server).ttl('test:anahtar') <= 60
+
+    backend.delete('anahtar')
+    assert backend.get('anahtar') is None
+
+    assert backend.get_counter(CATALOG_VERSION_KEY) == 0
+    assert backend.incr(CATALOG_VERSION_KEY) == 1
+    assert backend.incr(CATALOG_VERSION_KEY) == 2
+    assert backend.get_counter(CATALOG_VERSION_KEY) == 2
+
+
+def test_cached_response_with_redis(client, redis_cache):
+    first = client.get('/api/products/')
+    assert first.status_code == 200
+    assert first.headers['X-Cache'] == 'MISS'
+
+    second = client.get('/api/products/')
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_data() == first.get_data()
+
+    cache.bump_catalog_version()
+    assert client.get('/api/products/').headers['X-Cache'] == 'MISS'
+
+
+def test_cached_response_survives_redis_outage(client, redis_cache, redis_server):
+    redis_server.connected = False
+
+    r = client.get('/api/products/')
+    assert r.status_code == 200
+    assert r.headers['X-Cache'] == 'BYPASS'
+    assert client.get('/api/products/999').status_code == 404
+    assert cache.invalidate_product(1) is None
+
+
+def test_memory_cache_warns_outside_debug_and_testing(capsys):
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    Cache(app)
+    assert 'UYARI' not in capsys.readouterr().out
+
+    app = Flask(__name__)
+    Cache(app)
+    assert "CACHE_TYPE='redis'" in capsys.readouterr().out
+
+    app = Flask(__name__)
+    app.config['CACHE_TYPE'] = 'redis'
+    Cache().init_app(app, backend=RedisBackend(fakeredis.FakeRedis()))
+    assert 'UYARI' not in capsys.readouterr().out
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import fakeredis
+import redis
+
+from app.events import EventBroker, MemoryBackend, RedisBackend, Subscription
+
+
+class DroppingPubSub:
+    """Gerçek pubsub'ı sarar; drop ayarlanınca listen() bağlantı hatası fırlatır."""
+
+    def __init__(self, pubsub, drop):
+        self.pubsub = pubsub
+        self.drop = drop
+
+    def psubscribe(self, *patterns):
+        self.pubsub.psubscribe(*patterns)
+
+    def listen(self):
+        while True:
+            if self.drop.is_set():
+                raise redis.ConnectionError('bağlantı koptu')
+            message = self.pubsub.get_message(timeout=0.02)
+            if message:
+                yield message
+
+
+class FlakyClient(fakeredis.FakeRedis):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.drops = []
+
+    def pubsub(self, **kwargs):
+        drop = threading.Event()
+        self.drops.append(drop)
+        return DroppingPubSub(super().pubsub(**kwargs), drop)
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_redis_listener_reconnects_and_replays_missed_events():
+    client = FlakyClient(server=fakeredis.FakeServer())
+    backend = RedisBackend(client)
+    backend.reconnect_delays = (0.3,)
+    sub = Subscription(7, 10)
+    backend.subscribe(sub)
+    assert wait_for(lambda: client.drops)
+
+    backend.publish(7, 'message', {'n': 1})
+    assert sub.get(timeout=2)['data'] == {'n': 1}
+
+    client.drops[0].set()
+    time.sleep(0.1)
+    # Dinleyici beklemedeyken yayınlanan olay pub/sub'da kaybolur, geçmişe yazılır
+    backend.publish(7, 'message', {'n': 2})
+
+    assert wait_for(lambda: len(client.drops) == 2)
+    event = sub.get(timeout=2)
+    assert event is not None and event['data'] == {'n': 2}
+    assert backend._listener.is_alive()
+
+    backend.publish(7, 'message', {'n': 3})
+    assert sub.get(timeout=2)['data'] == {'n': 3}
+
+
+def test_stream_does_not_repeat_resynced_events():
+    broker = EventBroker()
+    broker.backend = MemoryBackend()
+    broker.heartbeat = 0.05
+    stream = broker.stream(1)
+    next(stream)
+
+    broker.backend.publish(1, 'message', {'n': 1})
+    first = next(stream)
+    broker.backend.dispatch(1, {'id': 1, 'type': 'message', 'data': {'n': 1}})
+    assert first.startswith('id: 1\n')
+    assert next(stream) == ': heartbeat\n\n'
+
+
+def test_stale_last_event_id_replays_history():
+    broker = EventBroker()
+    broker.backend = MemoryBackend()
+    broker.heartbeat = 0.05
+    broker.backend.publish(1, 'message', {'n': 1})
+
+    stream = broker.stream(1, last_event_id=500)
+    next(stream)
+    assert next(stream).startswith('id: 1\n')
@@ -0,0 +1,39 @@
+import io
+
+from PIL import Image
+
+from app import db, storage
+from app.images import process_product_images
+from app.janitor import process_file_jobs
+from app.models import FileJob, Product, ProductImage, StoredFile
+
+
+def test_failed_render_releases_saved_variants(make_user, local_storage, monkeypatch):
+    owner = make_user('satici')
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600), (200, 40, 40)).save(buffer, 'JPEG')
+    source_url = storage.save_bytes(buffer.getvalue(), '.jpg', 'image/jpeg')
+    product = Product(title='Kamera', category='Elektronik', price=100, owner_id=owner.id,
+                      image_url=source_url, status='available')
+    db.session.add(product)
+    db.session.flush()
+    db.session.add(ProductImage(product_id=product.id, image_url=source_url))
+    db.session.commit()
+
+    original_save = storage.save_bytes
+    calls = []
+
+    def flaky_save(data, ext='', content_type=None):
+        calls.append(ext)
+        if len(calls) == 3:
+            raise OSError('disk dolu')
+        return original_save(data, ext, content_type)
+
+    monkeypatch.setattr(storage, 'save_bytes', flaky_save)
+    process_product_images(product.id)
+
+    assert ProductImage.query.one().variants is None
+    assert FileJob.query.count() == 2
+
+    process_file_jobs()
+    assert [row.key for row in StoredFile.query] == [local_storage.key_from_url(source_url)]
@@ -0,0 +1,106 @@
+import os
+import time
+
+import pytest
+
+from app import db, storage
+from app.janitor import gc_command
+from app.models import Product
+from app.storage import LocalBackend
+
+
+@pytest.fixture
+def uploads(app, tmp_path):
+    """Yükleme klasörü ve onun dışında, varsayılan olmayan URL'li bir yerel depo."""
+    previous = (storage.backend, app.config['UPLOAD_FOLDER'], app.instance_path)
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+    app.instance_path = str(tmp_path / 'instance')
+    storage.init_app(app, backend=LocalBackend(str(tmp_path / 'objects'), '/media'))
+    os.makedirs(app.config['UPLOAD_FOLDER'])
+    yield app.config['UPLOAD_FOLDER']
+    storage.backend, app.config['UPLOAD_FOLDER'], app.instance_path = previous
+
+
+def legacy_file(upload_folder, relative, age_minutes=120):
+    path = os.path.join(upload_folder, *relative.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(relative.encode())
+    age(path, age_minutes)
+    return path
+
+def age(path, minutes):
+    stamp = time.time() - minutes * 60
+    os.utime(path, (stamp, stamp))
+
+def run_gc(app, *args):
+    result = app.test_cli_runner().invoke(gc_command, list(args))
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_gc_keeps_referenced_objects_and_removes_orphans(app, make_user, uploads):
+    owner = make_user('satici')
+    kept_url = storage.save_bytes(b'kullanilan', '.jpg')
+    orphan_url = storage.save_bytes(b'sahipsiz', '.jpg')
+    db.session.commit()
+    assert storage.release(orphan_url)
+    db.session.commit()
+    kept_path = storage.backend.path(storage.backend.key_from_url(kept_url))
+    orphan_path = storage.backend.path(storage.backend.key_from_url(orphan_url))
+    age(kept_path, 120)
+    age(orphan_path, 120)
+
+    used_legacy = legacy_file(uploads, 'products/1/kapak.jpg')
+    unused_legacy = legacy_file(uploads, 'products/1/eski.jpg')
+    db.session.add(Product(title='Kamera', category='Elektronik', price=10, owner_id=owner.id,
+                           image_url='/static/uploads/products/1/kapak.jpg'))
+    db.session.commit()
+
+    output = run_gc(app, '--dry-run')
+    assert f'yetim: {orphan_url}' in output
+    assert 'yetim: /static/uploads/products/1/eski.jpg' in output
+    assert kept_url not in output
+
+    run_gc(app)
+    assert os.path.exists(kept_path) and os.path.exists(used_legacy)
+    assert not os.path.exists(orphan_path) and not os.path.exists(unused_legacy)
+
+
+def test_gc_skips_recent_files(app, uploads):
+    recent = legacy_file(uploads, 'products/2/yeni.jpg', age_minutes=5)
+    old = legacy_file(uploads, 'products/2/eski.jpg', age_minutes=120)
+
+    run_gc(app, '--min-age', '30')
+    assert os.path.exists(recent)
+    assert not os.path.exists(old)
+
+
+def test_gc_resumes_from_limit_cursor(app, uploads):
+    paths = [legacy_file(uploads, f'products/3/{i}.jpg') for i in range(5)]
+    cursor = os.path.join(app.instance_path, 'files-gc.cursor')
+
+    output = run_gc(app, '--limit', '2')
+    assert 'kalınan yer: uploads:products/3/1.jpg' in output
+    assert [os.path.exists(p) for p in paths] == [False, False, True, True, True]
+    assert os.path.exists(cursor)
+
+    run_gc(app, '--limit', '2')
+    assert [os.path.exists(p) for p in paths] == [False, False, False, False, True]
+
+    output = run_gc(app, '--limit', '2')
+    assert 'tarama tamamlandı' in output
+    assert not any(os.path.exists(p) for p in paths)
+    assert not os.path.exists(cursor)
+
+
+def test_gc_checks_object_root_inside_upload_folder_by_key(app, uploads):
+    storage.init_app(app, backend=LocalBackend(os.path.join(uploads, 'depo'), '/dosyalar'))
+    url = storage.save_bytes(b'ic depo', '.png')
+    db.session.commit()
+    path = storage.backend.path(storage.backend.key_from_url(url))
+    age(path, 120)
+
+    output = run_gc(app)
+    assert '1 dosya tarandı, 0 yetim' in output
+    assert os.path.exists(path)
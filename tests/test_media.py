@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from app import storage
+from app.storage import LocalBackend
+
+DATA = b'0123456789' * 10
+
+
+@pytest.fixture
+def media(app, tmp_path):
+    """Yükleme klasörü, altında depo kökü, bir depo nesnesi ve bir eski dosya."""
+    previous = {name: app.config[name] for name in ('UPLOAD_FOLDER', 'STORAGE_LOCAL_ROOT')}
+    previous_backend = storage.backend
+    upload_folder = tmp_path / 'uploads'
+    os.makedirs(upload_folder / 'products' / '1')
+    (upload_folder / 'products' / '1' / 'eski.jpg').write_bytes(DATA)
+
+    def use_root(root):
+        app.config['STORAGE_LOCAL_ROOT'] = str(root)
+        storage.init_app(app, backend=LocalBackend(str(root), app.config['STORAGE_LOCAL_URL']))
+        return storage.backend.key_from_url(storage.save_bytes(DATA, '.jpg'))
+
+    app.config['UPLOAD_FOLDER'] = str(upload_folder)
+    yield use_root
+    app.config.update(previous)
+    storage.backend = previous_backend
+
+
+def object_url(key):
+    return f'/static/uploads/objects/{key}'
+
+
+def test_object_is_served_immutable_with_range_and_etag(client, media, tmp_path):
+    key = media(tmp_path / 'uploads' / 'objects')
+
+    r = client.get(object_url(key))
+    assert r.status_code == 200
+    assert r.data == DATA
+    assert r.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert r.headers['ETag']
+
+    assert client.get(object_url(key), headers={'If-None-Match': r.headers['ETag']}).status_code == 304
+
+    partial = client.get(object_url(key), headers={'Range': 'bytes=10-19'})
+    assert partial.status_code == 206
+    assert partial.data == DATA[10:20]
+    assert partial.headers['Content-Range'] == f'bytes 10-19/{len(DATA)}'
+
+
+def test_legacy_upload_is_cached_for_a_day(client, media, tmp_path):
+    media(tmp_path / 'uploads' / 'objects')
+    r = client.get('/static/uploads/products/1/eski.jpg')
+    assert r.status_code == 200
+    assert r.headers['Cache-Control'] == 'public, max-age=86400'
+
+
+def test_hidden_paths_are_not_served(client, media, tmp_path):
+    root = tmp_path / 'uploads' / 'objects'
+    media(root)
+    os.makedirs(root / '.incoming', exist_ok=True)
+    (root / '.incoming' / 'yarim').write_bytes(DATA)
+
+    assert client.get('/static/uploads/objects/.incoming/yarim').status_code == 404
+    assert client.get('/static/uploads/.hidden/x.jpg').status_code == 404
+
+
+@pytest.mark.parametrize('root, accel_objects, expected', [
+    ('uploads/objects', None, '/_media/objects/'),
+    ('uploads/depo/nesneler', None, '/_media/depo/nesneler/'),
+    ('baska-disk', '/_objects', '/_objects/'),
+    ('baska-disk', None, None),
+])
+def test_accel_redirect_follows_storage_root(app, client, media, tmp_path, root, accel_objects, expected):
+    app.config['MEDIA_ACCEL_REDIRECT'] = '/_media'
+    app.config['MEDIA_ACCEL_OBJECTS'] = accel_objects
+    key = media(tmp_path / root)
+
+    r = client.get(object_url(key))
+    assert r.status_code == 200
+    if expected:
+        assert r.headers['X-Accel-Redirect'] == expected + key
+        assert r.data == b''
+    else:
+        assert 'X-Accel-Redirect' not in r.headers
+        assert r.data == DATA
+    assert r.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    legacy = client.get('/static/uploads/products/1/eski.jpg')
+    assert legacy.headers['X-Accel-Redirect'] == '/_media/products/1/eski.jpg'
+    assert client.get('/static/uploads/products/1/yok.jpg').status_code == 404
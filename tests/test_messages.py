@@ -0,0 +1,20 @@
+from app import db
+from app.models import User
+
+
+def test_unread_counter_survives_cache_outage(client, make_user, login, redis_cache, redis_server):
+    make_user('gonderen')
+    receiver = make_user('alici')
+    sender_headers, receiver_headers = login('gonderen'), login('alici')
+
+    assert client.get('/api/messages/unread-count', headers=receiver_headers).get_json() == {'unread_count': 0}
+
+    redis_server.connected = False
+    r = client.post('/api/messages/send', headers=sender_headers,
+                    json={'receiver_id': receiver.id, 'content': 'Merhaba'})
+    assert r.status_code == 201
+    assert db.session.get(User, receiver.id).unread_count == 1
+
+    r = client.get('/api/messages/unread-count', headers=receiver_headers)
+    assert r.status_code == 200
+    assert r.get_json() == {'unread_count': 1}
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import pytest
+
+from app.metrics import LATENCY_BUCKETS, Metrics, render
+
+
+def test_observe_merges_stripes_across_threads(app):
+    local = Metrics()
+    local.app = app
+
+    def work():
+        for _ in range(50):
+            local.observe('products.get_products', 'GET', 200, 0.02, 512, 0.004, 2)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    series = local.snapshot()[('products.get_products', 'GET', '200')]
+    assert series['requests'] == 200
+    assert series['db_queries'] == 400
+    assert sum(series['latency'][1:]) == 200
+    assert series['latency'][0] == pytest.approx(4.0)
+
+
+def test_collect_sums_files_of_all_workers(app, tmp_path):
+    app.config['METRICS_DIR'] = str(tmp_path)
+    workers = []
+    for status in (200, 200, 500):
+        worker = Metrics()
+        worker.app = app
+        worker.observe('products.get_products', 'GET', status, 0.01)
+        worker.flush()
+        workers.append(worker)
+
+    # Aynı pid'deki (yeniden kullanılan pid gibi) worker'lar birbirinin dosyasını ezmez
+    assert len(os.listdir(tmp_path)) == 3
+    (tmp_path / 'metrics-bozuk.json').write_text('{')
+
+    collected = workers[0].collect()
+    assert collected[('products.get_products', 'GET', '200')]['requests'] == 2
+    assert collected[('products.get_products', 'GET', '500')]['requests'] == 1
+
+
+def test_render_writes_cumulative_histograms(app):
+    local = Metrics()
+    local.app = app
+    for duration in (0.003, 0.02, 20.0):
+        local.observe('auth.login', 'POST', 200, duration, 100)
+    text = render(local.snapshot())
+
+    labels = 'blueprint="auth",endpoint="auth.login",method="POST",status="200"'
+    assert f'http_requests_total{{{labels}}} 3' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.025"}} 2' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="{LATENCY_BUCKETS[-1]:g}"}} 2' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f'http_request_duration_seconds_count{{{labels}}} 3' in text
+    assert f'http_request_duration_seconds_sum{{{labels}}} 20.023000' in text
+    assert '# TYPE http_response_size_bytes histogram' in text
+
+
+def test_render_escapes_label_values(app):
+    local = Metrics()
+    local.app = app
+    local.observe('a"b\\c', 'GET', 200, 0.01)
+    assert 'endpoint="a\\"b\\\\c"' in render(local.snapshot())
+
+
+def test_metrics_endpoint_access(app, client, make_user, login):
+    make_user('yonetici', role='admin')
+    make_user('musteri')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers=login('musteri')).status_code == 403
+
+    r = client.get('/metrics', headers=login('yonetici'))
+    assert r.status_code == 200
+    assert r.content_type.startswith('text/plain; version=0.0.4')
+    assert 'http_requests_total{' in r.get_data(as_text=True)
+
+    app.config['METRICS_TOKEN'] = 'kazima-anahtari'
+    assert client.get('/metrics', headers={'Authorization': 'Bearer kazima-anahtari'}).status_code == 200
+    # Yanlış token admin JWT'si olarak denenir ve çözülemez
+    assert client.get('/metrics', headers={'Authorization': 'Bearer yanlis'}).status_code == 422
@@ -0,0 +1,79 @@
+import json
+import re
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models import User
+from app.profiling import QueryBudgetExceeded, current_queries, statement_shape
+
+
+def test_failed_statement_leaves_no_timing_state(app):
+    with app.test_request_context('/'):
+        app.preprocess_request()
+
+        with pytest.raises(OperationalError):
+            db.session.execute(text('SELECT * FROM olmayan_tablo'))
+        db.session.rollback()
+
+        db.session.execute(text('SELECT 1'))
+        assert current_queries().count == 1
+        assert not db.session.connection().info.get('query_started')
+
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape('SELECT *\n  FROM users WHERE id IN (?, ?, ?)') == 'SELECT * FROM users WHERE id IN (?)'
+    assert statement_shape('SELECT * FROM users WHERE id IN (%(id_1)s, %(id_2)s)') == \
+        statement_shape('SELECT * FROM users WHERE id IN (%(id_1)s,%(id_2)s,%(id_3)s)')
+    assert statement_shape('SELECT * FROM users WHERE id = ?') == 'SELECT * FROM users WHERE id = ?'
+
+
+@pytest.fixture
+def n_plus_one_app(app, make_user):
+    """Her kullanıcıyı ayrı sorguyla okuyan (N+1) bir test uç noktası."""
+    ids = [make_user(f'kullanici{i}').id for i in range(6)]
+
+    def lookup():
+        for user_id in ids:
+            db.session.execute(text('SELECT username FROM users WHERE id = :id'), {'id': user_id})
+        db.session.execute(select(User.id).where(User.id.in_(ids[:2]))).all()
+        db.session.execute(select(User.id).where(User.id.in_(ids))).all()
+        return {'ok': True}
+
+    app.add_url_rule('/_test/lookup', 'test_lookup', lookup)
+    return app
+
+
+def test_server_timing_header(client):
+    r = client.get('/api/products/')
+    timings = r.headers.getlist('Server-Timing')
+    assert len(timings) == 2
+    assert re.fullmatch(r'db;dur=\d+\.\d;desc="\d+ queries"', timings[0])
+    assert re.fullmatch(r'app;dur=\d+\.\d', timings[1])
+
+
+def test_repeated_statements_are_reported(n_plus_one_app, capsys):
+    n_plus_one_app.config['SQL_N_PLUS_ONE_THRESHOLD'] = 2
+    r = n_plus_one_app.test_client().get('/_test/lookup')
+    assert r.status_code == 200
+    assert 'desc="8 queries"' in r.headers['Server-Timing']
+
+    log = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert log['event'] == 'sql_profile'
+    assert log['queries'] == 8
+    counts = sorted(entry['count'] for entry in log['n_plus_one'])
+    # Altı tekil okuma ve farklı uzunlukta IN listeli iki sorgu ayrı ayrı gruplanır
+    assert counts == [2, 6]
+
+
+def test_query_budget_is_enforced_in_strict_mode(n_plus_one_app):
+    n_plus_one_app.config['SQL_QUERY_BUDGETS'] = {'test_lookup': 3}
+    assert n_plus_one_app.config['SQL_QUERY_BUDGET_STRICT']
+
+    with pytest.raises(QueryBudgetExceeded, match='test_lookup: 8 sorgu'):
+        n_plus_one_app.test_client().get('/_test/lookup')
+
+    n_plus_one_app.config['SQL_QUERY_BUDGET_STRICT'] = False
+    assert n_plus_one_app.test_client().get('/_test/lookup').status_code == 200
@@ -0,0 +1,21 @@
+from app.security import set_role_command
+
+
+def test_set_role_revokes_existing_tokens(app, client, make_user, login):
+    make_user('yonetici', role='admin')
+    headers = login('yonetici')
+    assert client.get('/api/admin/stats', headers=headers).status_code == 200
+
+    result = app.test_cli_runner().invoke(set_role_command, ['yonetici', 'customer'])
+    assert result.exit_code == 0, result.output
+
+    assert client.get('/api/admin/stats', headers=headers).status_code == 401
+    assert client.get('/api/admin/stats', headers=login('yonetici')).status_code == 403
+
+
+def test_token_check_falls_back_to_database_when_cache_is_down(client, make_user, login, redis_cache, redis_server):
+    make_user('musteri')
+    headers = login('musteri')
+
+    redis_server.connected = False
+    assert client.get('/api/products/my-products', headers=headers).status_code == 200
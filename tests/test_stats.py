@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from app import db, stats
+from app.models import DailyStat, PlatformCounter, Product, User
+
+
+def daily_rows():
+    return {row.day: (row.new_users, row.new_products, row.completed_transactions, float(row.completed_volume))
+            for row in DailyStat.query if any((row.new_users, row.new_products, row.completed_transactions))}
+
+def counters():
+    return {row.name: float(row.value) for row in PlatformCounter.query}
+
+def assert_matches_rebuild():
+    incremental = (daily_rows(), counters())
+    stats.rebuild()
+    db.session.commit()
+    assert (daily_rows(), counters()) == incremental
+
+
+def test_deletes_keep_daily_stats_in_line_with_rebuild(app, client, make_user, login):
+    make_user('yonetici', role='admin')
+    admin = login('yonetici')
+    stats.rebuild()
+    db.session.commit()
+
+    r = client.post('/api/auth/register', json={'username': 'yeni', 'email': 'yeni@example.com', 'password': 'sifre'})
+    assert r.status_code == 201
+    seller = login('yeni')
+    r = client.post('/api/products/add', headers=seller, data={'title': 'Kamera', 'price': '100', 'category': 'Elektronik'})
+    product_id = r.get_json()['product_id']
+    assert_matches_rebuild()
+
+    # Dünden kalma kayıtlar: silme bugünden değil oluşturuldukları günden düşülür
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    db.session.get(Product, product_id).created_at = yesterday
+    User.query.filter_by(username='yeni').one().created_at = yesterday
+    stats.rebuild()
+    db.session.commit()
+
+    assert client.delete(f'/api/products/{product_id}', headers=seller).status_code == 200
+    assert_matches_rebuild()
+
+    user_id = User.query.filter_by(username='yeni').one().id
+    assert client.delete(f'/api/admin/delete-user/{user_id}', headers=admin).status_code == 200
+    assert_matches_rebuild()
+    assert yesterday.date() not in daily_rows()
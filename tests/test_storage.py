@@ -0,0 +1,172 @@
+import io
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app import db, storage
+from app.janitor import process_file_jobs, schedule_file_deletion
+from app.models import Product, StoredFile
+from app.storage import S3Backend
+
+BUCKET = 'urun-test'
+
+
+@pytest.fixture
+def s3(app):
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        local_backend = storage.backend
+        storage.init_app(app, backend=S3Backend(client, BUCKET, 'https://cdn.example.com', prefix='media/'))
+        yield client
+        storage.init_app(app, backend=local_backend)
+
+
+def object_keys(client):
+    return [o['Key'] for o in client.list_objects_v2(Bucket=BUCKET).get('Contents', [])]
+
+
+def test_s3_backend_content_addressed_roundtrip(s3):
+    url = storage.save_bytes(b'resim verisi', '.jpg', 'image/jpeg')
+    db.session.commit()
+
+    key = storage.backend.key_from_url(url)
+    assert url == f'https://cdn.example.com/media/{key}'
+    assert object_keys(s3) == [f'media/{key}']
+    head = s3.head_object(Bucket=BUCKET, Key=f'media/{key}')
+    assert head['ContentType'] == 'image/jpeg'
+    assert 'immutable' in head['CacheControl']
+    assert storage.open(url).read() == b'resim verisi'
+
+    assert storage.save_bytes(b'resim verisi', '.jpg') == url
+    db.session.commit()
+    assert db.session.get(StoredFile, key).refcount == 2
+
+    schedule_file_deletion(url)
+    db.session.commit()
+    process_file_jobs()
+    assert object_keys(s3) == [f'media/{key}']
+
+    schedule_file_deletion(url)
+    db.session.commit()
+    process_file_jobs()
+    assert object_keys(s3) == []
+    assert db.session.get(StoredFile, key) is None
+
+
+def test_save_rewrites_blob_when_it_recreates_the_row(s3, monkeypatch):
+    # Son referans bırakıldı ama janitor dosyayı henüz silmedi
+    url = storage.save_bytes(b'ayni icerik', '.png')
+    db.session.commit()
+    assert storage.release(url)
+    db.session.commit()
+    key = storage.backend.key_from_url(url)
+
+    put_calls = []
+    original_put = storage.backend.put
+    monkeypatch.setattr(storage.backend, 'put', lambda key, *args: put_calls.append(key) or original_put(key, *args))
+
+    # Aynı içerik yeniden yüklenir; dosya hâlâ dururken bile yeniden yazılır,
+    # böylece arada çalışan remove() dosyayı götürse de kayıp olmaz
+    assert storage.save_bytes(b'ayni icerik', '.png') == url
+    assert put_calls == [key]
+    db.session.commit()
+
+
+def test_remove_keeps_blob_that_was_referenced_again(s3):
+    url = storage.save_bytes(b'geri gelen', '.gif')
+    db.session.commit()
+    assert storage.release(url)
+    db.session.commit()
+
+    storage.save_bytes(b'geri gelen', '.gif')
+    db.session.commit()
+
+    assert storage.remove(url) is False
+    db.session.commit()
+    key = storage.backend.key_from_url(url)
+    assert object_keys(s3) == [f'media/{key}']
+    assert db.session.get(StoredFile, key).refcount == 1
+
+
+def test_remove_leaves_no_placeholder_row(s3):
+    url = storage.save_bytes(b'silinecek', '.webp')
+    db.session.commit()
+    assert storage.release(url)
+    db.session.commit()
+
+    assert storage.remove(url) is True
+    db.session.commit()
+    assert object_keys(s3) == []
+    assert StoredFile.query.count() == 0
+
+
+#  YÜKLEMELER (HashingUpload / UploadRequest)
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 200
+GIF = b'GIF89a\x01\x00'
+
+
+def upload_product(client, headers, *files):
+    return client.post('/api/products/add', headers=headers, content_type='multipart/form-data', data={
+        'title': 'Kamera', 'price': '100', 'category': 'Elektronik',
+        'images': [(io.BytesIO(data), name) for data, name in files],
+    })
+
+
+def incoming_files():
+    return os.listdir(storage.temp_dir) if os.path.isdir(storage.temp_dir) else []
+
+
+@pytest.fixture
+def uploader(app, client, make_user, login, local_storage):
+    make_user('satici')
+    return login('satici')
+
+
+def test_upload_over_file_limit_is_rejected_with_413(app, client, uploader):
+    app.config['UPLOAD_MAX_FILE_SIZE'] = 100
+
+    r = upload_product(client, uploader, (PNG, 'buyuk.png'))
+    assert r.status_code == 413
+    assert r.get_json()['message'] == 'Dosya boyutu sınırı aşıldı (en fazla 100 bayt).'
+    assert Product.query.count() == 0
+    assert incoming_files() == []
+
+
+def test_upload_type_is_sniffed_from_content(client, uploader):
+    r = upload_product(client, uploader, (b'<html>' + b'x' * 100, 'resim.png'))
+    assert r.status_code == 415
+    assert Product.query.count() == 0
+    assert incoming_files() == []
+
+
+def test_short_upload_type_is_checked_on_seek(client, uploader):
+    assert upload_product(client, uploader, (b'merhaba', 'kisa.gif')).status_code == 415
+    assert upload_product(client, uploader, (GIF, 'kisa.gif')).status_code == 201
+    assert incoming_files() == []
+
+
+def test_request_close_removes_unconsumed_temp_files(app, local_storage):
+    with app.test_request_context('/', method='POST', content_type='multipart/form-data',
+                                  data={'images': (io.BytesIO(PNG), 'a.png')}) as ctx:
+        upload = ctx.request.files['images'].stream
+        assert os.path.exists(upload.path)
+    assert not os.path.exists(upload.path)
+
+
+def test_uploads_are_moved_into_store_and_deduplicated(client, uploader, local_storage):
+    first = upload_product(client, uploader, (PNG, 'a.png'))
+    second = upload_product(client, uploader, (PNG, 'kopya.PNG'))
+    assert (first.status_code, second.status_code) == (201, 201)
+
+    urls = {p.image_url for p in Product.query}
+    assert len(urls) == 1
+    key = local_storage.key_from_url(urls.pop())
+    assert key.endswith('.png')
+    with open(local_storage.path(key), 'rb') as f:
+        assert f.read() == PNG
+    assert db.session.get(StoredFile, key).refcount == 2
+    assert incoming_files() == []
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models import Product, SwapOffer, Transaction
+from app.profiling import current_queries
+
+
+@pytest.fixture
+def request_feed(make_user):
+    """Satıcıya gelen, alıcıdan giden kiralama talepleri ve takas teklifleri."""
+    def request_feed(size):
+        seller = make_user(f'satici{size}')
+        buyer = make_user(f'alici{size}')
+        for i in range(size):
+            target = Product(title=f'Kamera {i}', category='Elektronik', price=100, owner_id=seller.id,
+                             listing_type='rent', status='available')
+            offered = Product(title=f'Bisiklet {i}', category='Spor', price=80, owner_id=buyer.id,
+                              listing_type='swap', status='available')
+            db.session.add_all([target, offered])
+            db.session.flush()
+            start = date(2026, 1, 1) + timedelta(days=3 * i)
+            db.session.add(Transaction(product_id=target.id, buyer_id=buyer.id, seller_id=seller.id,
+                                       transaction_type='RENT', price=100, status='PENDING',
+                                       start_date=start, end_date=start + timedelta(days=1)))
+            db.session.add(SwapOffer(offerer_id=buyer.id, target_product_id=target.id,
+                                     offered_product_id=offered.id))
+        db.session.commit()
+        return seller.username, buyer.username
+    return request_feed
+
+
+def feed_query_count(client, path, headers):
+    # Önce damga önbelleğe alınır, böylece yalnızca akışın sorguları sayılır
+    client.get(path, headers=headers)
+    with client:
+        r = client.get(path, headers=headers)
+        assert r.status_code == 200
+        return len(r.get_json()), current_queries().count
+
+
+@pytest.mark.parametrize('path, endpoint, role', [
+    ('/api/transactions/incoming', 'transactions.get_incoming_requests', 'seller'),
+    ('/api/transactions/outgoing', 'transactions.get_outgoing_requests', 'buyer'),
+])
+def test_request_feed_query_count_is_constant(app, client, login, request_feed, path, endpoint, role):
+    # SQL_QUERY_BUDGET_STRICT (TESTING) açık: bütçe aşımı isteği hatayla düşürür
+    assert app.config['SQL_QUERY_BUDGET_STRICT']
+
+    small = dict(zip(('seller', 'buyer'), request_feed(1)))
+    large = dict(zip(('seller', 'buyer'), request_feed(20)))
+
+    small_rows, small_queries = feed_query_count(client, path, login(small[role]))
+    large_rows, large_queries = feed_query_count(client, path, login(large[role]))
+
+    assert (small_rows, large_rows) == (2, 40)
+    assert large_queries == small_queries
+    assert large_queries <= app.config['SQL_QUERY_BUDGETS'][endpoint]